@@ -0,0 +1,76 @@
+"""Add service_round_scores and team_round_scores summary tables
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def _score_columns():
+    return [
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("round_id", sa.Integer(), sa.ForeignKey("rounds.id"), nullable=False, index=True),
+        sa.Column("round_number", sa.Integer(), nullable=False),
+        sa.Column("earned_points", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_points", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("passed_checks", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed_checks", sa.Integer(), nullable=False, server_default="0"),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "service_round_scores",
+        *_score_columns(),
+        sa.Column("service_id", sa.Integer(), sa.ForeignKey("services.id"), nullable=False, index=True),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=False),
+        sa.UniqueConstraint("round_id", "service_id"),
+    )
+    op.create_table(
+        "team_round_scores",
+        *_score_columns(),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=False, index=True),
+        sa.UniqueConstraint("round_id", "team_id"),
+    )
+
+    # Backfill the rounds that were already played
+    op.execute(
+        """
+        INSERT INTO service_round_scores
+            (round_id, round_number, service_id, team_id, earned_points, max_points, passed_checks, failed_checks)
+        SELECT checks.round_id, rounds.number, checks.service_id, services.team_id,
+               SUM(CASE WHEN checks.result THEN services.points ELSE 0 END),
+               SUM(services.points),
+               SUM(CASE WHEN checks.result THEN 1 ELSE 0 END),
+               SUM(CASE WHEN NOT checks.result THEN 1 ELSE 0 END)
+        FROM checks
+        JOIN services ON checks.service_id = services.id
+        JOIN rounds ON checks.round_id = rounds.id
+        GROUP BY checks.round_id, rounds.number, checks.service_id, services.team_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO team_round_scores
+            (round_id, round_number, team_id, earned_points, max_points, passed_checks, failed_checks)
+        SELECT round_id, round_number, team_id,
+               SUM(earned_points), SUM(max_points), SUM(passed_checks), SUM(failed_checks)
+        FROM service_round_scores
+        GROUP BY round_id, round_number, team_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("team_round_scores")
+    op.drop_table("service_round_scores")
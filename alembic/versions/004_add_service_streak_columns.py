@@ -0,0 +1,79 @@
+"""Add failure streak counters to services
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("services") as batch_op:
+        batch_op.add_column(sa.Column("current_streak", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("max_streak", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("last_result", sa.Boolean(), nullable=True))
+
+    # Backfill the counters from the rounds that were already played
+    services = sa.table(
+        "services",
+        sa.column("id", sa.Integer),
+        sa.column("current_streak", sa.Integer),
+        sa.column("max_streak", sa.Integer),
+        sa.column("last_result", sa.Boolean),
+    )
+    checks = sa.table(
+        "checks",
+        sa.column("id", sa.Integer),
+        sa.column("round_id", sa.Integer),
+        sa.column("service_id", sa.Integer),
+        sa.column("result", sa.Boolean),
+        sa.column("completed", sa.Boolean),
+    )
+    bind = op.get_bind()
+    streaks = {}
+    rows = bind.execute(
+        sa.select(checks.c.service_id, checks.c.result, checks.c.completed)
+        .where(checks.c.service_id.isnot(None))
+        .order_by(checks.c.service_id, checks.c.round_id, checks.c.id)
+    )
+    for service_id, result, completed in rows:
+        current_streak, max_streak, _ = streaks.get(service_id, (0, 0, None))
+        if completed:
+            current_streak = 0 if result else current_streak + 1
+            max_streak = max(max_streak, current_streak)
+        streaks[service_id] = (current_streak, max_streak, result)
+    if streaks:
+        bind.execute(
+            services.update()
+            .where(services.c.id == sa.bindparam("service_id"))
+            .values(
+                current_streak=sa.bindparam("new_current_streak"),
+                max_streak=sa.bindparam("new_max_streak"),
+                last_result=sa.bindparam("new_last_result"),
+            ),
+            [
+                {
+                    "service_id": service_id,
+                    "new_current_streak": current_streak,
+                    "new_max_streak": max_streak,
+                    "new_last_result": last_result,
+                }
+                for service_id, (current_streak, max_streak, last_result) in streaks.items()
+            ],
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("services") as batch_op:
+        batch_op.drop_column("last_result")
+        batch_op.drop_column("max_streak")
+        batch_op.drop_column("current_streak")
@@ -0,0 +1,46 @@
+"""Add composite and partial indexes for the checks hot queries
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+# Dialects that support partial (filtered) indexes
+PARTIAL_INDEX_DIALECTS = ("sqlite", "postgresql")
+
+
+def upgrade():
+    op.create_index("ix_checks_service_round", "checks", ["service_id", "round_id", "id"])
+    op.create_index("ix_checks_round_service", "checks", ["round_id", "service_id"])
+    op.create_index("ix_checks_service_completed_round", "checks", ["service_id", "completed", "round_id"])
+    op.create_index("ix_checks_service_result", "checks", ["service_id", "result"])
+    if op.get_bind().dialect.name in PARTIAL_INDEX_DIALECTS:
+        passed = sa.column("result").is_(True)
+        op.create_index(
+            "ix_checks_passed_round",
+            "checks",
+            ["round_id", "service_id"],
+            sqlite_where=passed,
+            postgresql_where=passed,
+        )
+    op.create_index("ix_rounds_number", "rounds", ["number"])
+
+
+def downgrade():
+    op.drop_index("ix_rounds_number", table_name="rounds")
+    if op.get_bind().dialect.name in PARTIAL_INDEX_DIALECTS:
+        op.drop_index("ix_checks_passed_round", table_name="checks")
+    op.drop_index("ix_checks_service_result", table_name="checks")
+    op.drop_index("ix_checks_service_completed_round", table_name="checks")
+    op.drop_index("ix_checks_round_service", table_name="checks")
+    op.drop_index("ix_checks_service_round", table_name="checks")
@@ -0,0 +1,93 @@
+"""Store check output compressed
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+from scoring_engine.models.output_dictionaries import OUTPUT_DICTIONARY_V1
+
+# revision identifiers, used by Alembic.
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+# Existing outputs are rewritten this many rows at a time, to keep memory flat
+# on databases with a few hundred thousand checks
+BATCH_SIZE = 1000
+
+# The storage format of scoring_engine.models.compressed_text, copied so the
+# migration keeps working whatever the models become (the dictionary is
+# frozen in scoring_engine.models.output_dictionaries)
+FORMAT_RAW = b"\x00"
+FORMAT_ZLIB_V1 = b"\x01"
+
+COMPRESSION_LEVEL = 6
+
+
+def compress_output(text):
+    raw = text.encode("utf-8")
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=OUTPUT_DICTIONARY_V1)
+    compressed = compressor.compress(raw) + compressor.flush()
+    if len(compressed) < len(raw):
+        return FORMAT_ZLIB_V1 + compressed
+    return FORMAT_RAW + raw
+
+
+def decompress_output(data):
+    data = bytes(data)
+    data_format, payload = data[:1], data[1:]
+    if data_format == FORMAT_ZLIB_V1:
+        decompressor = zlib.decompressobj(zdict=OUTPUT_DICTIONARY_V1)
+        payload = decompressor.decompress(payload) + decompressor.flush()
+    elif data and data_format != FORMAT_RAW:
+        raise ValueError(f"Unknown check output format {data_format!r}")
+    return payload.decode("utf-8")
+
+
+def convert_outputs(source_type, target_type, convert):
+    """Rewrite checks.output as *target_type*, passing every value through *convert*."""
+    with op.batch_alter_table("checks") as batch_op:
+        batch_op.add_column(sa.Column("new_output", target_type, nullable=True))
+
+    checks = sa.table(
+        "checks",
+        sa.column("id", sa.Integer),
+        sa.column("output", source_type),
+        sa.column("new_output", target_type),
+    )
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(checks.c.id, checks.c.output)
+            .where(checks.c.id > last_id)
+            .order_by(checks.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            checks.update().where(checks.c.id == sa.bindparam("check_id")).values(new_output=sa.bindparam("value")),
+            [{"check_id": check_id, "value": None if output is None else convert(output)} for check_id, output in rows],
+        )
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table("checks") as batch_op:
+        batch_op.drop_column("output")
+        batch_op.alter_column("new_output", new_column_name="output", existing_type=target_type)
+
+
+def upgrade():
+    convert_outputs(sa.UnicodeText(), sa.LargeBinary(), compress_output)
+
+
+def downgrade():
+    convert_outputs(sa.LargeBinary(), sa.UnicodeText(), decompress_output)
@@ -0,0 +1,144 @@
+"""Store each distinct check output once in check_outputs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+
+import hashlib
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+from scoring_engine.models.output_dictionaries import OUTPUT_DICTIONARY_V1
+
+# revision identifiers, used by Alembic.
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+# Existing checks are moved over this many rows at a time
+BATCH_SIZE = 1000
+
+# The check output formats as of this revision (see 006), copied so the
+# migration keeps working whatever the models become (the dictionary is
+# frozen in scoring_engine.models.output_dictionaries)
+FORMAT_RAW = b"\x00"
+FORMAT_ZLIB_V1 = b"\x01"
+
+
+def output_digest(data):
+    """Return the check_outputs.digest of an output stored by 006: SHA-256 of its text."""
+    data = bytes(data)
+    data_format, payload = data[:1], data[1:]
+    if data_format == FORMAT_ZLIB_V1:
+        decompressor = zlib.decompressobj(zdict=OUTPUT_DICTIONARY_V1)
+        payload = decompressor.decompress(payload) + decompressor.flush()
+    elif data and data_format != FORMAT_RAW:
+        raise ValueError(f"Unknown check output format {data_format!r}")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def upgrade():
+    op.create_table(
+        "check_outputs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("output", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("digest"),
+    )
+    with op.batch_alter_table("checks") as batch_op:
+        batch_op.add_column(sa.Column("output_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key("fk_checks_output_id", "check_outputs", ["output_id"], ["id"])
+
+    # Outputs are already stored compressed (006), so they're copied as is
+    # and only decompressed to compute their digest
+    checks = sa.table(
+        "checks",
+        sa.column("id", sa.Integer),
+        sa.column("output", sa.LargeBinary),
+        sa.column("output_id", sa.Integer),
+    )
+    check_outputs = sa.table(
+        "check_outputs",
+        sa.column("id", sa.Integer),
+        sa.column("digest", sa.String),
+        sa.column("output", sa.LargeBinary),
+    )
+    bind = op.get_bind()
+    output_ids = {}
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(checks.c.id, checks.c.output)
+            .where(checks.c.id > last_id)
+            .where(checks.c.output.isnot(None))
+            .order_by(checks.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        check_digests = []
+        new_outputs = {}
+        for check_id, output in rows:
+            digest = output_digest(output)
+            check_digests.append((check_id, digest))
+            if digest not in output_ids:
+                new_outputs[digest] = bytes(output)
+        if new_outputs:
+            bind.execute(
+                check_outputs.insert(),
+                [{"digest": digest, "output": output} for digest, output in new_outputs.items()],
+            )
+            output_ids.update(
+                bind.execute(
+                    sa.select(check_outputs.c.digest, check_outputs.c.id).where(
+                        check_outputs.c.digest.in_(list(new_outputs))
+                    )
+                ).fetchall()
+            )
+        bind.execute(
+            checks.update()
+            .where(checks.c.id == sa.bindparam("check_id"))
+            .values(output_id=sa.bindparam("new_output_id")),
+            [{"check_id": check_id, "new_output_id": output_ids[digest]} for check_id, digest in check_digests],
+        )
+        last_id = rows[-1][0]
+
+    # Indexed once the backfill is done, for finding the outputs no check uses any more
+    with op.batch_alter_table("checks") as batch_op:
+        batch_op.drop_column("output")
+        batch_op.create_index("ix_checks_output_id", ["output_id"])
+
+
+def downgrade():
+    with op.batch_alter_table("checks") as batch_op:
+        batch_op.add_column(sa.Column("output", sa.LargeBinary(), nullable=True))
+
+    checks = sa.table(
+        "checks",
+        sa.column("output", sa.LargeBinary),
+        sa.column("output_id", sa.Integer),
+    )
+    check_outputs = sa.table(
+        "check_outputs",
+        sa.column("id", sa.Integer),
+        sa.column("output", sa.LargeBinary),
+    )
+    op.get_bind().execute(
+        checks.update().values(
+            output=sa.select(check_outputs.c.output)
+            .where(check_outputs.c.id == checks.c.output_id)
+            .scalar_subquery()
+        )
+    )
+
+    with op.batch_alter_table("checks") as batch_op:
+        batch_op.drop_index("ix_checks_output_id")
+        batch_op.drop_constraint("fk_checks_output_id", type_="foreignkey")
+        batch_op.drop_column("output_id")
+    op.drop_table("check_outputs")
@@ -1,10 +1,63 @@
-"""Helper functions for clearing and updating application caches."""
+"""Helper functions for clearing and updating application caches.
+
+The API views are cached per path and per role (see ``make_cache_key``), so
+a single change can be cached under many keys.  Instead of looking those
+keys up in the cache server, every cached path belongs to a family (the
+segment after ``/api/``) whose generation counter is part of the key.
+Invalidating a family is a single increment of its counter; the old keys
+are never read again and expire on their own.  Services and injects also
+have a per-id generation, so one service's checks can be invalidated
+without touching the others.
+"""
 
 from flask import current_app
 from flask_caching.backends import NullCache
+from flask_caching.backends.rediscache import RedisCache
 
 from scoring_engine.cache import cache
 
+GENERATION_KEY = "generation:{0}"
+
+# URL segments cached under another family's generation
+_FAMILY_ALIASES = {"injects": "inject"}
+# Families that also have a per-id generation (/api/<family>/<id>/...)
+_SCOPED_FAMILIES = ("service", "inject")
+
+
+def cache_families(path):
+    """Return the generation counters that the cache keys of *path* depend on."""
+    parts = path.strip("/").split("/")
+    family = parts[1] if len(parts) > 1 and parts[0] == "api" else parts[0]
+    family = _FAMILY_ALIASES.get(family, family)
+    families = [family]
+    if family in _SCOPED_FAMILIES and len(parts) > 2:
+        families.append(f"{family}/{parts[2]}")
+    return families
+
+
+def versioned_key(path, suffix):
+    """Build the cache key of *path* for one role, e.g. ``/api/stats_white@3``."""
+    generation_keys = [GENERATION_KEY.format(family) for family in cache_families(path)]
+    generations = cache.get_many(*generation_keys)
+    return f"{path}_{suffix}@{'.'.join(str(generation or 0) for generation in generations)}"
+
+
+def stale_key(key):
+    """Return the generation independent key under which the last payload of a versioned key is kept."""
+    return f"{key.rpartition('@')[0]}@stale"
+
+
+def bump_generation(family):
+    """Invalidate every cached key of *family* by incrementing its generation."""
+    if isinstance(cache.cache, NullCache):
+        return
+    key = GENERATION_KEY.format(family)
+    if isinstance(cache.cache, RedisCache):
+        # A single INCR, and the counter is created without an expiry
+        cache.cache.inc(key)
+    else:
+        cache.set(key, (cache.get(key) or 0) + 1, timeout=0)
+
 
 def update_all_cache(app_or_ctx=None):
     """Clear and rebuild all cached values.
@@ -34,6 +87,7 @@ def update_all_cache(app_or_ctx=None):
     update_sla_data()
     update_flags_data()
     update_stats()
+    update_scores_data()
 
     # Notify SSE clients that new data is available
     from scoring_engine.events import publish_event
@@ -41,6 +95,50 @@ def update_all_cache(app_or_ctx=None):
     publish_event("round_complete")
 
 
+def update_round_cache(app_or_ctx=None, changes=None, sla_config=None):
+    """Refresh the cached values that change every round, then announce the round.
+
+    Unlike :func:`update_all_cache` nothing is cleared up front.  The
+    scoreboard, overview, team and stats payloads are recomputed by the cache
+    warmer and swapped in over the previous round's, so the clients that
+    refresh on ``round_complete`` never hit a cold cache.
+
+    Parameters
+    ----------
+    app_or_ctx : Flask app or app context, optional
+        Application to warm the cache for.  If omitted, the current
+        application context will be used.
+    changes : RoundChanges, optional
+        What the round changed (see ``get_round_changes``).  Only the team
+        payloads of the teams it lists are rebuilt, and it's published with
+        ``round_complete`` so clients can skip re-fetching what didn't
+        change.  If omitted, every team payload is rebuilt.
+    sla_config : SLAConfig, optional
+        SLA settings snapshot to warm the payloads with, instead of
+        loading one for every payload.
+    """
+    from scoring_engine.cache_warmer import warm_round_cache
+    from scoring_engine.sla import get_sla_config, use_sla_config
+
+    if app_or_ctx is None:
+        app_or_ctx = current_app
+
+    context_manager = app_or_ctx.app_context() if hasattr(app_or_ctx, "app_context") else app_or_ctx
+
+    with context_manager:
+        # Round-dependent views that aren't warmed.  Every checked service
+        # gains a check each round, so all of their check lists are stale.
+        update_service_data()
+        update_sla_data()
+        update_flags_data()
+        with use_sla_config(sla_config or get_sla_config()):
+            warm_round_cache(changes)
+
+    from scoring_engine.events import publish_event
+
+    publish_event("round_complete", changes._asdict() if changes is not None else None)
+
+
 def update_overview_data():
     from scoring_engine.web.views.api.overview import (
         overview_get_round_data,
@@ -49,9 +147,7 @@ def update_overview_data():
     )
 
     # overview_get_data uses @cache.cached with make_cache_key (per-role keys)
-    if not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/overview/get_data_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+    bump_generation("overview")
     cache.delete_memoized(overview_get_round_data)
     cache.delete_memoized(_get_overview_data_cached)
     cache.delete_memoized(_get_table_columns_cached)
@@ -66,106 +162,93 @@ def update_scoreboard_data():
 
 def update_team_stats(team_id=None):
     # corresponds with file scoring_engine.web.views.api.team function services_get_team_data
+    # Only the team itself can request its key; without a team every team view is invalidated
 
     if team_id is not None:
-        cache.delete(f"/api/team/{team_id}/stats_team_{team_id}")
-    elif not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/team/*/stats_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+        cache.delete(versioned_key(f"/api/team/{team_id}/stats", f"team_{team_id}"))
+    else:
+        bump_generation("team")
 
 
 def update_services_navbar(team_id=None):
     # corresponds with file scoring_engine.web.views.api.team function team_services_status
 
     if team_id is not None:
-        cache.delete(f"/api/team/{team_id}/services/status_team_{team_id}")
-    elif not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/team/*/services/status_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+        cache.delete(versioned_key(f"/api/team/{team_id}/services/status", f"team_{team_id}"))
+    else:
+        bump_generation("team")
 
 
 def update_service_data(service_id=None):
     # corresponds with file scoring_engine.web.views.api.service function service_get_checks
 
-    if not isinstance(cache.cache, NullCache):
-        pattern = f"*/api/service/{service_id}/checks_*" if service_id is not None else "*/api/service/*/checks_*"
-        for key in cache.cache._write_client.scan_iter(match=pattern):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+    bump_generation(f"service/{service_id}" if service_id is not None else "service")
 
 
 def update_services_data(team_id=None):
     # corresponds with file scoring_engine.web.views.api.team function api_services
 
     if team_id is not None:
-        cache.delete(f"/api/team/{team_id}/services_team_{team_id}")
-    elif not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/team/*/services_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+        cache.delete(versioned_key(f"/api/team/{team_id}/services", f"team_{team_id}"))
+    else:
+        bump_generation("team")
 
 
 def update_announcements_data():
     """Clear cached announcement data for all visibility contexts."""
-    if not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/announcements_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+    bump_generation("announcements")
 
 
 def update_inject_data(inject_id, team_id=None):
     """Clear cached inject detail for the given inject.
 
-    The cache key for ``/api/inject/<id>`` is ``/api/inject/<id>_team_<team_id>``
-    for blue teams or ``/api/inject/<id>_white`` for white team.
-    Both the owning team and the white team can view an inject, so we clear
-    all matching keys when ``team_id`` is not provided.
+    The cache key for ``/api/inject/<id>`` is built for ``team_<team_id>``
+    for blue teams or ``white`` for white team.  Both the owning team and
+    the white team can view an inject, so every key of the inject is
+    invalidated when ``team_id`` is not provided.
     """
     if team_id is not None:
-        cache.delete(f"/api/inject/{inject_id}_team_{team_id}")
-    elif not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match=f"*/api/inject/{inject_id}_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+        cache.delete(versioned_key(f"/api/inject/{inject_id}", f"team_{team_id}"))
+    else:
+        bump_generation(f"inject/{inject_id}")
 
 
 def update_inject_comments(inject_id, team_id=None):
     """Clear cached inject comments for the given inject."""
     if team_id is not None:
-        cache.delete(f"/api/inject/{inject_id}/comments_{team_id}")
-    elif not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match=f"*/api/inject/{inject_id}/comments_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+        cache.delete(versioned_key(f"/api/inject/{inject_id}/comments", f"team_{team_id}"))
+    else:
+        bump_generation(f"inject/{inject_id}")
 
 
 def update_inject_files(inject_id, team_id=None):
     """Clear cached inject files for the given inject."""
     if team_id is not None:
-        cache.delete(f"/api/inject/{inject_id}/files_{team_id}")
-    elif not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match=f"*/api/inject/{inject_id}/files_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+        cache.delete(versioned_key(f"/api/inject/{inject_id}/files", f"team_{team_id}"))
+    else:
+        bump_generation(f"inject/{inject_id}")
 
 
 def update_all_inject_data():
     """Clear all cached inject detail and inject list data for all teams."""
-    if not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/inject*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+    bump_generation("inject")
 
 
 def update_sla_data():
     # Clear cached /api/sla responses (keyed per-team/role)
-    if not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/sla*_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+    bump_generation("sla")
 
 
 def update_flags_data():
     # Clear cached /api/flags responses (keyed per-team/role)
-    if not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/flags*_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+    bump_generation("flags")
 
 
 def update_stats():
     # Clear cached /api/stats responses (keyed per-team/role)
-    if not isinstance(cache.cache, NullCache):
-        for key in cache.cache._write_client.scan_iter(match="*/api/stats_*"):
-            cache.delete(key.decode("utf-8").removeprefix(cache.cache.key_prefix))
+    bump_generation("stats")
+
+
+def update_scores_data():
+    # Drop the shared ScoreSnapshot after scores changed within a round
+    bump_generation("scores")
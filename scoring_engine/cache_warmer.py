@@ -0,0 +1,156 @@
+"""Recompute the round-dependent API payloads and swap them into the cache.
+
+``update_all_cache`` clears the whole cache, so the first request for every
+view after a round pays the full query cost, and since every browser
+refreshes on ``round_complete`` they all pay it at the same moment.  The
+warmer instead computes the scoreboard, overview, team and stats payloads
+for every key the views can be requested under (every anonymize mode and
+every role/team key ``make_cache_key`` produces), and only then writes them
+over the previous round's payloads in one ``set_many``.  Until that moment
+clients keep getting the previous round's data from the cache.
+"""
+
+from contextlib import contextmanager
+
+from flask import current_app, g
+from flask_caching.backends import NullCache
+from flask_login import current_user, login_user
+
+from scoring_engine.cache import cache
+from scoring_engine.cache_helper import stale_key
+from scoring_engine.db import db
+from scoring_engine.logger import logger
+from scoring_engine.models.setting import Setting
+from scoring_engine.models.team import Team
+from scoring_engine.models.user import User
+
+
+def _caching_wrapper(view):
+    """Return the flask-caching wrapper of a (possibly login_required) view."""
+    while not hasattr(view, "uncached"):
+        view = view.__wrapped__
+    return view
+
+
+def _request_users():
+    """One user per distinct ``make_cache_key`` key: anonymous, white, red and every blue team.
+
+    None stands for the anonymous user.  Teams without users are skipped,
+    nobody can request their keys.
+    """
+    users = [None]
+    seen_colors = set()
+    for team in db.session.query(Team).order_by(Team.id).all():
+        if team.color in seen_colors:
+            continue
+        user = db.session.query(User).filter(User.team_id == team.id).order_by(User.id).first()
+        if user is None:
+            continue
+        users.append(user)
+        if not team.is_blue_team:
+            seen_colors.add(team.color)
+    return users
+
+
+def _anonymize_modes():
+    """The ``(anonymize, show_both)`` pairs ``get_anonymize_mode`` can currently return."""
+    setting = Setting.get_setting("anonymize_team_names")
+    if setting and setting.value is True:
+        return [(True, False), (False, True)]
+    return [(False, False)]
+
+
+@contextmanager
+def user_request_context(path, user):
+    """A request context for *path* as *user* (None for anonymous) would request it."""
+    with current_app.test_request_context(path):
+        if user is not None:
+            login_user(user)
+        # Normally set by the auth blueprint's before_request hook
+        g.user = current_user._get_current_object()
+        yield
+
+
+class CacheWarmer(object):
+    """Collects freshly computed payloads and writes them all at once."""
+
+    def __init__(self):
+        # timeout -> {cache key: payload}
+        self.payloads = {}
+
+    def _add(self, key, value, timeout):
+        self.payloads.setdefault(timeout, {})[key] = value
+
+    def memoized(self, function, *args):
+        wrapper = _caching_wrapper(function)
+        try:
+            key = wrapper.make_cache_key(wrapper.uncached, *args)
+            value = wrapper.uncached(*args)
+        except Exception:
+            logger.warning("Unable to warm cache for %s%r", wrapper.uncached.__name__, args, exc_info=True)
+            return
+        self._add(key, value, wrapper.cache_timeout)
+
+    def view(self, view, path, user, **view_args):
+        """Compute a ``make_cache_key`` keyed view as *user* would request it."""
+        from scoring_engine.web.views.api import make_cache_key
+
+        wrapper = _caching_wrapper(view)
+        with user_request_context(path, user):
+            try:
+                key = make_cache_key(**view_args)
+                value = wrapper.uncached(**view_args)
+            except Exception:
+                logger.warning("Unable to warm cache for %s", path, exc_info=True)
+                return
+        self._add(key, value, wrapper.cache_timeout)
+        if getattr(wrapper, "stale_while_revalidate", False):
+            # Keep the stale payload as recent as the cached one
+            self._add(stale_key(key), value, 0)
+
+    def swap_in(self):
+        total = 0
+        for timeout, mapping in self.payloads.items():
+            cache.set_many(mapping, timeout=timeout)
+            total += len(mapping)
+        return total
+
+
+def warm_round_cache(changes=None):
+    """Recompute the payloads that change every round and swap them into the cache.
+
+    With a ``RoundChanges``, a team's stats are only recomputed if its score
+    or place changed and its services status only if one of its services
+    flipped; the cached payloads of the other teams are still current.
+
+    Returns the number of cache entries written.
+    """
+    if isinstance(cache.cache, NullCache):
+        return 0
+
+    from scoring_engine.web.views.api import overview, scoreboard, stats, team
+
+    warmer = CacheWarmer()
+    for anonymize, show_both in _anonymize_modes():
+        warmer.memoized(scoreboard._get_bar_data_cached, anonymize, show_both)
+        warmer.memoized(scoreboard._get_line_data_cached, anonymize, show_both)
+        warmer.memoized(overview._get_overview_data_cached, anonymize, show_both)
+        warmer.memoized(overview._get_table_columns_cached, anonymize, show_both)
+    warmer.memoized(overview.overview_get_round_data)
+
+    for user in _request_users():
+        warmer.view(overview.overview_get_data, "/api/overview/get_data", user)
+        if user is None or user.is_red_team:
+            continue
+        warmer.view(stats.api_stats, "/api/stats", user)
+        if user.is_white_team:
+            warmer.view(stats.api_stats_scoring_overview, "/api/stats/scoring_overview", user)
+            continue
+        team_id = str(user.team.id)
+        if changes is None or user.team.id in changes.team_ids:
+            warmer.view(team.services_get_team_data, f"/api/team/{team_id}/stats", user, team_id=team_id)
+        warmer.view(team.api_services, f"/api/team/{team_id}/services", user, team_id=team_id)
+        if changes is None or user.team.id in changes.status_team_ids:
+            warmer.view(team.team_services_status, f"/api/team/{team_id}/services/status", user, team_id=team_id)
+
+    return warmer.swap_in()
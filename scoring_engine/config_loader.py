@@ -128,6 +128,35 @@ class ConfigLoader(object):
             "int",
         )
 
+        self.worker_side_matching = self.parse_sources(
+            "worker_side_matching",
+            self.parser["OPTIONS"].get("worker_side_matching", "false").lower() == "true",
+            "bool",
+        )
+
+        self.task_batch_size = self.parse_sources(
+            "task_batch_size",
+            int(self.parser["OPTIONS"].get("task_batch_size", "0")),
+            "int",
+        )
+
+        self.engine_pipelined_rounds = self.parse_sources(
+            "engine_pipelined_rounds",
+            self.parser["OPTIONS"].get("engine_pipelined_rounds", "false").lower() == "true",
+            "bool",
+        )
+
+        self.worker_executor = self.parse_sources(
+            "worker_executor",
+            self.parser["OPTIONS"].get("worker_executor", "subprocess"),
+        )
+
+        self.worker_native_checks = self.parse_sources(
+            "worker_native_checks",
+            self.parser["OPTIONS"].get("worker_native_checks", "false").lower() == "true",
+            "bool",
+        )
+
         self.anonymize_team_names = self.parse_sources(
             "anonymize_team_names",
             self.parser["OPTIONS"].get("anonymize_team_names", "false").lower() == "true",
@@ -152,6 +181,12 @@ class ConfigLoader(object):
 
         self.cache_type = self.parse_sources("cache_type", self.parser["OPTIONS"]["cache_type"])
 
+        self.cache_stale_while_revalidate = self.parse_sources(
+            "cache_stale_while_revalidate",
+            self.parser["OPTIONS"].get("cache_stale_while_revalidate", "false").lower() == "true",
+            "bool",
+        )
+
         self.redis_host = self.parse_sources("redis_host", self.parser["OPTIONS"]["redis_host"])
 
         self.redis_port = self.parse_sources("redis_port", int(self.parser["OPTIONS"]["redis_port"]), "int")
@@ -0,0 +1,92 @@
+"""Run check commands on an asyncio event loop.
+
+A check spends nearly all of its time waiting on the network, so there is no
+reason for a worker to dedicate a whole process (and a blocked
+``subprocess.run``) to each one.  This executor starts the check commands
+with ``asyncio.create_subprocess_exec`` (or ``create_subprocess_shell`` for
+the few commands that need a shell) and waits for all of them on one event
+loop, so a single worker process can have hundreds of checks in flight.
+
+With ``worker_executor = asyncio`` the worker runs Celery's thread pool and
+``execute_command`` hands each command to one shared event loop through
+:func:`run_command_threadsafe` instead of managing its own subprocess.
+"""
+
+import asyncio
+import os
+import signal
+import threading
+
+from scoring_engine.engine.basic_check import split_command
+
+# Same limit subprocess.run uses in execute_command
+COMMAND_TIMEOUT = 30
+
+# Default number of checks a worker runs at once in asyncio mode
+DEFAULT_CONCURRENCY = 200
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+async def _read_output(stream, chunks):
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return
+        chunks.append(chunk)
+
+
+async def run_command(command, timeout=COMMAND_TIMEOUT):
+    """Run a check command and collect its output.
+
+    Returns an ``(output, errored_out)`` tuple.  On timeout the command's whole
+    process group is killed and whatever it printed so far is returned, the
+    same as ``subprocess.run`` does in ``execute_command``.
+    """
+    argv = split_command(command)
+    kwargs = dict(stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, start_new_session=True)
+    if argv is not None:
+        try:
+            process = await asyncio.create_subprocess_exec(*argv, **kwargs)
+        except OSError as e:
+            # What the shell would have printed for a missing or broken binary
+            return "{0}: {1}\n".format(argv[0], e.strerror), False
+    else:
+        process = await asyncio.create_subprocess_shell(command, **kwargs)
+
+    chunks = []
+    reader = asyncio.ensure_future(_read_output(process.stdout, chunks))
+    errored_out = False
+    try:
+        await asyncio.wait_for(process.wait(), timeout)
+    except asyncio.TimeoutError:
+        errored_out = True
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+    try:
+        # Grandchildren may still hold the pipe open, don't wait on them forever
+        await asyncio.wait_for(reader, 1)
+    except asyncio.TimeoutError:
+        pass
+    return b"".join(chunks).decode("utf-8", errors="replace"), errored_out
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="check-executor", daemon=True).start()
+    return _loop
+
+
+def run_command_threadsafe(command, timeout=COMMAND_TIMEOUT):
+    """Run :func:`run_command` on the shared background event loop.
+
+    Blocks the calling thread until the command finishes.
+    """
+    return asyncio.run_coroutine_threadsafe(run_command(command, timeout), _get_loop()).result()
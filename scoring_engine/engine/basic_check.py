@@ -9,6 +9,23 @@ CHECK_FAILURE_TEXT = "Check Received Incorrect Content"
 CHECK_TIMED_OUT_TEXT = "Check Timed Out"
 
 
+def split_command(command):
+    """Split a check command into an argument list that can run without a shell.
+
+    Check commands quote every argument (see :meth:`BasicCheck.command`), so a
+    command that doesn't come back unchanged when its arguments are re-quoted
+    uses shell syntax (pipes, environment assignments, ...).  Returns None for
+    those.
+    """
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or shlex.join(argv) != command or "=" in argv[0]:
+        return None
+    return argv
+
+
 class BasicCheck(object):
     def __init__(self, environment):
         self.environment = environment
@@ -0,0 +1,143 @@
+"""Per-round dispatch plan, cached for as long as the scored services don't change.
+
+Building a round's jobs means loading every service with its environments,
+properties and accounts, instantiating a check class per environment and
+rendering its command.  None of that changes from one round to the next
+unless somebody edits a service, so the engine keeps the rendered result (the
+plan) and only rebuilds it when the dispatch config version moves.
+
+The version is a Redis counter bumped by every web endpoint that edits
+something a check command depends on.  When Redis can't be reached the plan
+is rebuilt every round, same as before.
+"""
+
+import random
+from collections import namedtuple
+
+import redis
+from sqlalchemy.orm import selectinload
+
+from scoring_engine.config import config
+from scoring_engine.logger import logger
+from scoring_engine.models.environment import Environment
+from scoring_engine.models.service import Service
+
+CONFIG_VERSION_KEY = "se:dispatch_config_version"
+
+PlannedService = namedtuple("PlannedService", ["id", "name", "team_name", "check_name", "worker_queue", "environments"])
+
+# One command per account of the service, so picking a random command picks
+# a random account exactly like BasicCheck.get_random_account does
+PlannedEnvironment = namedtuple(
+    "PlannedEnvironment", ["id", "matching_content", "matching_content_reject", "commands"]
+)
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis(
+            host=config.redis_host,
+            port=config.redis_port,
+            password=config.redis_password,
+            socket_connect_timeout=5,
+        )
+    return _redis_client
+
+
+def get_config_version():
+    """Return the current dispatch config version, or None if it can't be read."""
+    try:
+        return int(_get_redis().get(CONFIG_VERSION_KEY) or 0)
+    except Exception:
+        logger.warning("Unable to read dispatch config version, rebuilding dispatch plan", exc_info=True)
+        return None
+
+
+def bump_config_version():
+    """Tell the engine to rebuild its dispatch plan before the next round."""
+    try:
+        _get_redis().incr(CONFIG_VERSION_KEY)
+    except Exception:
+        logger.warning("Unable to bump dispatch config version", exc_info=True)
+
+
+def _render_commands(check_class, environment, accounts):
+    if not accounts:
+        return [check_class(environment).command()]
+    commands = []
+    for account in accounts:
+        check_obj = check_class(environment)
+        check_obj.get_random_account = lambda account=account: account
+        commands.append(check_obj.command())
+    return commands
+
+
+class DispatchPlan(object):
+    """Everything the engine needs to dispatch a round, without touching the db."""
+
+    def __init__(self, version, services):
+        self.version = version
+        self.services = services
+
+    @classmethod
+    def build(cls, session, check_name_to_obj, version=None):
+        """Load every service and render the commands for all of its environments.
+
+        Args:
+            session: db session to load the services with
+            check_name_to_obj: callable mapping a check name to its check class
+            version: dispatch config version the plan was built for
+
+        Raises:
+            LookupError: if a service's check can't be found or is misconfigured
+        """
+        # Eager-load environments, properties, and accounts to avoid N+1 queries.
+        # Service.team is already lazy="joined" so it comes for free.
+        services = (
+            session.query(Service)
+            .options(
+                selectinload(Service.environments).selectinload(Environment.properties),
+                selectinload(Service.accounts),
+            )
+            .all()
+        )
+        planned_services = []
+        for service in services:
+            check_class = check_name_to_obj(service.check_name)
+            if check_class is None:
+                raise LookupError("Unable to map service to check code for " + str(service.check_name))
+            if not service.environments:
+                logger.warning("Skipping %s - %s: no environments configured", service.team.name, service.name)
+                continue
+            environments = [
+                PlannedEnvironment(
+                    id=environment.id,
+                    matching_content=environment.matching_content,
+                    matching_content_reject=environment.matching_content_reject,
+                    commands=_render_commands(check_class, environment, service.accounts),
+                )
+                for environment in service.environments
+            ]
+            planned_services.append(
+                PlannedService(
+                    id=service.id,
+                    name=service.name,
+                    team_name=service.team.name,
+                    check_name=service.check_name,
+                    worker_queue=service.worker_queue,
+                    environments=environments,
+                )
+            )
+        logger.info("Built dispatch plan for %d services", len(planned_services))
+        return cls(version, planned_services)
+
+    def is_current(self, version):
+        return version is not None and version == self.version
+
+    def shuffled_services(self):
+        services = list(self.services)
+        random.shuffle(services)
+        return services
@@ -2,33 +2,43 @@ import importlib
 import importlib.util
 import inspect
 import json
+import math
 import os
 import random
-import re
 import signal
 import sys
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from functools import partial
 from pathlib import Path
 
 from flask import current_app
+from celery.utils import uuid
+from sqlalchemy import insert
 from sqlalchemy.orm import selectinload
 
-from scoring_engine.cache_helper import update_all_cache
+from scoring_engine.cache_helper import update_round_cache
 from scoring_engine.config import config
 from scoring_engine.db import db
 from scoring_engine.engine.basic_check import CHECK_FAILURE_TEXT, CHECK_SUCCESS_TEXT, CHECK_TIMED_OUT_TEXT
-from scoring_engine.engine.execute_command import execute_command
+from scoring_engine.engine.dispatch_plan import DispatchPlan, get_config_version
+from scoring_engine.engine.execute_command import BATCH_CONCURRENCY, execute_command, execute_commands
 from scoring_engine.engine.job import Job
+from scoring_engine.engine.matcher import get_matcher
+from scoring_engine.engine.result_stream import RoundResultStream
+from scoring_engine.engine.round_pipeline import FinishedRound, RoundPersister
+from scoring_engine.engine.task_results import batch_job_id, celery_task_id, fetch_task_results
 from scoring_engine.logger import logger
-from scoring_engine.models.check import Check
+from scoring_engine.models.check import Check, delete_round_checks
+from scoring_engine.models.check_output import store_check_outputs
 from scoring_engine.models.environment import Environment
 from scoring_engine.models.kb import KB
 from scoring_engine.models.round import Round
+from scoring_engine.models.round_score import delete_round_scores, get_round_changes, materialize_round_scores
 from scoring_engine.models.property import Property
-from scoring_engine.models.service import Service
+from scoring_engine.models.service import advance_service_streaks, rebuild_service_streaks
 from scoring_engine.models.setting import Setting
+from scoring_engine.sla import get_sla_config
 
 
 def engine_sigint_handler(signum, frame, engine):
@@ -58,6 +68,8 @@ class Engine(object):
 
         self.load_checks()
         self.round_running = False
+        self._dispatch_plan = None
+        self._persister = None
 
     def verify_settings(self):
         settings = ["target_round_time", "worker_refresh_time", "engine_paused", "pause_duration"]
@@ -138,39 +150,12 @@ class Engine(object):
             self._check_map = {check.__name__: check for check in self.checks}
         return self._check_map.get(check_name)
 
-    @staticmethod
-    def _safe_regex_search(pattern, text, env_id=None, timeout=5):
-        """Run re.search with a timeout to prevent ReDoS hangs.
-
-        Uses signal.alarm on the main thread. Falls back to literal
-        match if the regex takes longer than *timeout* seconds or is invalid.
-        """
-        def _alarm_handler(signum, frame):
-            raise TimeoutError("Regex timed out")
-
-        old_handler = signal.signal(signal.SIGALRM, _alarm_handler)
-        signal.alarm(timeout)
-        try:
-            result = re.search(pattern, text)
-        except TimeoutError:
-            logger.warning(
-                "Regex timed out after %ds for environment %s, pattern %r — falling back to literal match",
-                timeout,
-                env_id,
-                pattern,
-            )
-            result = pattern in text
-        except re.error:
-            logger.warning(
-                "Invalid regex pattern for environment %s: %r, falling back to literal match",
-                env_id,
-                pattern,
-            )
-            result = pattern in text
-        finally:
-            signal.alarm(0)
-            signal.signal(signal.SIGALRM, old_handler)
-        return result
+    def get_dispatch_plan(self):
+        """Return the dispatch plan for this round, rebuilding it if services changed."""
+        version = get_config_version()
+        if self._dispatch_plan is None or not self._dispatch_plan.is_current(version):
+            self._dispatch_plan = DispatchPlan.build(self.db.session, self.check_name_to_obj, version)
+        return self._dispatch_plan
 
     def sleep(self, seconds):
         try:
@@ -190,44 +175,165 @@ class Engine(object):
         """
         if completed is None:
             completed = set()
+        unfinished = [
+            task_id for team_task_ids in tasks.values() for task_id in team_task_ids if task_id not in completed
+        ]
+        metas = fetch_task_results(execute_command, unfinished)
         pending_tasks = []
-        for team_name, task_ids in tasks.items():
-            for task_id in task_ids:
-                if task_id in completed:
-                    continue
-                task = execute_command.AsyncResult(task_id)
-                if task.state == "PENDING":
-                    pending_tasks.append(task_id)
-                else:
-                    completed.add(task_id)
+        for task_id in unfinished:
+            if metas.get(task_id, {}).get("status", "PENDING") == "PENDING":
+                pending_tasks.append(task_id)
+            else:
+                completed.add(task_id)
         return pending_tasks
 
+    def _process_task_result(self, task_id, task_state, task_result, env_cache, task_env_map):
+        """Score a single finished (or stuck) task.
+
+        Returns an ``(environment, result, reason, output, command)`` tuple, or
+        None if the task can't be mapped back to an environment.
+        """
+        # Handle stuck/revoked/failed tasks via env mapping
+        if task_result is None or not isinstance(task_result, dict):
+            env_id = task_env_map.get(task_id)
+            if env_id is None:
+                logger.warning("No result or env mapping for task %s (state=%s), skipping", task_id, task_state)
+                return None
+            environment = env_cache.get(env_id)
+            if environment is None:
+                logger.warning("Environment %s not found for timed-out task %s, skipping", env_id, task_id)
+                return None
+            logger.warning(
+                "Task %s stuck/failed (state=%s), marking %s - %s as timed out",
+                task_id, task_state, environment.service.team.name, environment.service.name,
+            )
+            return environment, False, CHECK_TIMED_OUT_TEXT, "Task did not complete within the round time limit.", ""
+
+        environment = env_cache.get(task_result["environment_id"])
+        if environment is None:
+            logger.warning("Environment %s not found for task %s, skipping", task_result["environment_id"], task_id)
+            return None
+        full_output = task_result["output"][:5000]
+        if task_result["errored_out"]:
+            result = False
+            reason = CHECK_TIMED_OUT_TEXT
+        elif "result" in task_result:
+            # The worker already matched the output (worker_side_matching)
+            result = task_result["result"]
+            reason = task_result["reason"]
+        else:
+            # A reject pattern match fails the check even though the content matched
+            if get_matcher().matches(environment, full_output):
+                result = True
+                reason = CHECK_SUCCESS_TEXT
+            else:
+                result = False
+                reason = CHECK_FAILURE_TEXT
+        return environment, result, reason, full_output, task_result["command"]
+
+    def _save_round(self, finished_round):
+        """Write a finished round and all of its checks in a single transaction."""
+        round_obj = Round(round_start=finished_round.start_time, number=finished_round.number)
+        self.db.session.add(round_obj)
+        self.db.session.flush()
+        # Identical outputs are stored once, the checks reference them by id
+        output_ids = store_check_outputs(self.db.session, [row["output"] for row in finished_round.check_rows])
+        check_rows = []
+        for row in finished_round.check_rows:
+            check_row = dict(row, round_id=round_obj.id)
+            check_row["output_id"] = output_ids[check_row.pop("output")]
+            check_rows.append(check_row)
+        if check_rows:
+            self.db.session.execute(insert(Check.__table__), check_rows)
+        advance_service_streaks(self.db.session, round_obj.id)
+        materialize_round_scores(self.db.session, round_obj.id)
+        round_obj.round_end = datetime.now()
+        self.db.session.commit()
+        logger.info("Database commit complete for round %d", finished_round.number)
+        return round_obj.round_end
+
+    def _rebuild_round_caches(self, finished_round):
+        """Rebuild the caches of a saved round, run by the background persister."""
+        logger.info("Updating Caches")
+        try:
+            changes = get_round_changes(self.db.session, finished_round.number)
+            update_round_cache(current_app, changes, finished_round.sla_config)
+        finally:
+            # End the read transaction, even a failed one, so the next round can be saved
+            self.db.session.rollback()
+
+    def _discard_round(self, round_number):
+        """Remove every trace of a round (checks, Round row and task manifest)."""
+        self.db.session.rollback()
+        round_ids = [round_id for (round_id,) in self.db.session.query(Round.id).filter(Round.number == round_number)]
+        if round_ids:
+            delete_round_scores(self.db.session, round_ids)
+            delete_round_checks(self.db.session, round_ids)
+            self.db.session.query(Round).filter(Round.id.in_(round_ids)).delete(synchronize_session=False)
+            rebuild_service_streaks(self.db.session)
+        self.db.session.query(KB).filter(KB.name == "task_ids", KB.round_num == round_number).delete(
+            synchronize_session=False
+        )
+        self.db.session.commit()
+
+    def _stop_if_persister_failed(self):
+        if self._persister is not None and self._persister.failed.is_set():
+            logger.error("Saving a previous round failed, stopping the engine")
+            self._persister.wait()
+            sys.exit(1)
+
     def run(self):
         if self.total_rounds == 0:
             logger.info("Running engine for unlimited rounds")
         else:
             logger.info("Running engine for {0} round(s)".format(self.total_rounds))
 
+        if self.config.engine_pipelined_rounds:
+            logger.info("Saving rounds in the background while the next round runs")
+            self._persister = RoundPersister(
+                current_app._get_current_object(),
+                self._save_round,
+                self._rebuild_round_caches,
+                self._discard_round,
+                self.current_round,
+            )
+
         while not self.is_last_round():
             # End any stale transaction so MySQL REPEATABLE READ gets a
             # fresh snapshot.  Without this, the pause loop would hold an
             # open transaction and never see the updated engine_paused value.
             self.db.session.rollback()
+            self._stop_if_persister_failed()
 
             if Setting.get_setting("engine_paused").value:
+                if self._persister is not None:
+                    # Finish saving earlier rounds so a rollback while paused sees all of them
+                    self._persister.wait()
                 pause_duration = int(Setting.get_setting("pause_duration").value)
                 logger.info("Engine Paused. Sleeping for {0} seconds".format(pause_duration))
                 self.sleep(pause_duration)
                 continue
 
-            # Re-sync round counter from DB (handles rollback while paused or between rounds)
+            # Re-sync round counter from DB (handles rollback while paused or between rounds).
+            # With pipelined rounds the rounds still being saved aren't in the db yet, so
+            # compare with the last round the persister committed instead.  That is read
+            # first: a round committed in between then only makes the db look further ahead.
+            if self._persister is None:
+                last_saved_round = self.current_round
+            else:
+                last_saved_round = self._persister.get_last_committed_round()
             db_round = Round.get_last_round_num()
-            if db_round < self.current_round:
+            if db_round < last_saved_round:
                 logger.warning(
                     "Round rollback detected: engine was at round %d, DB says %d. Re-syncing.",
                     self.current_round,
                     db_round,
                 )
+                if self._persister is not None:
+                    # Rounds run before the rollback must not be saved after it
+                    self._persister.discard_pending()
+                    db_round = Round.get_last_round_num()
+                    self._persister.last_committed_round = db_round
                 self.current_round = db_round
 
             self.current_round += 1
@@ -235,71 +341,100 @@ class Engine(object):
             round_start_time = datetime.now()
             self.round_running = True
             self.rounds_run += 1
+            # One snapshot of the SLA settings for everything this round does
+            sla_config = get_sla_config()
 
-            # Eager-load environments, properties, and accounts to avoid N+1 queries.
-            # Service.team is already lazy="joined" so it comes for free.
-            services = self.db.session.query(Service).options(
-                selectinload(Service.environments).selectinload(Environment.properties),
-                selectinload(Service.accounts),
-            ).all()[:]
-            logger.info("Loaded %d services from database", len(services))
-            random.shuffle(services)
+            dispatch_plan = self.get_dispatch_plan()
             jitter_max = self.config.task_jitter_max_delay
+            batch_size = self.config.task_batch_size
+            results_stream = RoundResultStream(self.current_round)
             task_ids = {}
             task_env_map = {}  # task_id -> environment_id for timeout fallback
-            for service in services:
-                check_class = self.check_name_to_obj(service.check_name)
-                if check_class is None:
-                    raise LookupError("Unable to map service to check code for " + str(service.check_name))
-                if not service.environments:
-                    logger.warning("Skipping %s - %s: no environments configured", service.team.name, service.name)
-                    continue
-                logger.debug("Adding " + service.team.name + " - " + service.name + " check to queue")
+            batches = {}  # worker queue -> [(team name, environment id, job)] when batching
+            for service in dispatch_plan.shuffled_services():
+                logger.debug("Adding " + service.team_name + " - " + service.name + " check to queue")
                 dispatch_start = time.time()
                 environment = random.choice(service.environments)
-                check_obj = check_class(environment)
-                command_str = check_obj.command()
-                job = Job(environment_id=environment.id, command=command_str)
+                command_str = random.choice(environment.commands)
+                job = Job(environment_id=environment.id, command=command_str, results_key=results_stream.key)
+                if self.config.worker_side_matching:
+                    job["matching_content"] = environment.matching_content
+                    job["matching_content_reject"] = environment.matching_content_reject
                 countdown = random.uniform(0, jitter_max) if jitter_max > 0 else 0
+                if batch_size > 0:
+                    # The worker waits out the jitter for each job of the batch
+                    job["delay"] = countdown
+                    batches.setdefault(service.worker_queue, []).append((service.team_name, environment.id, job))
+                    continue
                 task = execute_command.apply_async(args=[job], queue=service.worker_queue, countdown=countdown)
                 dispatch_elapsed = time.time() - dispatch_start
                 if dispatch_elapsed > 1.0:
                     logger.warning(
                         "Slow task dispatch: %s - %s took %.1fs (check=%s)",
-                        service.team.name, service.name, dispatch_elapsed, service.check_name,
+                        service.team_name, service.name, dispatch_elapsed, service.check_name,
                     )
-                team_name = environment.service.team.name
+                team_name = service.team_name
                 if team_name not in task_ids:
                     task_ids[team_name] = []
                 task_ids[team_name].append(task.id)
                 task_env_map[task.id] = environment.id
 
+            for queue, queued_jobs in batches.items():
+                for shard_start in range(0, len(queued_jobs), batch_size):
+                    shard = queued_jobs[shard_start:shard_start + batch_size]
+                    batch_id = uuid()
+                    for index, (team_name, environment_id, job) in enumerate(shard):
+                        job["job_id"] = batch_job_id(batch_id, index)
+                        task_ids.setdefault(team_name, []).append(job["job_id"])
+                        task_env_map[job["job_id"]] = environment_id
+                    # Every wave of concurrent jobs gets the usual per-check time limit
+                    soft_time_limit = jitter_max + 30 * math.ceil(len(shard) / BATCH_CONCURRENCY) + 30
+                    execute_commands.apply_async(
+                        args=[[job for _, _, job in shard]],
+                        queue=queue,
+                        task_id=batch_id,
+                        soft_time_limit=soft_time_limit,
+                        time_limit=soft_time_limit + 30,
+                    )
+                logger.info("Dispatched %d jobs to queue %s in batches of %d", len(queued_jobs), queue, batch_size)
+
             total_tasks = sum(len(ids) for ids in task_ids.values())
             logger.info("Dispatched %d tasks to %d team queues", total_tasks, len(task_ids))
 
             # This array keeps track of all current round objects
             # incase we need to backout any changes to prevent
             # inconsistent check results
-            cleanup_items = []
-
             try:
                 # We store the list of tasks in the db, so that the web app
                 # can consume them and can dynamically update a progress bar
                 task_ids_str = json.dumps(task_ids)
                 latest_kb = KB(name="task_ids", value=task_ids_str, round_num=self.current_round)
-                cleanup_items.append(latest_kb)
                 self.db.session.add(latest_kb)
                 self.db.session.commit()
                 logger.info("Saved task manifest to KB, waiting for workers")
 
+                # Pre-fetch all environments needed for result processing in one query
+                # so results can be scored as soon as they arrive
+                all_env_ids = list(set(task_env_map.values()))
+                env_query = (
+                    self.db.session.query(Environment)
+                    .options(selectinload(Environment.service))
+                    .filter(Environment.id.in_(all_env_ids))
+                    .all()
+                )
+                env_cache = {e.id: e for e in env_query}
+
                 completed_tasks = set()
-                pending_tasks = self.all_pending_tasks(task_ids, completed_tasks)
+                # task_id -> processed result, filled in as workers push results onto the round's stream
+                processed_results = {}
+                pending_tasks = set(task_env_map)
                 round_wait_start = time.time()
                 # Pre-fetch settings used in the wait loop
                 target_round_time = int(Setting.get_setting("target_round_time").value)
                 worker_refresh_time = int(Setting.get_setting("worker_refresh_time").value)
                 # Hard ceiling: 3x the target round time or 5 minutes, whichever is greater
                 max_round_wait = max(target_round_time * 3, 300)
+                stream_active = True
                 while pending_tasks:
                     elapsed = time.time() - round_wait_start
                     if elapsed >= max_round_wait:
@@ -308,117 +443,98 @@ class Engine(object):
                             elapsed,
                             len(pending_tasks),
                         )
-                        for stuck_task_id in pending_tasks:
+                        for stuck_task_id in {celery_task_id(task_id) for task_id in pending_tasks}:
                             execute_command.AsyncResult(stuck_task_id).revoke(terminate=True)
                         break
-                    waiting_info = "Waiting for all jobs to finish (sleeping " + str(worker_refresh_time) + " seconds)"
-                    waiting_info += " " + str(len(pending_tasks)) + " left in queue."
-                    logger.info(waiting_info)
-                    self.sleep(worker_refresh_time)
-                    pending_tasks = self.all_pending_tasks(task_ids, completed_tasks)
+
+                    if stream_active:
+                        try:
+                            finished_job = results_stream.pop(min(worker_refresh_time, max_round_wait - elapsed))
+                        except Exception:
+                            logger.warning(
+                                "Round result stream unavailable, polling result backend every %d seconds instead",
+                                worker_refresh_time,
+                                exc_info=True,
+                            )
+                            stream_active = False
+                            pending_tasks = set(self.all_pending_tasks(task_ids, completed_tasks))
+                            continue
+
+                        if finished_job is None:
+                            # Nothing arrived for a whole refresh interval. Reconcile with the
+                            # result backend in case a worker finished without pushing its result.
+                            pending_tasks = set(self.all_pending_tasks(task_ids, completed_tasks))
+                            logger.info("Waiting for all jobs to finish. %d left in queue.", len(pending_tasks))
+                            continue
+
+                        task_id = finished_job.get("task_id")
+                        if task_id not in pending_tasks:
+                            # Redelivered task or a result we already picked up from the backend
+                            continue
+                        pending_tasks.discard(task_id)
+                        completed_tasks.add(task_id)
+                        processed_results[task_id] = self._process_task_result(
+                            task_id, "SUCCESS", finished_job, env_cache, task_env_map
+                        )
+                    else:
+                        waiting_info = "Waiting for all jobs to finish (sleeping " + str(worker_refresh_time) + " seconds)"
+                        waiting_info += " " + str(len(pending_tasks)) + " left in queue."
+                        logger.info(waiting_info)
+                        self.sleep(worker_refresh_time)
+                        pending_tasks = set(self.all_pending_tasks(task_ids, completed_tasks))
                 else:
                     logger.info("All jobs have finished for this round")
+                results_stream.delete()
 
                 logger.info("Determining check results and saving to db")
-                round_obj = Round(round_start=round_start_time, number=self.current_round)
-                cleanup_items.append(round_obj)
-                self.db.session.add(round_obj)
-                self.db.session.commit()
 
-                # Pre-fetch all environments needed for result processing in one query
-                all_env_ids = list(set(task_env_map.values()))
-                env_query = (
-                    self.db.session.query(Environment)
-                    .options(selectinload(Environment.service))
-                    .filter(Environment.id.in_(all_env_ids))
-                    .all()
+                # Everything that didn't come in over the stream is read from the
+                # result backend in one batch
+                remaining_task_ids = [task_id for task_id in task_env_map if task_id not in processed_results]
+                fetch_start = time.time()
+                task_metas = fetch_task_results(execute_command, remaining_task_ids)
+                logger.info(
+                    "%d results streamed while waiting, fetched %d remaining results in %.2fs",
+                    len(processed_results),
+                    len(remaining_task_ids),
+                    time.time() - fetch_start,
                 )
-                env_cache = {e.id: e for e in env_query}
-
-                logger.info("Pre-fetched %d environments, processing task results", len(env_cache))
 
                 # We keep track of the number of passed and failed checks per round
                 # so we can report a little bit at the end of each round
                 teams = {}
                 processed_count = 0
+                # Check rows are collected as plain dicts and written with a single
+                # executemany instead of flushing one ORM object per check
+                check_rows = []
+                completed_timestamp = datetime.now(timezone.utc)
                 for team_name, task_ids in task_ids.items():
                     for task_id in task_ids:
-                        task_start = time.time()
-                        task = execute_command.AsyncResult(task_id)
-                        # Fetch meta once to avoid double deserialization of large results
-                        task_state = task.state
-                        task_result = task.result if task_state == "SUCCESS" else None
-                        task_elapsed = time.time() - task_start
                         processed_count += 1
                         if processed_count % 100 == 0:
                             logger.info("Processing results: %d/%d tasks", processed_count, total_tasks)
-                        if task_elapsed > 1.0:
-                            output_len = len(task_result.get("output", "")) if isinstance(task_result, dict) else 0
-                            logger.warning(
-                                "Slow task result fetch: task %s took %.1fs (state=%s, output_len=%d)",
-                                task_id, task_elapsed, task_state, output_len,
-                            )
 
-                        # Handle stuck/revoked/failed tasks via env mapping
-                        if task_result is None or not isinstance(task_result, dict):
-                            env_id = task_env_map.get(task_id)
-                            if env_id is None:
-                                logger.warning("No result or env mapping for task %s (state=%s), skipping", task_id, task_state)
-                                continue
-                            environment = env_cache.get(env_id)
-                            if environment is None:
-                                logger.warning("Environment %s not found for timed-out task %s, skipping", env_id, task_id)
-                                continue
-                            logger.warning(
-                                "Task %s stuck/failed (state=%s), marking %s - %s as timed out",
-                                task_id, task_state, environment.service.team.name, environment.service.name,
-                            )
-                            result = False
-                            reason = CHECK_TIMED_OUT_TEXT
-                            full_output = "Task did not complete within the round time limit."
+                        if task_id in processed_results:
+                            processed = processed_results[task_id]
                         else:
-                            environment = env_cache.get(task_result["environment_id"])
-                            if environment is None:
-                                logger.warning("Environment %s not found for task %s, skipping", task_result["environment_id"], task_id)
-                                continue
-                            full_output = task_result["output"][:5000]
-                            if task_result["errored_out"]:
-                                result = False
-                                reason = CHECK_TIMED_OUT_TEXT
-                            else:
-                                matched = self._safe_regex_search(
-                                    environment.matching_content, full_output, environment.id
-                                )
-                                if matched:
-                                    # Check reject pattern - if it matches, fail even though content matched
-                                    if environment.matching_content_reject:
-                                        rejected = self._safe_regex_search(
-                                            environment.matching_content_reject, full_output, environment.id
-                                        )
-                                        if rejected:
-                                            result = False
-                                            reason = CHECK_FAILURE_TEXT
-                                        else:
-                                            result = True
-                                            reason = CHECK_SUCCESS_TEXT
-                                    else:
-                                        result = True
-                                        reason = CHECK_SUCCESS_TEXT
-                                else:
-                                    result = False
-                                    reason = CHECK_FAILURE_TEXT
-
-                        if environment.service.team.name not in teams:
-                            teams[environment.service.team.name] = {
+                            task_meta = task_metas.get(task_id, {})
+                            task_state = task_meta.get("status", "PENDING")
+                            task_result = task_meta.get("result") if task_state == "SUCCESS" else None
+                            processed = self._process_task_result(
+                                task_id, task_state, task_result, env_cache, task_env_map
+                            )
+                        if processed is None:
+                            continue
+                        environment, result, reason, full_output, command = processed
+                        if team_name not in teams:
+                            teams[team_name] = {
                                 "Success": [],
                                 "Failed": [],
                             }
                         if result:
-                            teams[environment.service.team.name]["Success"].append(environment.service.name)
+                            teams[team_name]["Success"].append(environment.service.name)
                         else:
-                            teams[environment.service.team.name]["Failed"].append(environment.service.name)
-
-                        check = Check(service=environment.service, round=round_obj)
+                            teams[team_name]["Failed"].append(environment.service.name)
 
                         # TODO: File writes disabled for performance investigation.
                         # Re-enable once Redis output cap proves sufficient.
@@ -439,20 +555,27 @@ class Engine(object):
                         #     logger.warning("Failed to write check output to disk: %s", write_err)
 
                         # Store 5K in DB (matches Redis MAX_OUTPUT cap)
-                        command = task_result["command"] if task_result else ""
-                        check.finished(
-                            result=result,
-                            reason=reason,
-                            output=full_output[:5000],
-                            command=command,
+                        check_rows.append(
+                            Check.finished_row(
+                                round_id=None,
+                                service_id=environment.service_id,
+                                result=result,
+                                reason=reason,
+                                output=full_output[:5000],
+                                command=command,
+                                completed_timestamp=completed_timestamp,
+                            )
                         )
-                        cleanup_items.append(check)
-                        self.db.session.add(check)
-                logger.info("Processed %d check results, committing to database", total_tasks)
-                round_end_time = datetime.now()
-                round_obj.round_end = round_end_time
-                self.db.session.commit()
-                logger.info("Database commit complete")
+                # The Round row is only created once all of its checks are ready
+                # so that it's written in the same transaction as them
+                finished_round = FinishedRound(self.current_round, round_start_time, check_rows, sla_config)
+                if self._persister is not None:
+                    logger.info("Processed %d check results, saving them in the background", total_tasks)
+                    self._persister.submit(finished_round)
+                    round_end_time = datetime.now()
+                else:
+                    logger.info("Processed %d check results, committing to database", total_tasks)
+                    round_end_time = self._save_round(finished_round)
 
             except Exception as e:
                 # We got an error while writing to db (could be normal docker stop command)
@@ -461,12 +584,13 @@ class Engine(object):
                 logger.error("Error received while writing check results to db")
                 logger.exception(e)
                 logger.error("Ending round and cleaning up the db")
-                for cleanup_item in cleanup_items:
-                    try:
-                        self.db.session.delete(cleanup_item)
-                        self.db.session.commit()
-                    except Exception:
-                        pass
+                if self._persister is not None:
+                    # Earlier rounds are still consistent, let them finish saving first
+                    self._persister.wait()
+                try:
+                    self._discard_round(self.current_round)
+                except Exception:
+                    pass
                 sys.exit(1)
 
             logger.info("Finished Round " + str(self.current_round))
@@ -480,8 +604,10 @@ class Engine(object):
                     stat_string += " (" + ", ".join(teams[team_name]["Failed"]) + ")"
                 logger.info(stat_string)
 
-            logger.info("Updating Caches")
-            update_all_cache(current_app)
+            if self._persister is None:
+                logger.info("Updating Caches")
+                changes = get_round_changes(self.db.session, self.current_round)
+                update_round_cache(current_app, changes, sla_config)
 
             # Clear session identity map to prevent bloat across rounds.
             # Without this, the session accumulates hundreds of objects per round
@@ -504,4 +630,9 @@ class Engine(object):
                         f"Service checks lasted {abs(round_delta)}s longer than round length ({target_round_time}s). Starting next round immediately"
                     )
 
+        if self._persister is not None:
+            logger.info("Waiting for the last rounds to be saved")
+            self._persister.wait()
+            self._stop_if_persister_failed()
+
         logger.info("Engine finished running")
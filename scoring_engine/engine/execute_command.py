@@ -1,29 +1,105 @@
 import subprocess
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_init
 
 from scoring_engine.celery_app import celery_app
+from scoring_engine.config import config
+from scoring_engine.engine import async_executor, native_runners
+from scoring_engine.engine.basic_check import CHECK_FAILURE_TEXT, CHECK_SUCCESS_TEXT
+from scoring_engine.engine.matcher import ContentMatcher
+from scoring_engine.engine.result_stream import push_result
 from scoring_engine.logger import logger
 
+# Output returned alongside a verdict when the worker did the matching
+EXCERPT_LENGTH = 500
 
-@celery_app.task(name="execute_command", acks_late=True, reject_on_worker_lost=True, soft_time_limit=30, time_limit=60)
-def execute_command(job):
+# Jobs of a batch that run at the same time
+BATCH_CONCURRENCY = 50
+
+# One matcher per task thread: a search that times out terminates its
+# matcher's helper, which mustn't cut off the searches of other threads
+_local = threading.local()
+
+
+def _get_matcher():
+    matcher = getattr(_local, "matcher", None)
+    if matcher is None:
+        matcher = _local.matcher = ContentMatcher(processes=1)
+    return matcher
+
+
+def _close_matcher():
+    """Stop the calling thread's matcher helper, if it started one."""
+    matcher = getattr(_local, "matcher", None)
+    if matcher is not None:
+        matcher.close()
+
+
+def match_output(job, output):
+    """Score *output* against the patterns carried by *job*.
+
+    Returns a ``(result, reason)`` tuple.
+    """
+    matched = _get_matcher().match(
+        job["environment_id"], job["matching_content"], job.get("matching_content_reject"), output
+    )
+    if matched:
+        return True, CHECK_SUCCESS_TEXT
+    return False, CHECK_FAILURE_TEXT
+
+
+@worker_init.connect
+def preload_native_runners(**kwargs):
+    # Runs before the worker forks its pool, so every pool process shares the imports
+    if config.worker_native_checks:
+        native_runners.preload()
+
+
+def run_native(runner, args):
+    """Run a native check runner, reporting crashes like a failed script would."""
+    try:
+        return runner(args)
+    except SoftTimeLimitExceeded:
+        raise
+    except Exception:
+        return traceback.format_exc()
+
+
+def run_job(job, task_id, allow_native=True):
+    """Run a single job's command and fill in its ``output``/``errored_out``."""
     output = ""
     # Disable duplicate celery log messages
     if logger.propagate:
         logger.propagate = False
     logger.info("Running cmd for " + str(job))
+    use_asyncio = config.worker_executor == "asyncio"
+    # Native runners redirect stdout for the whole process, which threads can't share
+    native = None
+    if config.worker_native_checks and allow_native and not use_asyncio:
+        native = native_runners.parse_command(job["command"])
     try:
-        cmd_result = subprocess.run(
-            job["command"],
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            timeout=30,
-            start_new_session=True,
-        )
-        output = cmd_result.stdout.decode("utf-8", errors="replace")
-        job["errored_out"] = False
+        if use_asyncio:
+            output, errored_out = async_executor.run_command_threadsafe(job["command"])
+            job["errored_out"] = errored_out
+        elif native is not None:
+            output = run_native(*native)
+            job["errored_out"] = False
+        else:
+            cmd_result = subprocess.run(
+                job["command"],
+                shell=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=30,
+                start_new_session=True,
+            )
+            output = cmd_result.stdout.decode("utf-8", errors="replace")
+            job["errored_out"] = False
     except subprocess.TimeoutExpired as e:
         job["errored_out"] = True
         if e.output:
@@ -35,4 +111,43 @@ def execute_command(job):
     # serialization overhead on every AsyncResult.state/.result call.
     MAX_OUTPUT = 5000
     job["output"] = output[:MAX_OUTPUT]
+    if "matching_content" in job:
+        # The engine asked us to score the output, so only an excerpt needs to go back
+        if not job["errored_out"]:
+            job["result"], job["reason"] = match_output(job, job["output"])
+        job["output"] = job["output"][:EXCERPT_LENGTH]
+        del job["matching_content"]
+        job.pop("matching_content_reject", None)
+    # Let the engine know this job is done without waiting for it to poll
+    push_result(job, task_id)
     return job
+
+
+@celery_app.task(name="execute_command", acks_late=True, reject_on_worker_lost=True, soft_time_limit=30, time_limit=60)
+def execute_command(job):
+    return run_job(job, execute_command.request.id)
+
+
+@celery_app.task(name="execute_commands", acks_late=True, reject_on_worker_lost=True)
+def execute_commands(jobs):
+    """Run a batch of jobs concurrently and return them in the same order.
+
+    Each job waits for its own ``delay`` (the round jitter) before it runs, and
+    is pushed onto the round's result stream under its ``job_id`` as soon as
+    it finishes.  Time limits are set per batch by the engine.
+    """
+
+    def run_one(job):
+        delay = job.pop("delay", 0)
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            return run_job(job, job["job_id"], allow_native=False)
+        finally:
+            # The batch's threads exit with it, so they can't keep a helper
+            _close_matcher()
+
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(jobs), BATCH_CONCURRENCY)) as pool:
+        return list(pool.map(run_one, jobs))
@@ -0,0 +1,22 @@
+"""Regex searches run in the matcher's helper processes.
+
+Kept apart from :mod:`scoring_engine.engine.matcher` so that a helper only
+imports this module: helpers are spawned, and unpickling the search function
+must not pull in the engine, the database or Celery.
+"""
+
+import re
+
+# Compiled patterns held by each helper process
+MAX_PATTERNS = 1024
+
+_patterns = {}
+
+
+def search(key, pattern, text):
+    compiled = _patterns.get(key)
+    if compiled is None:
+        if len(_patterns) >= MAX_PATTERNS:
+            _patterns.clear()
+        compiled = _patterns[key] = re.compile(pattern)
+    return compiled.search(text) is not None
@@ -0,0 +1,193 @@
+"""Matching check output against an environment's matching_content.
+
+Patterns are compiled once per environment and kept until the pattern text
+changes, instead of being recompiled for every check.  Searches run in a
+helper process, so they can be cut off after ``MATCH_TIMEOUT`` seconds
+without installing a SIGALRM handler around every search: the stuck helper
+is terminated and restarted for the next search.  Only outputs of at most
+``IN_PROCESS_MAX_LENGTH`` characters are searched in process, and only with
+patterns that :func:`can_run_away` doesn't flag, since no such search can
+take long.  As before, a pattern that times out or doesn't compile falls
+back to a literal match.
+
+Helpers are spawned, so the scripts that can end up using them (bin/engine
+and bin/worker) only start running under ``if __name__ == "__main__":``.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from scoring_engine.engine import match_helper
+from scoring_engine.logger import logger
+
+# Seconds a single search may take before we give up on the regex
+MATCH_TIMEOUT = 5
+
+# Number of helper processes used for searches
+POOL_SIZE = min(4, os.cpu_count() or 1)
+
+# Longest output searched in process.  Even a pattern that backtracks in
+# polynomial time is done with an output this short in a few milliseconds.
+IN_PROCESS_MAX_LENGTH = 1024
+
+_REPEATS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+
+# Unbounded repeats a pattern may have before it's searched in a helper
+_MAX_UNBOUNDED_REPEATS = 2
+
+
+def _pattern_key(environment_id, pattern):
+    return (environment_id, hashlib.sha1(pattern.encode("utf-8")).hexdigest())
+
+
+def can_run_away(pattern):
+    """Return True if a search with *pattern* may backtrack for too long.
+
+    Only a hint for which short outputs can be searched in process, a long
+    output is searched in a helper whatever the pattern.  Repeats nested in
+    repeats (``(a+)+``), alternatives under a repeat (``(a|ab)*``) and
+    backreferences can take exponential time, and a chain of more than two
+    unbounded repeats (``a.*b.*c.*d``) polynomial time in the length of the
+    output.  *pattern* must compile.
+    """
+    unbounded = 0
+
+    def visit(items, repeated):
+        nonlocal unbounded
+        for op, av in items:
+            name = op.name
+            if name in ("GROUPREF", "GROUPREF_EXISTS"):
+                return True
+            if name in _REPEATS:
+                _, high, body = av
+                if repeated and high > 1:
+                    return True
+                if high == sre_parse.MAXREPEAT:
+                    unbounded += 1
+                if visit(body, repeated or high > 1):
+                    return True
+            elif name == "BRANCH":
+                if repeated or any(visit(branch, repeated) for branch in av[1]):
+                    return True
+            elif name == "SUBPATTERN":
+                if visit(av[-1], repeated):
+                    return True
+            elif name in ("ASSERT", "ASSERT_NOT"):
+                if visit(av[1], repeated):
+                    return True
+            elif name == "ATOMIC_GROUP":
+                if visit(av, repeated):
+                    return True
+        return False
+
+    return visit(sre_parse.parse(pattern), False) or unbounded > _MAX_UNBOUNDED_REPEATS
+
+
+class ContentMatcher(object):
+    """Compiled-pattern cache plus the helper pool the searches run in."""
+
+    def __init__(self, timeout=MATCH_TIMEOUT, processes=POOL_SIZE):
+        self.timeout = timeout
+        self.processes = processes
+        # environment_id -> (key, compiled pattern, or None when it's only
+        # searched in a helper, or False when it doesn't compile)
+        self._patterns = {}
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = multiprocessing.get_context("spawn").Pool(processes=self.processes)
+            return self._pool
+
+    def _compile(self, environment_id, pattern):
+        key = _pattern_key(environment_id, pattern)
+        cached = self._patterns.get(environment_id)
+        if cached is not None and cached[0] == key:
+            return cached
+        # New environment or the pattern was edited since we last saw it
+        try:
+            compiled = re.compile(pattern)
+        except re.error:
+            logger.warning(
+                "Invalid regex pattern for environment %s: %r, falling back to literal match",
+                environment_id,
+                pattern,
+            )
+            compiled = False
+        else:
+            if can_run_away(pattern):
+                compiled = None
+        self._patterns[environment_id] = (key, compiled)
+        return key, compiled
+
+    def search(self, environment_id, pattern, text):
+        """Return True if *pattern* matches anywhere in *text*."""
+        key, compiled = self._compile(environment_id, pattern)
+        if compiled is False:
+            return pattern in text
+        if compiled is not None and len(text) <= IN_PROCESS_MAX_LENGTH:
+            return compiled.search(text) is not None
+        try:
+            return self._get_pool().apply_async(match_helper.search, (key, pattern, text)).get(self.timeout)
+        except multiprocessing.TimeoutError:
+            logger.warning(
+                "Regex timed out after %ds for environment %s, pattern %r — falling back to literal match",
+                self.timeout,
+                environment_id,
+                pattern,
+            )
+            # The helper is still stuck in the search, throw the pool away
+            self.close()
+            return pattern in text
+
+    def matches(self, environment, text):
+        """Return True if *text* satisfies the environment's patterns.
+
+        The output has to match ``matching_content`` and must not match
+        ``matching_content_reject`` (if one is set).
+        """
+        return self.match(environment.id, environment.matching_content, environment.matching_content_reject, text)
+
+    def match(self, environment_id, matching_content, matching_content_reject, text):
+        """Same as :meth:`matches` for callers that only have the raw patterns."""
+        if not self.search(environment_id, matching_content, text):
+            return False
+        if matching_content_reject:
+            # Reject patterns are cached under their own key
+            return not self.search((environment_id, "reject"), matching_content_reject, text)
+        return True
+
+    def invalidate(self, environment_id=None):
+        """Forget the compiled patterns for one environment, or all of them."""
+        if environment_id is None:
+            self._patterns.clear()
+        else:
+            self._patterns.pop(environment_id, None)
+            self._patterns.pop((environment_id, "reject"), None)
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
+
+
+_matcher = None
+
+
+def get_matcher():
+    """Return the process-wide :class:`ContentMatcher`."""
+    global _matcher
+    if _matcher is None:
+        _matcher = ContentMatcher()
+    return _matcher
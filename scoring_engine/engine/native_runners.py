@@ -0,0 +1,116 @@
+"""Run the Python check scripts inside the worker instead of forking for them.
+
+Most of the scripts in ``checks/bin`` are plain Python.  Running them through
+``subprocess.run(shell=True)`` costs a shell, a fresh interpreter and a fresh
+import of paramiko/impacket/pywinrm for every single check.  The runners
+registered here execute the script's code directly in the Celery worker
+process, which is already one of Celery's pre-forked pool processes, so the
+heavy modules are imported once (before the pool forks) and reused by every
+check afterwards.
+
+A runner is a callable that takes the script's command line arguments and
+returns the text the script would have written to stdout/stderr.
+"""
+
+import builtins
+import contextlib
+import importlib
+import io
+import os
+import sys
+
+from scoring_engine.engine.basic_check import CHECKS_BIN_PATH, split_command
+from scoring_engine.logger import logger
+
+_runners = {}
+_preload_modules = set()
+
+
+def register_runner(name, runner, preload=()):
+    """Register *runner* for the ``checks/bin`` script called *name*.
+
+    Args:
+        name: file name of the script in ``checks/bin``
+        runner: callable taking a list of arguments and returning the output
+        preload: modules to import before the worker pool forks
+    """
+    _runners[name] = runner
+    _preload_modules.update(preload)
+
+
+def get_runner(name):
+    return _runners.get(name)
+
+
+class ScriptRunner(object):
+    """Execute a ``checks/bin`` Python script in the current process."""
+
+    def __init__(self, path):
+        self.path = path
+        self._code = None
+
+    def _compile(self):
+        if self._code is None:
+            with open(self.path) as script:
+                self._code = compile(script.read(), self.path, "exec")
+        return self._code
+
+    def __call__(self, args):
+        code = self._compile()
+        output = io.StringIO()
+        script_globals = {"__name__": "__main__", "__file__": self.path, "__builtins__": builtins}
+        old_argv = sys.argv
+        sys.argv = [self.path] + list(args)
+        try:
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                try:
+                    exec(code, script_globals)
+                except SystemExit as e:
+                    # sys.exit("message") prints the message, same as the interpreter would
+                    if isinstance(e.code, str):
+                        print(e.code, file=sys.stderr)
+        finally:
+            sys.argv = old_argv
+        return output.getvalue()
+
+
+def parse_command(command):
+    """Split a check command into ``(runner, args)``.
+
+    Returns None if the command doesn't run a registered script, or needs a
+    shell to run.
+    """
+    argv = split_command(command)
+    if argv is None or os.path.dirname(argv[0]) != CHECKS_BIN_PATH:
+        return None
+    runner = get_runner(os.path.basename(argv[0]))
+    if runner is None:
+        return None
+    return runner, argv[1:]
+
+
+def preload():
+    """Import the modules the registered runners need.
+
+    Called in the worker's parent process so that the forked pool processes
+    inherit them.  Modules that aren't installed are skipped; the scripts
+    that need them will fail the same way they would in a subprocess.
+    """
+    for module_name in sorted(_preload_modules):
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            logger.warning("Unable to preload %s for native check runners", module_name)
+
+
+for _script, _modules in (
+    ("elasticsearch_check", ("requests",)),
+    ("ftp_check", ("ftplib",)),
+    ("smb_check", ("smb.SMBConnection",)),
+    ("smtp_check", ("smtplib",)),
+    ("smtps_check", ("smtplib",)),
+    ("ssh_check", ("paramiko",)),
+    ("telnet_check", ("telnetlib",)),
+    ("winrm_check", ("winrm",)),
+):
+    register_runner(_script, ScriptRunner(os.path.join(CHECKS_BIN_PATH, _script)), preload=_modules)
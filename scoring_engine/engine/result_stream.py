@@ -0,0 +1,91 @@
+"""Per-round completion stream between the workers and the engine.
+
+Every job dispatched for a round carries the name of a Redis list.  When a
+worker finishes a job it pushes the finished job onto that list, and the
+engine pops results off it as they arrive instead of polling the Celery
+result backend for every outstanding task.  The Celery result backend is
+still written as usual, so the engine can always fall back to it for tasks
+whose result never made it onto the list (worker crash, Redis hiccup, ...).
+"""
+
+import json
+
+import redis
+
+from scoring_engine.config import config
+from scoring_engine.logger import logger
+
+KEY_PREFIX = "se:round_results:"
+
+# Results only need to live until the engine has consumed the round.
+# Matches the Celery ``result_expires`` window with some slack.
+RESULT_TTL = 600
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis(
+            host=config.redis_host,
+            port=config.redis_port,
+            password=config.redis_password,
+            socket_connect_timeout=5,
+        )
+    return _redis_client
+
+
+def round_results_key(round_num):
+    """Return the Redis list name used to stream results for *round_num*."""
+    return "{0}{1}".format(KEY_PREFIX, round_num)
+
+
+def push_result(job, task_id=None):
+    """Push a finished job onto its round's result list.
+
+    Jobs without a ``results_key`` (e.g. admin dry runs) are ignored.  Pushing
+    is best-effort: the engine reconciles against the Celery result backend,
+    so a failure here only delays the round instead of losing the result.
+    """
+    key = job.get("results_key")
+    if not key:
+        return
+    payload = dict(job)
+    payload["task_id"] = task_id
+    try:
+        pipe = _get_redis().pipeline()
+        pipe.rpush(key, json.dumps(payload))
+        pipe.expire(key, RESULT_TTL)
+        pipe.execute()
+    except Exception:
+        logger.warning("Unable to push result for task %s onto %s", task_id, key, exc_info=True)
+
+
+class RoundResultStream(object):
+    """Consume the finished jobs for a single round as workers push them."""
+
+    def __init__(self, round_num):
+        self.key = round_results_key(round_num)
+
+    def pop(self, timeout):
+        """Block up to *timeout* seconds for the next finished job.
+
+        Returns the job dict, or None if nothing arrived in time.  Connection
+        errors are raised so the caller can fall back to polling.
+        """
+        # BLPOP treats a timeout of 0 as "block forever"
+        item = _get_redis().blpop([self.key], timeout=max(int(timeout), 1))
+        if item is None:
+            return None
+        try:
+            return json.loads(item[1])
+        except (TypeError, ValueError):
+            logger.warning("Discarding malformed result on %s", self.key)
+            return None
+
+    def delete(self):
+        try:
+            _get_redis().delete(self.key)
+        except Exception:
+            pass
@@ -0,0 +1,130 @@
+"""Background persistence stage for pipelined rounds.
+
+With ``engine_pipelined_rounds`` enabled, the engine hands each finished
+round to a :class:`RoundPersister` and goes straight on to the next round
+while the checks are written and the caches rebuilt in the background.
+
+Ordering guarantees:
+
+* Rounds are saved one at a time, in the order they were submitted, so Round
+  numbers are always committed in increasing order.
+* Once saving a round fails, nothing after it is saved.  The failed round and
+  every round queued behind it are discarded (their checks, Round row and
+  task manifest removed), and the engine stops at its next checkpoint.
+* A committed round is never discarded.  If rebuilding its caches fails the
+  rebuild is retried, before the next round's and whenever the persister is
+  idle, but the round and the rounds after it are still saved.
+"""
+
+import queue
+import threading
+from collections import namedtuple
+
+from scoring_engine.logger import logger
+
+# A round whose results have all been collected, waiting to be saved, with
+# the SLA settings snapshot it was run with
+FinishedRound = namedtuple("FinishedRound", ["number", "start_time", "check_rows", "sla_config"], defaults=[None])
+
+
+class RoundPersister(object):
+    """Save finished rounds on a background thread, strictly in order.
+
+    Args:
+        app: Flask app, a context of which is pushed for the background thread
+        save_round: callable saving a :data:`FinishedRound`
+        rebuild_caches: callable rebuilding the caches of a saved :data:`FinishedRound`
+        discard_round: callable removing every trace of a round number
+        last_committed_round: number of the last round already in the db
+    """
+
+    # Seconds to wait before retrying a failed cache rebuild when no round comes in
+    CACHE_RETRY_INTERVAL = 5
+
+    def __init__(self, app, save_round, rebuild_caches, discard_round, last_committed_round=0):
+        self.app = app
+        self.save_round = save_round
+        self.rebuild_caches = rebuild_caches
+        self.discard_round = discard_round
+        self.last_committed_round = last_committed_round
+        self.failed = threading.Event()
+        self._discarding = False
+        # Saved rounds whose caches still have to be rebuilt, oldest first
+        self._stale_rounds = []
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="round-persister", daemon=True)
+        self._thread.start()
+
+    def get_last_committed_round(self):
+        """Return the number of the last round this persister committed.
+
+        A round is committed before this number moves past it, so a db read
+        made after this call sees at least that round.
+        """
+        with self._lock:
+            return self.last_committed_round
+
+    def submit(self, finished_round):
+        self._queue.put(finished_round)
+
+    def wait(self):
+        """Block until every submitted round has been saved or discarded."""
+        self._queue.join()
+
+    def discard_pending(self):
+        """Drop every round that hasn't been saved yet (e.g. after a rollback)."""
+        with self._lock:
+            self._discarding = True
+        self.wait()
+        with self._lock:
+            self._discarding = False
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                try:
+                    finished_round = self._queue.get(timeout=self.CACHE_RETRY_INTERVAL if self._stale_rounds else None)
+                except queue.Empty:
+                    self._rebuild_stale_caches()
+                    continue
+                try:
+                    self._handle(finished_round)
+                finally:
+                    self._queue.task_done()
+
+    def _handle(self, finished_round):
+        with self._lock:
+            skip = self._discarding or self.failed.is_set()
+        if skip:
+            logger.warning("Discarding round %d without saving it", finished_round.number)
+            self._discard(finished_round.number)
+            return
+        try:
+            self.save_round(finished_round)
+        except Exception:
+            logger.exception("Error saving round %d in the background", finished_round.number)
+            self.failed.set()
+            self._discard(finished_round.number)
+            return
+        with self._lock:
+            self.last_committed_round = finished_round.number
+        # The round is committed from here on, a cache failure doesn't undo it
+        self._stale_rounds.append(finished_round._replace(check_rows=[]))
+        self._rebuild_stale_caches()
+
+    def _rebuild_stale_caches(self):
+        while self._stale_rounds:
+            finished_round = self._stale_rounds[0]
+            try:
+                self.rebuild_caches(finished_round)
+            except Exception:
+                logger.exception("Error rebuilding the caches for round %d, retrying later", finished_round.number)
+                return
+            self._stale_rounds.pop(0)
+
+    def _discard(self, round_number):
+        try:
+            self.discard_round(round_number)
+        except Exception:
+            logger.exception("Unable to clean up round %d", round_number)
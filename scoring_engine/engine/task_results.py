@@ -0,0 +1,91 @@
+"""Bulk reads from the Celery result backend.
+
+``AsyncResult(task_id).state`` costs one Redis GET per task, which adds up to
+thousands of round trips per poll for a large competition.  This module reads
+the ``celery-task-meta-*`` keys for many tasks at once using pipelined MGETs
+and decodes each payload exactly once.
+
+Jobs dispatched in batches (see ``execute_commands``) don't have a Celery task
+of their own.  Their ids are ``<batch task id>:<index>``, and their result is
+the entry at that index of the batch's result.
+"""
+
+from celery.backends.redis import RedisBackend
+
+# Number of keys requested per MGET. Large enough to keep the number of
+# commands low, small enough that a single reply doesn't stall Redis.
+MGET_CHUNK_SIZE = 500
+
+BATCH_SEPARATOR = ":"
+
+
+def batch_job_id(batch_task_id, index):
+    """Return the id of the job at *index* of a batch task."""
+    return "{0}{1}{2}".format(batch_task_id, BATCH_SEPARATOR, index)
+
+
+def celery_task_id(job_id):
+    """Return the id of the Celery task that runs *job_id*."""
+    return job_id.split(BATCH_SEPARATOR, 1)[0]
+
+
+def fetch_task_results(task, task_ids, chunk_size=MGET_CHUNK_SIZE):
+    """Return the stored result metadata for a batch of tasks.
+
+    Args:
+        task: the Celery task the ids belong to (its backend is used)
+        task_ids: iterable of task ids
+        chunk_size: number of keys per MGET
+
+    Returns:
+        dict of task_id -> meta dict (``status``, ``result``, ...).  Tasks that
+        have no stored result yet (PENDING) are left out.
+    """
+    task_ids = list(task_ids)
+    if not any(BATCH_SEPARATOR in task_id for task_id in task_ids):
+        return _fetch_metas(task, task_ids, chunk_size)
+
+    # Each batch is read once and split back up into its jobs
+    celery_metas = _fetch_metas(task, {celery_task_id(task_id) for task_id in task_ids}, chunk_size)
+    metas = {}
+    for task_id in task_ids:
+        celery_id, _, index = task_id.partition(BATCH_SEPARATOR)
+        meta = celery_metas.get(celery_id)
+        if meta is None:
+            continue
+        if not index:
+            metas[task_id] = meta
+        elif meta.get("status") == "SUCCESS" and isinstance(meta.get("result"), list):
+            metas[task_id] = {"status": "SUCCESS", "result": meta["result"][int(index)]}
+        else:
+            # The whole batch failed or was revoked
+            metas[task_id] = {"status": meta.get("status"), "result": None}
+    return metas
+
+
+def _fetch_metas(task, task_ids, chunk_size):
+    task_ids = list(task_ids)
+    metas = {}
+    if not task_ids:
+        return metas
+
+    backend = task.backend
+    if isinstance(backend, RedisBackend):
+        chunks = [task_ids[i:i + chunk_size] for i in range(0, len(task_ids), chunk_size)]
+        # All chunks go out in a single round trip
+        pipe = backend.client.pipeline(transaction=False)
+        for chunk in chunks:
+            pipe.mget([backend.get_key_for_task(task_id) for task_id in chunk])
+        for chunk, values in zip(chunks, pipe.execute()):
+            for task_id, value in zip(chunk, values):
+                if value is not None:
+                    metas[task_id] = backend.decode_result(value)
+        return metas
+
+    # Other result backends don't support MGET, so ask for each task individually
+    for task_id in task_ids:
+        async_result = task.AsyncResult(task_id)
+        state = async_result.state
+        if state != "PENDING":
+            metas[task_id] = {"status": state, "result": async_result.result}
+    return metas
@@ -2,8 +2,8 @@ import html
 from datetime import datetime, timezone
 
 import pytz
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Text, UnicodeText
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Text, column, delete, exists, select
+from sqlalchemy.orm import deferred, relationship
 
 
 def _ensure_utc_aware(dt):
@@ -19,22 +19,57 @@ def _ensure_utc_aware(dt):
 
 from scoring_engine.config import config
 from scoring_engine.models.base import Base
+from scoring_engine.models.check_output import CheckOutput
 
 
 class Check(Base):
     __tablename__ = "checks"
+    __table_args__ = (
+        # A service's history, newest first (last_ten_checks, streaks, paging)
+        Index("ix_checks_service_round", "service_id", "round_id", "id"),
+        # A round's checks (round scores, team services status, overview)
+        Index("ix_checks_round_service", "round_id", "service_id"),
+        # A service's completed checks, newest first (get_consecutive_failures)
+        Index("ix_checks_service_completed_round", "service_id", "completed", "round_id"),
+        # Passing checks per service (score_earned, service ranks)
+        Index("ix_checks_service_result", "service_id", "result"),
+        # Passing checks per round, only where partial indexes exist
+        Index(
+            "ix_checks_passed_round",
+            "round_id",
+            "service_id",
+            sqlite_where=column("result").is_(True),
+            postgresql_where=column("result").is_(True),
+        ).ddl_if(dialect=("sqlite", "postgresql")),
+    )
     id = Column(Integer, primary_key=True)
     round_id = Column(Integer, ForeignKey("rounds.id"))
     round = relationship("Round", back_populates="checks")
     service_id = Column(Integer, ForeignKey("services.id"))
     service = relationship("Service")
     result = Column(Boolean)
-    output = Column(UnicodeText, default="")
+    # Output and command are the bulk of a row: they're only loaded when
+    # accessed, or by the views displaying them (undefer_group("output") for
+    # the command, joinedload(Check.check_output) for the output).
+    # Identical outputs are stored once in check_outputs, see CheckOutput.
+    # Indexed for delete_round_checks, which looks for outputs no check uses
+    output_id = Column(Integer, ForeignKey("check_outputs.id"), index=True)
+    check_output = relationship(CheckOutput)
     reason = Column(Text, default="")
-    command = Column(Text, default="")
+    command = deferred(Column(Text, default=""), group="output")
     completed_timestamp = Column(DateTime)
     completed = Column(Boolean, default=False)
 
+    @property
+    def output(self):
+        if self.check_output is None:
+            return ""
+        return self.check_output.output
+
+    @output.setter
+    def output(self, output):
+        self.check_output = CheckOutput.for_output(output)
+
     def finished(self, result, reason, output, command):
         self.result = result
         self.reason = reason
@@ -43,6 +78,26 @@ class Check(Base):
         self.completed_timestamp = datetime.now(timezone.utc)
         self.command = command
 
+    @staticmethod
+    def finished_row(round_id, service_id, result, reason, output, command, completed_timestamp=None):
+        """Column values for a finished check, mirroring :meth:`finished`.
+
+        Used to bulk insert a whole round through ``Check.__table__`` without
+        building an ORM object per check.  The ``output`` key isn't a column:
+        it's replaced by an ``output_id`` from :func:`store_check_outputs`
+        before the rows are inserted.
+        """
+        return {
+            "round_id": round_id,
+            "service_id": service_id,
+            "result": result,
+            "reason": reason,
+            "output": html.escape(output),
+            "command": command,
+            "completed": True,
+            "completed_timestamp": completed_timestamp or datetime.now(timezone.utc),
+        }
+
     @property
     def local_completed_timestamp(self):
         return (
@@ -50,3 +105,20 @@ class Check(Base):
             .astimezone(pytz.timezone(config.timezone))
             .strftime("%Y-%m-%d %H:%M:%S %Z")
         )
+
+
+def delete_round_checks(session, round_ids):
+    """Delete the checks of the given rounds, and the outputs no other check uses."""
+    output_ids = [
+        output_id
+        for (output_id,) in session.execute(
+            select(Check.output_id).where(Check.round_id.in_(round_ids), Check.output_id.isnot(None)).distinct()
+        )
+    ]
+    session.execute(delete(Check.__table__).where(Check.round_id.in_(round_ids)))
+    if output_ids:
+        session.execute(
+            delete(CheckOutput.__table__).where(
+                CheckOutput.id.in_(output_ids), ~exists().where(Check.output_id == CheckOutput.id)
+            )
+        )
@@ -0,0 +1,79 @@
+import hashlib
+
+from sqlalchemy import Column, Integer, String, event, insert
+from sqlalchemy.orm import Session
+
+from scoring_engine.db import db
+from scoring_engine.models.base import Base
+from scoring_engine.models.compressed_text import CompressedText
+
+# session.info key of the outputs handed out by CheckOutput.for_output in the
+# session's current transaction, by digest
+SESSION_OUTPUTS_KEY = "check_outputs"
+
+
+class CheckOutput(Base):
+    """One distinct check output, shared by every check that returned it.
+
+    Services return the same output round after round, so checks reference
+    their output by the SHA-256 of its stored (html escaped) text, and each
+    distinct output is stored once.
+    """
+
+    __tablename__ = "check_outputs"
+    id = Column(Integer, primary_key=True)
+    digest = Column(String(64), nullable=False, unique=True)
+    output = Column(CompressedText, nullable=False)
+
+    @staticmethod
+    def digest_of(output):
+        return hashlib.sha256(output.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def for_output(cls, output):
+        """Return the stored :class:`CheckOutput` for *output*, or a new one.
+
+        A new one is shared by every check of the transaction that gets the
+        same output, even the checks that aren't in the session yet.
+        """
+        digest = cls.digest_of(output)
+        outputs = db.session.info.setdefault(SESSION_OUTPUTS_KEY, {})
+        check_output = outputs.get(digest)
+        if check_output is None:
+            with db.session.no_autoflush:
+                check_output = db.session.query(cls).filter(cls.digest == digest).one_or_none()
+            if check_output is None:
+                check_output = cls(digest=digest, output=output)
+            outputs[digest] = check_output
+        return check_output
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_session_outputs(session):
+    # After a commit the new outputs are found in the db, after a rollback they're gone
+    session.info.pop(SESSION_OUTPUTS_KEY, None)
+
+
+def store_check_outputs(session, outputs):
+    """Make sure every one of *outputs* is stored and return their ids.
+
+    Returns a dict of output text to ``check_outputs.id``.  Outputs that
+    aren't stored yet are inserted with a single executemany.
+    """
+    outputs_by_digest = {CheckOutput.digest_of(output): output for output in set(outputs)}
+    if not outputs_by_digest:
+        return {}
+
+    def stored_ids(digests):
+        return dict(session.query(CheckOutput.digest, CheckOutput.id).filter(CheckOutput.digest.in_(digests)))
+
+    ids = stored_ids(list(outputs_by_digest))
+    missing = [digest for digest in outputs_by_digest if digest not in ids]
+    if missing:
+        session.execute(
+            insert(CheckOutput.__table__),
+            [{"digest": digest, "output": outputs_by_digest[digest]} for digest in missing],
+        )
+        ids.update(stored_ids(missing))
+    return {outputs_by_digest[digest]: output_id for digest, output_id in ids.items()}
@@ -0,0 +1,69 @@
+"""Compressed storage for check output.
+
+Check outputs are mostly the same curl headers, HTML pages, DNS answers and
+banners over and over, so they're stored zlib compressed with a preset
+dictionary of those fragments.  Every stored value starts with a format
+byte, so the dictionary can change without rewriting the existing rows:
+
+* ``FORMAT_RAW``: UTF-8 text, for values compression doesn't make smaller
+* ``FORMAT_ZLIB_V1``: zlib with :data:`OUTPUT_DICTIONARY_V1`, frozen in
+  :mod:`scoring_engine.models.output_dictionaries`
+
+Outputs are stored html escaped (see ``Check.finished``), so the dictionary
+holds the escaped forms of the markup.
+"""
+
+import zlib
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from scoring_engine.models.output_dictionaries import OUTPUT_DICTIONARY_V1
+
+FORMAT_RAW = b"\x00"
+FORMAT_ZLIB_V1 = b"\x01"
+
+COMPRESSION_LEVEL = 6
+
+_DICTIONARIES = {FORMAT_ZLIB_V1: OUTPUT_DICTIONARY_V1}
+
+
+def compress_output(text):
+    """Return the stored form of *text*: a format byte followed by the payload."""
+    raw = text.encode("utf-8")
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=OUTPUT_DICTIONARY_V1)
+    compressed = compressor.compress(raw) + compressor.flush()
+    if len(compressed) < len(raw):
+        return FORMAT_ZLIB_V1 + compressed
+    return FORMAT_RAW + raw
+
+
+def decompress_output(data):
+    """Return the text stored by :func:`compress_output`."""
+    data = bytes(data)
+    if not data:
+        return ""
+    data_format, payload = data[:1], data[1:]
+    if data_format == FORMAT_RAW:
+        return payload.decode("utf-8")
+    if data_format not in _DICTIONARIES:
+        raise ValueError(f"Unknown check output format {data_format!r}")
+    decompressor = zlib.decompressobj(zdict=_DICTIONARIES[data_format])
+    return (decompressor.decompress(payload) + decompressor.flush()).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored with :func:`compress_output`, decompressed when loaded."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_output(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_output(value)
@@ -0,0 +1,51 @@
+"""Preset zlib dictionaries of the compressed check output formats.
+
+Stored outputs can only be decompressed with the exact dictionary they were
+compressed with, so a dictionary never changes once released: a new one is
+added under the next version, with its own format byte (see
+:mod:`scoring_engine.models.compressed_text`).  The migrations that read or
+write compressed outputs import them from here too.
+"""
+
+# zlib favours the end of the dictionary, so the most common fragments come last
+OUTPUT_DICTIONARY_V1 = "".join(
+    [
+        # ping, nmap and ssh banners
+        "PING  56(84) bytes of data.\n64 bytes from : icmp_seq=1 ttl=64 time= ms\n",
+        "--- ping statistics ---\n1 packets transmitted, 1 received, 0% packet loss, time 0ms\n",
+        "rtt min/avg/max/mdev = \n",
+        "SSH-2.0-OpenSSH_ Ubuntu-\nPID TTY TIME CMD\n",
+        # mail, ftp and databases
+        "220  ESMTP Postfix\n250 OK\n354 End data with &lt;CR&gt;&lt;LF&gt;.&lt;CR&gt;&lt;LF&gt;\n",
+        "Successfully sent email\n+OK Dovecot ready.\n* OK [CAPABILITY IMAP4rev1] Dovecot ready.\n",
+        "220 (vsFTPd )\n230 Login successful.\n226 Transfer complete.\n",
+        "You are connected to database  as user  on host  at port .\nUSER_PRIVILEGES\n",
+        # dig
+        "; &lt;&lt;&gt;&gt; DiG  &lt;&lt;&gt;&gt; \n;; global options: +cmd\n;; Got answer:\n",
+        ";; -&gt;&gt;HEADER&lt;&lt;- opcode: QUERY, status: NOERROR, id: \n",
+        ";; flags: qr aa rd ra; QUERY: 1, ANSWER: 1, AUTHORITY: 0, ADDITIONAL: 1\n",
+        ";; OPT PSEUDOSECTION:\n; EDNS: version: 0, flags:; udp: 4096\n;; QUESTION SECTION:\n",
+        ";; ANSWER SECTION:\n\tIN\tA\t\n;; Query time:  msec\n;; SERVER: #53()\n;; WHEN: \n;; MSG SIZE  rcvd: \n",
+        # HTML, escaped like the stored output
+        "&lt;!DOCTYPE html&gt;\n&lt;html&gt;\n&lt;head&gt;\n&lt;title&gt;Welcome to nginx!&lt;/title&gt;\n",
+        "&lt;style&gt;\nhtml { color-scheme: light dark; }\nbody { width: 35em; margin: 0 auto;\n",
+        "font-family: Tahoma, Verdana, Arial, sans-serif; }\n&lt;/style&gt;\n&lt;/head&gt;\n&lt;body&gt;\n",
+        "&lt;h1&gt;Welcome to nginx!&lt;/h1&gt;\n&lt;p&gt;If you see this page, the nginx web server is ",
+        "successfully installed and\nworking. Further configuration is required.&lt;/p&gt;\n",
+        "&lt;p&gt;For online documentation and support please refer to\n",
+        "&lt;a href=&quot;http://nginx.org/&quot;&gt;nginx.org&lt;/a&gt;.&lt;br/&gt;\n",
+        "&lt;p&gt;&lt;em&gt;Thank you for using nginx.&lt;/em&gt;&lt;/p&gt;\n&lt;/body&gt;\n&lt;/html&gt;\n",
+        "&lt;meta charset=&quot;utf-8&quot;&gt;&lt;meta name=&quot;viewport&quot; content=&quot;",
+        "&lt;link rel=&quot;stylesheet&quot; href=&quot;&lt;script src=&quot;&lt;/script&gt;",
+        "&lt;div class=&quot;&lt;/div&gt;&lt;a href=&quot;&lt;/a&gt;&lt;/p&gt;&lt;/li&gt;",
+        # curl -v
+        "*   Trying :80...\n* Connected to  () port 80 (#0)\n",
+        "* TLSv1.3 (OUT), TLS handshake, Client hello (1):\n* SSL connection using TLSv1.3 / ",
+        "* Server certificate:\n*  subject: CN=\n*  start date: \n*  expire date: \n*  issuer: \n",
+        "&gt; GET / HTTP/1.1\n&gt; Host: \n&gt; User-Agent: curl/\n&gt; Accept: */*\n&gt; \n",
+        "* Mark bundle as not supporting multiuse\n",
+        "&lt; HTTP/1.1 200 OK\n&lt; Server: nginx/\n&lt; Date: \n&lt; Content-Type: text/html; charset=UTF-8\n",
+        "&lt; Content-Length: \n&lt; Last-Modified: \n&lt; Connection: keep-alive\n&lt; ETag: &quot;\n",
+        "&lt; Accept-Ranges: bytes\n&lt; \n{ [ bytes data]\n* Connection #0 to host  left intact\n",
+    ]
+).encode("utf-8")
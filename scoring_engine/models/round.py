@@ -23,7 +23,7 @@ def _ensure_utc_aware(dt):
 class Round(Base):
     __tablename__ = "rounds"
     id = Column(Integer, primary_key=True)
-    number = Column(Integer, nullable=False)
+    number = Column(Integer, nullable=False, index=True)
     checks = relationship("Check", back_populates="round")
     round_start = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     round_end = Column(DateTime)
@@ -0,0 +1,272 @@
+from collections import namedtuple
+
+from sqlalchemy import Column, ForeignKey, Integer, UniqueConstraint, case, delete, exists, func, insert, or_, select
+
+from scoring_engine.db import db
+from scoring_engine.models.base import Base
+from scoring_engine.models.check import Check
+from scoring_engine.models.round import Round
+from scoring_engine.models.service import Service
+from scoring_engine.models.team import _get_rank_from_scores
+
+# One row of per-round points, read from the summary tables or aggregated from checks
+TeamRoundScoreRow = namedtuple(
+    "TeamRoundScoreRow", ["team_id", "round_number", "earned_points", "max_points", "passed_checks", "failed_checks"]
+)
+ServiceRoundScoreRow = namedtuple(
+    "ServiceRoundScoreRow",
+    ["service_id", "team_id", "round_number", "earned_points", "max_points", "passed_checks", "failed_checks"],
+)
+# What a round changed: the services whose status flipped, the teams whose
+# score or place changed and the teams that own one of the flipped services
+RoundChanges = namedtuple("RoundChanges", ["round_number", "service_ids", "team_ids", "status_team_ids"])
+
+
+class ServiceRoundScore(Base):
+    """Points a service earned in one round, written when the round is saved.
+
+    ``earned_points`` and ``max_points`` are the base points: dynamic scoring
+    is applied when they're read, with the current settings.
+    """
+
+    __tablename__ = "service_round_scores"
+    __table_args__ = (UniqueConstraint("round_id", "service_id"),)
+    id = Column(Integer, primary_key=True)
+    round_id = Column(Integer, ForeignKey("rounds.id"), nullable=False, index=True)
+    round_number = Column(Integer, nullable=False)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    earned_points = Column(Integer, nullable=False, default=0)
+    max_points = Column(Integer, nullable=False, default=0)
+    passed_checks = Column(Integer, nullable=False, default=0)
+    failed_checks = Column(Integer, nullable=False, default=0)
+
+
+class TeamRoundScore(Base):
+    """Points a team earned in one round, the sum of its service round scores."""
+
+    __tablename__ = "team_round_scores"
+    __table_args__ = (UniqueConstraint("round_id", "team_id"),)
+    id = Column(Integer, primary_key=True)
+    round_id = Column(Integer, ForeignKey("rounds.id"), nullable=False, index=True)
+    round_number = Column(Integer, nullable=False)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False, index=True)
+    earned_points = Column(Integer, nullable=False, default=0)
+    max_points = Column(Integer, nullable=False, default=0)
+    passed_checks = Column(Integer, nullable=False, default=0)
+    failed_checks = Column(Integer, nullable=False, default=0)
+
+
+def _check_totals():
+    return (
+        func.sum(case((Check.result.is_(True), Service.points), else_=0)),
+        func.sum(Service.points),
+        func.sum(case((Check.result.is_(True), 1), else_=0)),
+        func.sum(case((Check.result.is_(False), 1), else_=0)),
+    )
+
+
+def _insert_round_scores(session, round_ids):
+    totals = _check_totals()
+    columns = ["round_id", "round_number", "earned_points", "max_points", "passed_checks", "failed_checks"]
+    service_scores = (
+        select(Check.round_id, Round.number, *totals, Check.service_id, Service.team_id)
+        .select_from(Check)
+        .join(Service, Check.service_id == Service.id)
+        .join(Round, Check.round_id == Round.id)
+        .where(Check.round_id.in_(round_ids))
+        .group_by(Check.round_id, Round.number, Check.service_id, Service.team_id)
+    )
+    session.execute(
+        insert(ServiceRoundScore.__table__).from_select(columns + ["service_id", "team_id"], service_scores)
+    )
+    team_scores = (
+        select(
+            ServiceRoundScore.round_id,
+            ServiceRoundScore.round_number,
+            func.sum(ServiceRoundScore.earned_points),
+            func.sum(ServiceRoundScore.max_points),
+            func.sum(ServiceRoundScore.passed_checks),
+            func.sum(ServiceRoundScore.failed_checks),
+            ServiceRoundScore.team_id,
+        )
+        .where(ServiceRoundScore.round_id.in_(round_ids))
+        .group_by(ServiceRoundScore.round_id, ServiceRoundScore.round_number, ServiceRoundScore.team_id)
+    )
+    session.execute(insert(TeamRoundScore.__table__).from_select(columns + ["team_id"], team_scores))
+
+
+def materialize_round_scores(session, round_id):
+    """Aggregate the checks of a round into the round score tables.
+
+    Runs two ``INSERT ... SELECT`` statements in the caller's transaction, so
+    the engine writes a round's checks and its scores atomically.
+    """
+    _insert_round_scores(session, [round_id])
+
+
+def delete_round_scores(session, round_ids):
+    """Remove the round scores of the given rounds (before deleting the rounds)."""
+    session.execute(delete(ServiceRoundScore.__table__).where(ServiceRoundScore.round_id.in_(round_ids)))
+    session.execute(delete(TeamRoundScore.__table__).where(TeamRoundScore.round_id.in_(round_ids)))
+
+
+def refresh_round_scores(session, round_ids):
+    """Rebuild the round scores of rounds whose checks or service points were edited.
+
+    Only rounds that were materialized are rebuilt, the others are still
+    aggregated from their checks when read.
+    """
+    round_ids = [
+        round_id
+        for (round_id,) in session.query(TeamRoundScore.round_id)
+        .filter(TeamRoundScore.round_id.in_(round_ids))
+        .distinct()
+    ]
+    if not round_ids:
+        return
+    delete_round_scores(session, round_ids)
+    _insert_round_scores(session, round_ids)
+
+
+def get_service_round_ids(session, service_id):
+    """Return the ids of the materialized rounds that checked *service_id*."""
+    return [
+        round_id
+        for (round_id,) in session.query(ServiceRoundScore.round_id).filter(ServiceRoundScore.service_id == service_id)
+    ]
+
+
+def _unmaterialized_round_ids():
+    # Rounds saved before the summary tables existed (or created directly from
+    # checks, e.g. by tests) are aggregated from the checks on the fly
+    return select(Round.id).where(~exists().where(TeamRoundScore.round_id == Round.id))
+
+
+def get_team_round_scores():
+    """Return a :data:`TeamRoundScoreRow` for every team and round with checks."""
+    rows = db.session.query(
+        TeamRoundScore.team_id,
+        TeamRoundScore.round_number,
+        TeamRoundScore.earned_points,
+        TeamRoundScore.max_points,
+        TeamRoundScore.passed_checks,
+        TeamRoundScore.failed_checks,
+    ).all()
+    rows += (
+        db.session.query(Service.team_id, Round.number, *_check_totals())
+        .select_from(Check)
+        .join(Service, Check.service_id == Service.id)
+        .join(Round, Check.round_id == Round.id)
+        .filter(Check.round_id.in_(_unmaterialized_round_ids()))
+        .group_by(Service.team_id, Round.id, Round.number)
+        .all()
+    )
+    return sorted((TeamRoundScoreRow(*row) for row in rows), key=lambda row: (row.team_id, row.round_number))
+
+
+def get_service_round_scores(team_id=None):
+    """Return a :data:`ServiceRoundScoreRow` for every service and round with checks.
+
+    Args:
+        team_id: only return the rows of this team's services
+    """
+    query = db.session.query(
+        ServiceRoundScore.service_id,
+        ServiceRoundScore.team_id,
+        ServiceRoundScore.round_number,
+        ServiceRoundScore.earned_points,
+        ServiceRoundScore.max_points,
+        ServiceRoundScore.passed_checks,
+        ServiceRoundScore.failed_checks,
+    )
+    fallback = (
+        db.session.query(Check.service_id, Service.team_id, Round.number, *_check_totals())
+        .select_from(Check)
+        .join(Service, Check.service_id == Service.id)
+        .join(Round, Check.round_id == Round.id)
+        .filter(Check.round_id.in_(_unmaterialized_round_ids()))
+        .group_by(Check.service_id, Service.team_id, Round.id, Round.number)
+    )
+    if team_id is not None:
+        query = query.filter(ServiceRoundScore.team_id == team_id)
+        fallback = fallback.filter(Service.team_id == team_id)
+    rows = query.all() + fallback.all()
+    return sorted((ServiceRoundScoreRow(*row) for row in rows), key=lambda row: (row.service_id, row.round_number))
+
+
+def get_service_score_totals():
+    """Return ``{service_id: (earned_points, max_points)}`` summed over every round."""
+    earned, max_points, _, _ = _check_totals()
+    rows = (
+        db.session.query(
+            ServiceRoundScore.service_id,
+            func.sum(ServiceRoundScore.earned_points),
+            func.sum(ServiceRoundScore.max_points),
+        )
+        .group_by(ServiceRoundScore.service_id)
+        .all()
+    )
+    rows += (
+        db.session.query(Check.service_id, earned, max_points)
+        .select_from(Check)
+        .join(Service, Check.service_id == Service.id)
+        # Like the score properties always did, this counts checks without a round too
+        .filter(or_(Check.round_id.is_(None), Check.round_id.in_(_unmaterialized_round_ids())))
+        .group_by(Check.service_id)
+        .all()
+    )
+    totals = {}
+    for service_id, service_earned, service_max in rows:
+        previous_earned, previous_max = totals.get(service_id, (0, 0))
+        totals[service_id] = (previous_earned + (service_earned or 0), previous_max + (service_max or 0))
+    return totals
+
+
+def _places(totals):
+    # Same ranking as Team.place: teams without points aren't ranked and get 1
+    scores = sorted(((team_id, score) for team_id, score in totals.items() if score), key=lambda row: -row[1])
+    return {team_id: _get_rank_from_scores(scores, team_id) for team_id in totals}
+
+
+def get_round_changes(session, round_number):
+    """Compare a saved round with the one before it.
+
+    Returns a :data:`RoundChanges` with sorted lists of ids.  A service that
+    wasn't checked in the previous round counts as flipped.
+    """
+    previous_round = (
+        session.query(func.max(ServiceRoundScore.round_number))
+        .filter(ServiceRoundScore.round_number < round_number)
+        .scalar()
+    )
+    results = {}
+    for service_id, team_id, number, passed_checks in session.query(
+        ServiceRoundScore.service_id,
+        ServiceRoundScore.team_id,
+        ServiceRoundScore.round_number,
+        ServiceRoundScore.passed_checks,
+    ).filter(ServiceRoundScore.round_number.in_([number for number in (round_number, previous_round) if number])):
+        results.setdefault(service_id, {"team_id": team_id})[number] = bool(passed_checks)
+    flipped = {
+        service_id: result["team_id"]
+        for service_id, result in results.items()
+        if round_number in result and result[round_number] != result.get(previous_round)
+    }
+
+    totals = {}
+    earned = {}
+    for row in get_team_round_scores():
+        if row.round_number > round_number:
+            continue
+        totals[row.team_id] = totals.get(row.team_id, 0) + row.earned_points
+        if row.round_number == round_number:
+            earned[row.team_id] = row.earned_points
+    previous_totals = {team_id: total - earned.get(team_id, 0) for team_id, total in totals.items()}
+    places = _places(totals)
+    previous_places = _places(previous_totals)
+    changed_teams = [
+        team_id for team_id in totals if earned.get(team_id) or places[team_id] != previous_places[team_id]
+    ]
+
+    return RoundChanges(round_number, sorted(flipped), sorted(changed_teams), sorted(set(flipped.values())))
@@ -1,32 +1,13 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, desc, func
-from sqlalchemy.orm import relationship
+from itertools import chain
+
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, bindparam, desc, event, select, update
+from sqlalchemy.orm import Session, relationship
 
 from scoring_engine.db import db
 from scoring_engine.models.base import Base
 from scoring_engine.models.check import Check
 
 
-def _get_rank_from_scores(scores, target_id):
-    """
-    Get rank for target_id from list of (id, score) tuples.
-    Handles ties: same score = same rank.
-    Returns None if target_id not in scores.
-    """
-    if not scores or target_id not in [s[0] for s in scores]:
-        return None
-
-    # scores are already sorted descending by the query
-    current_rank = 1
-    prev_score = None
-    for i, (item_id, score) in enumerate(scores):
-        if prev_score is not None and score < prev_score:
-            current_rank = i + 1
-        if item_id == target_id:
-            return current_rank
-        prev_score = score
-    return None
-
-
 class Service(Base):
     __tablename__ = "services"
     id = Column(Integer, primary_key=True)
@@ -41,6 +22,13 @@ class Service(Base):
     host = Column(String(256), nullable=False)
     port = Column(Integer, default=0)
     worker_queue = Column(String(50), default="main")
+    # Failure streak counters, advanced by the engine as rounds are saved and
+    # rebuilt from the check history when checks are edited or rolled back:
+    # the trailing and longest runs of failed completed checks and the result
+    # of the most recent check
+    current_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    max_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    last_result = Column(Boolean)
 
     def check_result_for_round(self, round_num):
         """
@@ -65,7 +53,12 @@ class Service(Base):
         Get the result of the most recent check for this service.
         Uses a DB query to avoid session/lazy loading issues.
         """
-        last_check = db.session.query(Check).filter(Check.service_id == self.id).order_by(desc(Check.id)).first()
+        last_check = (
+            db.session.query(Check)
+            .filter(Check.service_id == self.id)
+            .order_by(desc(Check.round_id), desc(Check.id))
+            .first()
+        )
         if last_check:
             return last_check.result
         return None
@@ -78,49 +71,38 @@ class Service(Base):
     def rank(self):
         """
         Calculate this service's rank among all services with the same name.
-        WARNING: This queries ALL services with this name on EVERY access!
-        Avoid calling in loops. For bulk operations, calculate ranks in batch
-        (see scoring_engine/web/views/api/team.py:42-62 for efficient implementation).
-        """
-        scores = (
-            db.session.query(
-                Service.team_id,
-                func.sum(Service.points).label("score"),
-            )
-            .join(Check)
-            .filter(Check.result.is_(True))
-            .filter(Service.name == self.name)
-            .group_by(Service.team_id)
-            .order_by(desc("score"))
-            .all()
-        )
+        Read from the current ScoreSnapshot, which ranks every service at once.
+        Returns None if the service's team didn't score with that service name.
+        """
+        from scoring_engine.score_snapshot import ScoreSnapshot
 
-        # Scores are already sorted descending by the query
-        return _get_rank_from_scores(scores, self.team_id)
+        return ScoreSnapshot.current().service_rank(self.id)
 
     @property
     def score_earned(self):
         """
         Calculate total score earned by this service.
-        WARNING: Performs DB query on each access. Cache when used multiple times.
+        Read from the current ScoreSnapshot.
         """
-        return (
-            db.session.query(Check).filter(Check.service_id == self.id).filter(Check.result.is_(True)).count()
-        ) * self.points
+        from scoring_engine.score_snapshot import ScoreSnapshot
+
+        return ScoreSnapshot.current().service_score(self.id)
 
     @property
     def max_score(self):
         """
         Calculate maximum possible score for this service.
-        WARNING: Performs DB query on each access. Cache when used multiple times.
+        Read from the current ScoreSnapshot.
         """
-        return (db.session.query(Check).filter(Check.service_id == self.id).count()) * self.points
+        from scoring_engine.score_snapshot import ScoreSnapshot
+
+        return ScoreSnapshot.current().service_max_score(self.id)
 
     @property
     def percent_earned(self):
-        if self.max_score == 0:
-            return 0
-        return int((self.score_earned / self.max_score) * 100)
+        from scoring_engine.score_snapshot import ScoreSnapshot
+
+        return ScoreSnapshot.current().service_percent_earned(self.id)
 
     @property
     def last_ten_checks(self):
@@ -128,7 +110,13 @@ class Service(Base):
         Get the last 10 checks for this service in reverse chronological order.
         Optimized to use a DB query with LIMIT instead of loading all checks into memory.
         """
-        return db.session.query(Check).filter(Check.service_id == self.id).order_by(desc(Check.id)).limit(10).all()
+        return (
+            db.session.query(Check)
+            .filter(Check.service_id == self.id)
+            .order_by(desc(Check.round_id), desc(Check.id))
+            .limit(10)
+            .all()
+        )
 
     @property
     def consecutive_failures(self):
@@ -136,9 +124,7 @@ class Service(Base):
         Count consecutive failures for this service from the most recent check.
         Returns 0 if the most recent check passed.
         """
-        from scoring_engine.sla import get_consecutive_failures
-
-        return get_consecutive_failures(self.id)
+        return self.current_streak or 0
 
     @property
     def sla_penalty_percent(self):
@@ -155,18 +141,18 @@ class Service(Base):
         """
         Get the penalty points to deduct from this service's score.
         """
-        from scoring_engine.sla import calculate_service_penalty_points
+        from scoring_engine.score_snapshot import ScoreSnapshot
 
-        return calculate_service_penalty_points(self)
+        return ScoreSnapshot.current().service_penalty(self.id)
 
     @property
     def adjusted_score(self):
         """
         Get the score for this service after applying SLA penalties.
         """
-        from scoring_engine.sla import calculate_service_adjusted_score
+        from scoring_engine.score_snapshot import ScoreSnapshot
 
-        return calculate_service_adjusted_score(self)
+        return ScoreSnapshot.current().service_adjusted_score(self.id)
 
     @property
     def sla_status(self):
@@ -176,3 +162,108 @@ class Service(Base):
         from scoring_engine.sla import get_service_sla_status
 
         return get_service_sla_status(self)
+
+
+_STREAK_COLUMNS = ("current_streak", "max_streak", "last_result")
+
+
+def _update_streaks(connection, streaks):
+    """Write ``{service_id: (current_streak, max_streak, last_result)}`` in one executemany."""
+    if not streaks:
+        return
+    table = Service.__table__
+    connection.execute(
+        update(table)
+        .where(table.c.id == bindparam("service_id"))
+        .values(
+            current_streak=bindparam("new_current_streak"),
+            max_streak=bindparam("new_max_streak"),
+            last_result=bindparam("new_last_result"),
+        ),
+        [
+            {
+                "service_id": service_id,
+                "new_current_streak": current_streak,
+                "new_max_streak": max_streak,
+                "new_last_result": last_result,
+            }
+            for service_id, (current_streak, max_streak, last_result) in streaks.items()
+        ],
+    )
+
+
+def _advance(streak, result, completed):
+    current_streak, max_streak, _ = streak
+    if completed:
+        current_streak = 0 if result else current_streak + 1
+        max_streak = max(max_streak, current_streak)
+    return current_streak, max_streak, result
+
+
+def advance_service_streaks(session, round_id):
+    """Fold the checks of a newly saved round into the streak counters of their services.
+
+    Runs in the caller's transaction; the round must be the latest one of its
+    services (the engine saves rounds in order).
+    """
+    rows = session.execute(
+        select(Check.service_id, Check.result, Check.completed, Service.current_streak, Service.max_streak)
+        .join(Service, Check.service_id == Service.id)
+        .where(Check.round_id == round_id)
+        .order_by(Check.service_id, Check.id)
+    )
+    streaks = {}
+    for service_id, result, completed, current_streak, max_streak in rows:
+        streak = streaks.get(service_id, (current_streak or 0, max_streak or 0, None))
+        streaks[service_id] = _advance(streak, result, completed)
+    _update_streaks(session, streaks)
+
+
+def rebuild_service_streaks(connection, service_ids=None):
+    """Recompute the streak counters from the whole check history.
+
+    Args:
+        connection: Session or Connection to run the queries on
+        service_ids: Only rebuild these services (all services if None)
+    """
+    services = select(Service.id)
+    checks = (
+        select(Check.service_id, Check.result, Check.completed)
+        .where(Check.service_id.isnot(None))
+        .order_by(Check.service_id, Check.round_id, Check.id)
+    )
+    if service_ids is not None:
+        if not service_ids:
+            return
+        services = services.where(Service.id.in_(service_ids))
+        checks = checks.where(Check.service_id.in_(service_ids))
+
+    streaks = {service_id: (0, 0, None) for (service_id,) in connection.execute(services)}
+    for service_id, result, completed in connection.execute(checks):
+        if service_id in streaks:
+            streaks[service_id] = _advance(streaks[service_id], result, completed)
+    _update_streaks(connection, streaks)
+
+
+@event.listens_for(Session, "after_flush")
+def _rebuild_streaks_of_flushed_checks(session, flush_context):
+    # Checks written through the ORM (admin edits, setup scripts, tests) can
+    # land in any order, so their services are rebuilt from history.  The
+    # engine bulk inserts rounds, which bypasses this and advances instead.
+    service_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Check) and obj.service_id is not None:
+            if obj in session.dirty and not session.is_modified(obj):
+                continue
+            service_ids.add(obj.service_id)
+    if service_ids:
+        rebuild_service_streaks(session.connection(), service_ids)
+        session.info.setdefault("rebuilt_streak_service_ids", set()).update(service_ids)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_rebuilt_streaks(session, flush_context):
+    for service_id in session.info.pop("rebuilt_streak_service_ids", ()):
+        service = session.identity_map.get(session.identity_key(Service, service_id))
+        if service is not None:
+            session.expire(service, _STREAK_COLUMNS)
@@ -1,7 +1,12 @@
 import json
 import logging
+import os
+import threading
+import time
 
 from sqlalchemy import Column, Integer, Text, desc
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.instrumentation import manager_of_class
 
 from scoring_engine.db import db
 from scoring_engine.models.base import Base
@@ -11,6 +16,16 @@ logger = logging.getLogger(__name__)
 CACHE_PREFIX = "setting:"
 CACHE_TTL = 60
 
+# Per-process cache in front of Redis: {name: (expires_at, payload)}.  It's
+# only used when Redis is, since Setting.clear_cache invalidates the caches
+# of the other processes through a pub/sub message on INVALIDATION_CHANNEL.
+# The short TTL bounds how stale a process can get if it misses a message.
+LOCAL_CACHE_TTL = 5
+INVALIDATION_CHANNEL = "settings_changed"
+_local_cache = {}
+_listener_lock = threading.Lock()
+_listener_pid = None
+
 
 def _get_redis():
     """Return a Redis client using the application config.
@@ -35,6 +50,50 @@ def _get_redis():
         return None
 
 
+def _convert_value(value_text, value_type):
+    if value_type == "Boolean":
+        if value_text == "False":
+            return False
+        else:
+            return True
+    else:
+        return value_text
+
+
+def _forget(name):
+    """Drop a setting (or every setting when name is empty) from this process's cache."""
+    if name:
+        _local_cache.pop(name, None)
+    else:
+        _local_cache.clear()
+
+
+def _listen_for_invalidations():
+    while True:
+        try:
+            pubsub = _get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Messages sent while (re)connecting are lost
+            _local_cache.clear()
+            for message in pubsub.listen():
+                _forget(message["data"])
+        except Exception:
+            logger.debug("Settings invalidation listener disconnected", exc_info=True)
+        time.sleep(LOCAL_CACHE_TTL)
+
+
+def _ensure_listener():
+    """Start this process's invalidation listener (again after a fork)."""
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid != os.getpid():
+            _local_cache.clear()
+            threading.Thread(target=_listen_for_invalidations, name="settings-invalidation", daemon=True).start()
+            _listener_pid = os.getpid()
+
+
 class Setting(Base):
     __tablename__ = "settings"
     id = Column(Integer, primary_key=True)
@@ -55,13 +114,7 @@ class Setting(Base):
             return "String"
 
     def convert_value_type(self):
-        if self._value_type == "Boolean":
-            if self._value_text == "False":
-                return False
-            else:
-                return True
-        else:
-            return self._value_text
+        return _convert_value(self._value_text, self._value_type)
 
     @property
     def value(self):
@@ -72,56 +125,125 @@ class Setting(Base):
         self._value_type = self.map_value_type(value)
         self._value_text = str(value)
 
+    @classmethod
+    def _from_payload(cls, name, data):
+        # Build a detached Setting without hitting the DB
+        setting = manager_of_class(cls).new_instance()
+        setting.id = data["id"]
+        setting.name = name
+        setting._value_text = data["value_text"]
+        setting._value_type = data["value_type"]
+        make_transient_to_detached(setting)
+        # Merge into the current session so callers can modify + commit
+        return db.session.merge(setting, load=False)
+
     @classmethod
     def get_setting(cls, name):
-        """Get a setting by name with Redis caching.
+        """Get a setting by name with two tiers of caching.
 
-        Checks Redis first (shared across all workers). On miss, queries the
-        database and populates the Redis cache with a 60-second TTL.
+        Checks this process's cache first, then Redis (shared across all
+        workers).  On miss, queries the database and populates the Redis
+        cache with a 60-second TTL and the process cache with a 5-second
+        TTL.
 
         When Redis is unavailable the method falls back to a direct DB query.
         """
-        # Try Redis cache
         r = _get_redis()
+        if r is not None:
+            _ensure_listener()
+            cached = _local_cache.get(name)
+            if cached is not None and cached[0] > time.monotonic():
+                return cls._from_payload(name, cached[1])
+
+        # Try Redis cache
         if r is not None:
             try:
                 cached = r.get(CACHE_PREFIX + name)
                 if cached is not None:
                     data = json.loads(cached)
-                    # Build a transient Setting without hitting the DB
-                    setting = cls.__new__(cls)
-                    setting.id = data["id"]
-                    setting.name = name
-                    setting._value_text = data["value_text"]
-                    setting._value_type = data["value_type"]
-                    # Merge into the current session so callers can modify + commit
-                    return db.session.merge(setting, load=False)
+                    _local_cache[name] = (time.monotonic() + LOCAL_CACHE_TTL, data)
+                    return cls._from_payload(name, data)
             except Exception:
                 logger.debug("Redis cache read failed for setting %s", name, exc_info=True)
 
         # Cache miss — query DB.
         setting = db.session.query(Setting).filter(Setting.name == name).order_by(desc(Setting.id)).first()
         if setting and r is not None:
+            data = {
+                "id": setting.id,
+                "value_text": setting._value_text,
+                "value_type": setting._value_type,
+            }
+            _local_cache[name] = (time.monotonic() + LOCAL_CACHE_TTL, data)
             try:
-                payload = json.dumps(
-                    {
-                        "id": setting.id,
-                        "value_text": setting._value_text,
-                        "value_type": setting._value_type,
-                    }
-                )
-                r.set(CACHE_PREFIX + name, payload, ex=CACHE_TTL)
+                r.set(CACHE_PREFIX + name, json.dumps(data), ex=CACHE_TTL)
             except Exception:
                 logger.debug("Redis cache write failed for setting %s", name, exc_info=True)
         return setting
 
+    @classmethod
+    def get_values(cls, names):
+        """Get the values of several settings at once.
+
+        Same two tiers of caching as :meth:`get_setting`, but the names that
+        aren't cached by this process are read with a single Redis MGET and
+        the ones Redis doesn't have with a single ``WHERE name IN`` query.
+
+        Returns a dict mapping name to value for the settings that exist.
+        """
+        payloads = {}
+        r = _get_redis()
+        if r is not None:
+            _ensure_listener()
+            now = time.monotonic()
+            for name in names:
+                cached = _local_cache.get(name)
+                if cached is not None and cached[0] > now:
+                    payloads[name] = cached[1]
+            missing = [name for name in names if name not in payloads]
+            if missing:
+                try:
+                    for name, cached in zip(missing, r.mget([CACHE_PREFIX + name for name in missing])):
+                        if cached is not None:
+                            payloads[name] = json.loads(cached)
+                            _local_cache[name] = (now + LOCAL_CACHE_TTL, payloads[name])
+                except Exception:
+                    logger.debug("Redis cache read failed for settings %s", missing, exc_info=True)
+
+        missing = [name for name in names if name not in payloads]
+        if missing:
+            loaded = {}
+            rows = (
+                db.session.query(Setting.id, Setting.name, Setting._value_text, Setting._value_type)
+                .filter(Setting.name.in_(missing))
+                .order_by(Setting.id)
+            )
+            # The newest row of a name wins, like in get_setting
+            for setting_id, name, value_text, value_type in rows:
+                loaded[name] = {"id": setting_id, "value_text": value_text, "value_type": value_type}
+            payloads.update(loaded)
+            if loaded and r is not None:
+                expires_at = time.monotonic() + LOCAL_CACHE_TTL
+                for name, data in loaded.items():
+                    _local_cache[name] = (expires_at, data)
+                try:
+                    pipe = r.pipeline(transaction=False)
+                    for name, data in loaded.items():
+                        pipe.set(CACHE_PREFIX + name, json.dumps(data), ex=CACHE_TTL)
+                    pipe.execute()
+                except Exception:
+                    logger.debug("Redis cache write failed for settings %s", list(loaded), exc_info=True)
+
+        return {name: _convert_value(data["value_text"], data["value_type"]) for name, data in payloads.items()}
+
     @classmethod
     def clear_cache(cls, name=None):
-        """Clear the settings cache in Redis.
+        """Clear the settings cache in Redis and in every process.
 
         If name is provided, only clear that specific setting.
         Otherwise, clear all cached settings.
         """
+        _forget(name)
         r = _get_redis()
         if r is None:
             return
@@ -132,5 +254,6 @@ class Setting(Base):
                 keys = r.keys(CACHE_PREFIX + "*")
                 if keys:
                     r.delete(*keys)
+            r.publish(INVALIDATION_CHANNEL, name or "")
         except Exception:
             logger.debug("Redis cache clear failed", exc_info=True)
@@ -3,7 +3,7 @@ import itertools
 import random
 from collections import defaultdict
 
-from sqlalchemy import Column, Integer, String, desc, func
+from sqlalchemy import Column, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from scoring_engine.db import db
@@ -115,21 +115,11 @@ class Team(Base):
     def current_score(self):
         """
         Calculate current score from successful checks.
-        WARNING: This performs a DB query on each access. Consider caching results
-        or using bulk queries when accessing scores for multiple teams.
+        Read from the current ScoreSnapshot, which scores every team at once.
         """
-        score = (
-            db.session.query(func.sum(Service.points))
-            .select_from(Team)
-            .join(Service)
-            .join(Check)
-            .filter(Service.team_id == self.id)
-            .filter(Check.result.is_(True))
-            .scalar()
-        )
-        if not score:
-            return 0
-        return score
+        from scoring_engine.score_snapshot import ScoreSnapshot
+
+        return ScoreSnapshot.current().team_score(self.id)
 
     @property
     def current_inject_score(self):
@@ -153,26 +143,12 @@ class Team(Base):
     def place(self):
         """
         Calculate team's current place/rank based on scores.
-        WARNING: This queries ALL teams and their scores on EVERY access!
-        This is very expensive - avoid calling in loops or templates.
-        For bulk operations, calculate ranks once and cache/pass the results.
-        See scoring_engine/web/views/api/overview.py for an efficient batch implementation.
+        Read from the current ScoreSnapshot, which ranks every team at once.
+        Returns 1 if the team has no points.
         """
-        scores = (
-            db.session.query(
-                Service.team_id,
-                func.sum(Service.points).label("score"),
-            )
-            .join(Check)
-            .filter(Check.result.is_(True))
-            .group_by(Service.team_id)
-            .order_by(desc("score"))
-            .all()
-        )
+        from scoring_engine.score_snapshot import ScoreSnapshot
 
-        # Scores are already sorted descending by the query
-        # Returns 1 if no scores or team not in list
-        return _get_rank_from_scores(scores, self.id, default=1)
+        return ScoreSnapshot.current().team_place(self.id)
 
     @property
     def is_red_team(self):
@@ -350,18 +326,18 @@ class Team(Base):
         """
         Calculate total SLA penalties for this team across all services.
         """
-        from scoring_engine.sla import calculate_team_total_penalties
+        from scoring_engine.score_snapshot import ScoreSnapshot
 
-        return calculate_team_total_penalties(self)
+        return ScoreSnapshot.current().team_penalty(self.id)
 
     @property
     def adjusted_score(self):
         """
         Get the team's score after applying SLA penalties.
         """
-        from scoring_engine.sla import calculate_team_adjusted_score
+        from scoring_engine.score_snapshot import ScoreSnapshot
 
-        return calculate_team_adjusted_score(self)
+        return ScoreSnapshot.current().team_adjusted_score(self.id)
 
     @property
     def sla_summary(self):
@@ -377,11 +353,12 @@ class Team(Base):
         """
         Get count of services with active SLA violations.
         """
-        from scoring_engine.sla import get_sla_config
+        from scoring_engine.sla import EMPTY_SERVICE_SLA, calculate_services_sla, get_sla_config
 
         config = get_sla_config()
+        services_sla = calculate_services_sla(config, [service.id for service in self.services])
         violations = 0
         for service in self.services:
-            if service.consecutive_failures >= config.penalty_threshold:
+            if services_sla.get(service.id, EMPTY_SERVICE_SLA).consecutive_failures >= config.penalty_threshold:
                 violations += 1
         return violations
@@ -0,0 +1,227 @@
+"""Scores, ranks and places of every team and service, computed at once.
+
+``Team.place``, ``Team.current_score``, ``Service.rank``,
+``Service.score_earned`` and ``Service.max_score`` used to run an aggregate
+query on every access.  A :class:`ScoreSnapshot` computes all of them from
+the per-round score tables, and the model properties read from it.  The
+dynamic scoring and SLA adjusted scores need the batch SLA queries, so
+they're only computed the first time one of them is read.
+
+:meth:`ScoreSnapshot.current` hands out the snapshot: it's memoized for the
+current request and, when a cache server is configured, shared between
+processes under a key made of the last round number and the ``scores``
+generation (the adjusted scores under a key of their own).  A new round
+changes the key; changes within a round (check edits, SLA settings) bump the
+generation with ``update_scores_data``.
+"""
+
+from collections import defaultdict, namedtuple
+
+from flask import g, has_request_context, request
+from flask_caching.backends import NullCache
+
+from scoring_engine.cache import cache
+from scoring_engine.cache_helper import versioned_key
+from scoring_engine.db import db
+from scoring_engine.logger import logger
+
+# How long a snapshot may be served from the cache, a new round changes its key anyway
+CACHE_TIMEOUT = 3600
+
+# Scores with dynamic scoring and SLA penalties applied
+AdjustedScores = namedtuple(
+    "AdjustedScores",
+    ["service_penalties", "service_adjusted_scores", "team_penalties", "team_adjusted_scores", "team_adjusted_places"],
+)
+
+
+def _ranks(scores):
+    """Rank ``{id: score}`` like ``_get_rank_from_scores``: ties share a rank, ids without points aren't ranked."""
+    ranks = {}
+    current_rank = 1
+    prev_score = None
+    ranked = sorted(((item_id, score) for item_id, score in scores.items() if score), key=lambda row: -row[1])
+    for i, (item_id, score) in enumerate(ranked):
+        if prev_score is not None and score < prev_score:
+            current_rank = i + 1
+        ranks[item_id] = current_rank
+        prev_score = score
+    return ranks
+
+
+class ScoreSnapshot(object):
+    """Every team and service score at one point in time.
+
+    The raw scores (``team_scores``, ``service_scores``, ``service_max_scores``)
+    and the ranks derived from them match the model properties they replace;
+    the ``adjusted`` scores have dynamic scoring and SLA penalties applied,
+    like ``calculate_team_adjusted_score`` and ``calculate_service_adjusted_score``.
+    """
+
+    def __init__(self, config=None):
+        from scoring_engine.models.round_score import get_service_score_totals
+        from scoring_engine.models.service import Service
+
+        # SLA settings for the adjusted scores, read when they're computed if not given
+        self._config = config
+        self._adjusted = None
+        # Cache key of the adjusted scores, set when the snapshot is shared
+        self._adjusted_key = None
+
+        score_totals = get_service_score_totals()
+        self.service_scores = {}
+        self.service_max_scores = {}
+        self.team_scores = {}
+        # service name -> team_id -> points of the team's services of that name
+        name_scores = defaultdict(dict)
+        service_names = {}
+        for service_id, team_id, name in db.session.query(Service.id, Service.team_id, Service.name):
+            earned, max_score = score_totals.get(service_id, (0, 0))
+            self.service_scores[service_id] = earned
+            self.service_max_scores[service_id] = max_score
+            service_names[service_id] = (name, team_id)
+            if earned:
+                self.team_scores[team_id] = self.team_scores.get(team_id, 0) + earned
+                name_scores[name][team_id] = name_scores[name].get(team_id, 0) + earned
+
+        self.team_places = _ranks(self.team_scores)
+        name_ranks = {name: _ranks(scores) for name, scores in name_scores.items()}
+        self.service_ranks = {}
+        for service_id, (name, team_id) in service_names.items():
+            rank = name_ranks.get(name, {}).get(team_id)
+            if rank is not None:
+                self.service_ranks[service_id] = rank
+
+    def _compute_adjusted(self):
+        from scoring_engine.sla import (
+            EMPTY_SERVICE_SLA,
+            calculate_services_sla,
+            calculate_team_base_scores,
+            calculate_teams_total_penalties,
+            get_sla_config,
+        )
+
+        config = self._config if self._config is not None else get_sla_config()
+        services_sla = calculate_services_sla(config)
+        service_penalties = {}
+        service_adjusted_scores = {}
+        for service_id in self.service_scores:
+            service_sla = services_sla.get(service_id, EMPTY_SERVICE_SLA)
+            service_penalties[service_id] = service_sla.penalty_points
+            adjusted = service_sla.base_score - service_sla.penalty_points
+            service_adjusted_scores[service_id] = adjusted if config.allow_negative else max(0, adjusted)
+
+        team_penalties = calculate_teams_total_penalties(config, services_sla)
+        team_adjusted_scores = {}
+        for team_id, base_score in calculate_team_base_scores(config).items():
+            adjusted = base_score - team_penalties.get(team_id, 0)
+            team_adjusted_scores[team_id] = adjusted if config.allow_negative else max(0, adjusted)
+        return AdjustedScores(
+            service_penalties,
+            service_adjusted_scores,
+            team_penalties,
+            team_adjusted_scores,
+            _ranks(team_adjusted_scores),
+        )
+
+    @property
+    def adjusted(self):
+        """The :data:`AdjustedScores`, computed (or read from the cache) on first use."""
+        if self._adjusted is None:
+            self._adjusted = _load_cached(self._adjusted_key, self._compute_adjusted)
+        return self._adjusted
+
+    def team_score(self, team_id):
+        return self.team_scores.get(team_id, 0)
+
+    def team_place(self, team_id):
+        # Like Team.place, a team without points is first
+        return self.team_places.get(team_id, 1)
+
+    def team_adjusted_score(self, team_id):
+        return self.adjusted.team_adjusted_scores.get(team_id, 0)
+
+    def team_penalty(self, team_id):
+        return self.adjusted.team_penalties.get(team_id, 0)
+
+    def service_score(self, service_id):
+        return self.service_scores.get(service_id, 0)
+
+    def service_max_score(self, service_id):
+        return self.service_max_scores.get(service_id, 0)
+
+    def service_percent_earned(self, service_id):
+        max_score = self.service_max_score(service_id)
+        if max_score == 0:
+            return 0
+        return int((self.service_score(service_id) / max_score) * 100)
+
+    def service_rank(self, service_id):
+        # None when no service of that name scored for the team
+        return self.service_ranks.get(service_id)
+
+    def service_adjusted_score(self, service_id):
+        return self.adjusted.service_adjusted_scores.get(service_id, 0)
+
+    def service_penalty(self, service_id):
+        return self.adjusted.service_penalties.get(service_id, 0)
+
+    @classmethod
+    def current(cls):
+        """Return the snapshot of the current scores.
+
+        Within a web request it's computed once; with a cache server it's
+        shared by every process until the next round or ``update_scores_data``.
+        Outside a request without a cache server, a fresh snapshot is computed.
+        """
+        if has_request_context():
+            # Request contexts can share an app context (and its g), so the
+            # memoized snapshot is tied to its request
+            current_request = request._get_current_object()
+            memoized = g.get("score_snapshot")
+            if memoized is not None and memoized[0] is current_request:
+                return memoized[1]
+            snapshot = cls._load()
+            g.score_snapshot = (current_request, snapshot)
+            return snapshot
+        return cls._load()
+
+    @classmethod
+    def _load(cls):
+        if isinstance(cache.cache, NullCache):
+            return cls()
+
+        from scoring_engine.models.round import Round
+
+        try:
+            suffix = f"round_{Round.get_last_round_num()}"
+            key = versioned_key("/api/scores", suffix)
+            adjusted_key = versioned_key("/api/scores", f"{suffix}_adjusted")
+        except Exception:
+            logger.exception("Exception possibly due to cache backend.")
+            return cls()
+
+        def compute():
+            snapshot = cls()
+            snapshot._adjusted_key = adjusted_key
+            return snapshot
+
+        return _load_cached(key, compute)
+
+
+def _load_cached(key, compute):
+    """Return the value cached under *key*, or compute and cache it."""
+    if key is None:
+        return compute()
+    try:
+        value = cache.get(key)
+    except Exception:
+        logger.exception("Exception possibly due to cache backend.")
+        return compute()
+    if value is None:
+        value = compute()
+        try:
+            cache.set(key, value, timeout=CACHE_TIMEOUT)
+        except Exception:
+            logger.exception("Exception possibly due to cache backend.")
+    return value
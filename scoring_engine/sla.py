@@ -10,75 +10,112 @@ Features:
 - Multiple penalty modes: additive, flat, exponential, next_check_reduction
 """
 
-from sqlalchemy import desc
+from collections import namedtuple
+from contextlib import contextmanager
+
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import desc, func
 
 from scoring_engine.db import db
 from scoring_engine.models.setting import Setting
 
 
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _to_str(value):
+    return str(value) if value else None
+
+
+# attribute, setting name, conversion, default
+_SLA_SETTINGS = (
+    ("sla_enabled", "sla_enabled", _to_bool, False),
+    ("penalty_threshold", "sla_penalty_threshold", int, 5),
+    ("penalty_percent", "sla_penalty_percent", int, 10),
+    ("penalty_max_percent", "sla_penalty_max_percent", int, 50),
+    ("penalty_mode", "sla_penalty_mode", _to_str, "additive"),
+    ("allow_negative", "sla_allow_negative", _to_bool, False),
+    # Dynamic scoring settings
+    ("dynamic_enabled", "dynamic_scoring_enabled", _to_bool, False),
+    ("early_rounds", "dynamic_scoring_early_rounds", int, 10),
+    ("early_multiplier", "dynamic_scoring_early_multiplier", float, 2.0),
+    ("late_start_round", "dynamic_scoring_late_start_round", int, 50),
+    ("late_multiplier", "dynamic_scoring_late_multiplier", float, 0.5),
+)
+
+
 class SLAConfig:
-    """Configuration holder for SLA settings loaded from database."""
-
-    def __init__(self):
-        self._load_settings()
-
-    def _load_settings(self):
-        """Load SLA settings from database."""
-        self.sla_enabled = self._get_bool_setting("sla_enabled", False)
-        self.penalty_threshold = self._get_int_setting("sla_penalty_threshold", 5)
-        self.penalty_percent = self._get_int_setting("sla_penalty_percent", 10)
-        self.penalty_max_percent = self._get_int_setting("sla_penalty_max_percent", 50)
-        self.penalty_mode = self._get_string_setting("sla_penalty_mode", "additive")
-        self.allow_negative = self._get_bool_setting("sla_allow_negative", False)
-
-        # Dynamic scoring settings
-        self.dynamic_enabled = self._get_bool_setting("dynamic_scoring_enabled", False)
-        self.early_rounds = self._get_int_setting("dynamic_scoring_early_rounds", 10)
-        self.early_multiplier = self._get_float_setting("dynamic_scoring_early_multiplier", 2.0)
-        self.late_start_round = self._get_int_setting("dynamic_scoring_late_start_round", 50)
-        self.late_multiplier = self._get_float_setting("dynamic_scoring_late_multiplier", 0.5)
-
-    def _get_setting(self, name, default):
-        """Get a setting value from the database."""
-        setting = Setting.get_setting(name)
-        if setting:
-            return setting.value
-        return default
-
-    def _get_bool_setting(self, name, default):
-        """Get a boolean setting."""
-        value = self._get_setting(name, default)
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            return value.lower() in ("true", "1", "yes")
-        return bool(value)
-
-    def _get_int_setting(self, name, default):
-        """Get an integer setting."""
-        value = self._get_setting(name, default)
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return default
-
-    def _get_float_setting(self, name, default):
-        """Get a float setting."""
-        value = self._get_setting(name, default)
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return default
-
-    def _get_string_setting(self, name, default):
-        """Get a string setting."""
-        value = self._get_setting(name, default)
-        return str(value) if value else default
+    """Immutable snapshot of the SLA and dynamic scoring settings.
+
+    All settings are read at once with :meth:`Setting.get_values`.  Keyword
+    arguments override the loaded values, e.g. ``SLAConfig(sla_enabled=True)``.
+    """
+
+    def __init__(self, **overrides):
+        values = Setting.get_values([setting_name for _, setting_name, _, _ in _SLA_SETTINGS])
+        for attribute, setting_name, convert, default in _SLA_SETTINGS:
+            if attribute in overrides:
+                value = overrides.pop(attribute)
+            else:
+                try:
+                    value = convert(values.get(setting_name, default))
+                except (ValueError, TypeError):
+                    value = default
+                if value is None:
+                    value = default
+            object.__setattr__(self, attribute, value)
+        if overrides:
+            raise TypeError("Unknown SLA settings: " + ", ".join(sorted(overrides)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SLAConfig is immutable, create a new one instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("SLAConfig is immutable, create a new one instead")
 
 
 def get_sla_config():
-    """Get the current SLA configuration from the database."""
-    return SLAConfig()
+    """Get the current SLA configuration.
+
+    Within a web request the snapshot is loaded once and memoized on
+    ``flask.g``; :func:`use_sla_config` makes every call inside its block
+    return a given snapshot (the engine uses it for the round it's saving).
+    """
+    if has_app_context() and "sla_config" in g:
+        return g.sla_config
+    if not has_request_context():
+        return SLAConfig()
+    # Request contexts can share an app context (and its g), e.g. in the
+    # cache warmer, so the memoized snapshot is tied to its request
+    current_request = request._get_current_object()
+    memoized = g.get("request_sla_config")
+    if memoized is None or memoized[0] is not current_request:
+        memoized = g.request_sla_config = (current_request, SLAConfig())
+    return memoized[1]
+
+
+def clear_sla_config():
+    """Forget the snapshot memoized for the current request after an SLA setting changed."""
+    if has_app_context():
+        g.pop("request_sla_config", None)
+
+
+@contextmanager
+def use_sla_config(config):
+    """Make :func:`get_sla_config` return *config* within the block."""
+    previous = g.pop("sla_config", None)
+    g.sla_config = config
+    try:
+        yield config
+    finally:
+        g.pop("sla_config", None)
+        if previous is not None:
+            g.sla_config = previous
 
 
 def get_consecutive_failures(service_id):
@@ -87,6 +124,9 @@ def get_consecutive_failures(service_id):
 
     Returns the number of consecutive failed checks starting from the most recent.
     If the most recent check passed, returns 0.
+
+    This walks the service's whole check history; ``Service.current_streak``
+    holds the same count, maintained as rounds are saved.
     """
     from scoring_engine.models.check import Check
 
@@ -142,6 +182,37 @@ def get_max_consecutive_failures(service_id):
     return max_streak
 
 
+def get_failures_before_round(service_id, round_id):
+    """
+    Count the checks of a service that didn't pass, going backwards from just before *round_id*.
+
+    This is the failure streak that the service's check in round *round_id*
+    is penalized for.  Only the checks since the last passing one are read,
+    so a page of the service's history can be scored without its earlier
+    rounds.  Like the service checks view, checks that didn't complete
+    count as failures.
+    """
+    from scoring_engine.models.check import Check
+
+    last_pass_round_id = (
+        db.session.query(Check.round_id)
+        .filter(Check.service_id == service_id)
+        .filter(Check.round_id < round_id)
+        .filter(Check.result == True)  # noqa: E712
+        .order_by(desc(Check.round_id))
+        .limit(1)
+        .scalar()
+    )
+    query = (
+        db.session.query(func.count(Check.id))
+        .filter(Check.service_id == service_id)
+        .filter(Check.round_id < round_id)
+    )
+    if last_pass_round_id is not None:
+        query = query.filter(Check.round_id > last_pass_round_id)
+    return query.scalar()
+
+
 def calculate_sla_penalty_percent(consecutive_failures, config=None):
     """
     Calculate the penalty percentage based on consecutive failures and penalty mode.
@@ -351,11 +422,138 @@ def calculate_team_total_penalties(team, config=None):
     if not config.sla_enabled:
         return 0
 
-    total_penalties = 0
-    for service in team.services:
-        total_penalties += calculate_service_penalty_points(service, config)
+    services_sla = calculate_services_sla(config, [service.id for service in team.services])
+    return sum(service_sla.penalty_points for service_sla in services_sla.values())
+
+
+ServiceSLA = namedtuple(
+    "ServiceSLA",
+    ["consecutive_failures", "max_consecutive_failures", "penalty_percent", "base_score", "penalty_points"],
+)
+
+# SLA state of a service that isn't known (yet)
+EMPTY_SERVICE_SLA = ServiceSLA(0, 0, 0, 0, 0)
+
+
+def calculate_services_sla(config=None, service_ids=None):
+    """
+    Calculate the SLA state of every service at once.
+
+    Args:
+        config: SLAConfig object (if None, loads from database)
+        service_ids: Only calculate these services (all services if None)
+
+    Returns:
+        Dict mapping service_id to a ServiceSLA. Every field equals what the
+        per-service functions (get_consecutive_failures, get_max_consecutive_failures,
+        calculate_sla_penalty_percent, calculate_service_base_score_with_dynamic,
+        calculate_service_penalty_points) return for that service.
+
+    Performance: Reads the streak counters the engine maintains on the services
+    and aggregates the passing checks per service and round in one GROUP BY,
+    instead of walking each service's check history. Each distinct penalty
+    percentage is calculated once.
+    """
+    if config is None:
+        config = get_sla_config()
 
-    return total_penalties
+    from sqlalchemy.sql import func
+
+    from scoring_engine.models.check import Check
+    from scoring_engine.models.round import Round
+    from scoring_engine.models.service import Service
+
+    services = db.session.query(Service.id, Service.current_streak, Service.max_streak, Service.points)
+    passing_checks = (
+        db.session.query(Check.service_id, Round.number, func.count(Check.id))
+        .outerjoin(Round, Check.round_id == Round.id)
+        .filter(Check.result.is_(True))
+        .group_by(Check.service_id, Round.number)
+    )
+    if service_ids is not None:
+        if not service_ids:
+            return {}
+        services = services.filter(Service.id.in_(service_ids))
+        passing_checks = passing_checks.filter(Check.service_id.in_(service_ids))
+
+    service_points = {}
+    streaks = {}
+    for service_id, current_streak, max_streak, points in services:
+        service_points[service_id] = points
+        streaks[service_id] = (current_streak or 0, max_streak or 0)
+
+    # Pre-fetch config values to avoid repeated attribute access in loop
+    dynamic_enabled = config.dynamic_enabled
+    early_rounds = config.early_rounds
+    early_multiplier = config.early_multiplier
+    late_start = config.late_start_round
+    late_multiplier = config.late_multiplier
+
+    base_scores = {}
+    for service_id, round_number, passed in passing_checks:
+        points = service_points.get(service_id)
+        if points is None:
+            continue
+        if not dynamic_enabled:
+            round_score = passed * points
+        elif round_number is None:
+            continue
+        else:
+            # Inline multiplier calculation for performance
+            if round_number <= early_rounds:
+                multiplier = early_multiplier
+            elif round_number >= late_start:
+                multiplier = late_multiplier
+            else:
+                multiplier = 1.0
+            round_score = passed * int(points * multiplier)
+        base_scores[service_id] = base_scores.get(service_id, 0) + round_score
+
+    penalty_percents = {}
+    services_sla = {}
+    for service_id, (consecutive_failures, max_consecutive_failures) in streaks.items():
+        penalty_percent = penalty_percents.get(consecutive_failures)
+        if penalty_percent is None:
+            penalty_percent = penalty_percents[consecutive_failures] = calculate_sla_penalty_percent(
+                consecutive_failures, config
+            )
+        base_score = base_scores.get(service_id, 0)
+        penalty_points = int(base_score * (penalty_percent / 100)) if penalty_percent else 0
+        services_sla[service_id] = ServiceSLA(
+            consecutive_failures, max_consecutive_failures, penalty_percent, base_score, penalty_points
+        )
+
+    return services_sla
+
+
+def calculate_teams_total_penalties(config=None, services_sla=None):
+    """
+    Calculate the total SLA penalties of every team.
+
+    Args:
+        config: SLAConfig object (if None, loads from database)
+        services_sla: Result of calculate_services_sla (calculated if None)
+
+    Returns:
+        Dict mapping team_id to total penalty points, for teams with penalties
+    """
+    if config is None:
+        config = get_sla_config()
+
+    if not config.sla_enabled:
+        return {}
+
+    from scoring_engine.models.service import Service
+
+    if services_sla is None:
+        services_sla = calculate_services_sla(config)
+
+    team_penalties = {}
+    for service_id, team_id in db.session.query(Service.id, Service.team_id):
+        penalty_points = services_sla.get(service_id, EMPTY_SERVICE_SLA).penalty_points
+        if penalty_points:
+            team_penalties[team_id] = team_penalties.get(team_id, 0) + penalty_points
+    return team_penalties
 
 
 def calculate_team_base_score_with_dynamic(team, config=None):
@@ -447,13 +645,14 @@ def calculate_team_adjusted_score(team, config=None):
     return adjusted_score
 
 
-def get_service_sla_status(service, config=None):
+def get_service_sla_status(service, config=None, service_sla=None):
     """
     Get the SLA status for a service including consecutive failures and penalties.
 
     Args:
         service: Service object
         config: SLAConfig object (if None, loads from database)
+        service_sla: The service's ServiceSLA from calculate_services_sla (calculated if None)
 
     Returns:
         Dict with SLA status information
@@ -461,30 +660,35 @@ def get_service_sla_status(service, config=None):
     if config is None:
         config = get_sla_config()
 
-    consecutive_failures = get_consecutive_failures(service.id)
-    penalty_percent = calculate_sla_penalty_percent(consecutive_failures, config)
-    penalty_points = calculate_service_penalty_points(service, config)
+    if service_sla is None:
+        service_sla = calculate_services_sla(config, [service.id]).get(service.id, EMPTY_SERVICE_SLA)
+
+    adjusted_score = service_sla.base_score - service_sla.penalty_points
+    if not config.allow_negative:
+        adjusted_score = max(0, adjusted_score)
 
     return {
         "service_id": service.id,
         "service_name": service.name,
-        "consecutive_failures": consecutive_failures,
+        "consecutive_failures": service_sla.consecutive_failures,
         "penalty_threshold": config.penalty_threshold,
-        "penalty_percent": penalty_percent,
-        "penalty_points": penalty_points,
-        "base_score": calculate_service_base_score_with_dynamic(service, config),
-        "adjusted_score": calculate_service_adjusted_score(service, config),
-        "sla_violation": consecutive_failures >= config.penalty_threshold,
+        "penalty_percent": service_sla.penalty_percent,
+        "penalty_points": service_sla.penalty_points,
+        "base_score": service_sla.base_score,
+        "adjusted_score": adjusted_score,
+        "sla_violation": service_sla.consecutive_failures >= config.penalty_threshold,
     }
 
 
-def get_team_sla_summary(team, config=None):
+def get_team_sla_summary(team, config=None, services_sla=None):
     """
     Get a summary of SLA status for all services of a team.
 
     Args:
         team: Team object
         config: SLAConfig object (if None, loads from database)
+        services_sla: Result of calculate_services_sla covering the team's services
+            (calculated if None), lets callers summarizing every team share one pass
 
     Returns:
         Dict with team SLA summary
@@ -492,22 +696,32 @@ def get_team_sla_summary(team, config=None):
     if config is None:
         config = get_sla_config()
 
+    if services_sla is None:
+        services_sla = calculate_services_sla(config, [service.id for service in team.services])
+
     services_status = []
     total_violations = 0
+    total_penalties = 0
 
     for service in team.services:
-        status = get_service_sla_status(service, config)
+        status = get_service_sla_status(service, config, services_sla.get(service.id, EMPTY_SERVICE_SLA))
         services_status.append(status)
+        total_penalties += status["penalty_points"]
         if status["sla_violation"]:
             total_violations += 1
 
+    base_score = calculate_team_base_score_with_dynamic(team, config)
+    adjusted_score = base_score - total_penalties
+    if not config.allow_negative:
+        adjusted_score = max(0, adjusted_score)
+
     return {
         "team_id": team.id,
         "team_name": team.name,
         "sla_enabled": config.sla_enabled,
-        "base_score": calculate_team_base_score_with_dynamic(team, config),
-        "total_penalties": calculate_team_total_penalties(team, config),
-        "adjusted_score": calculate_team_adjusted_score(team, config),
+        "base_score": base_score,
+        "total_penalties": total_penalties,
+        "adjusted_score": adjusted_score,
         "services_with_violations": total_violations,
         "total_services": len(team.services),
         "services": services_status,
@@ -533,6 +747,33 @@ def apply_dynamic_scoring_to_round(round_number, base_points, config=None):
     return int(float(base_points) * multiplier)
 
 
+def calculate_team_base_scores(config=None):
+    """
+    Calculate the base score of every team with dynamic scoring multipliers applied.
+
+    Args:
+        config: SLAConfig object (if None, loads from database)
+
+    Returns:
+        Dict mapping team_id to score, for teams with at least one passing check
+
+    Performance: Reads one row per team per round from the round score tables
+    instead of joining every check against its service.
+    """
+    if config is None:
+        config = get_sla_config()
+
+    from scoring_engine.models.round_score import get_team_round_scores
+
+    team_scores = {}
+    for row in get_team_round_scores():
+        if not row.passed_checks:
+            continue
+        round_score = apply_dynamic_scoring_to_round(row.round_number, row.earned_points, config)
+        team_scores[row.team_id] = team_scores.get(row.team_id, 0) + round_score
+    return team_scores
+
+
 def get_dynamic_scoring_info(config=None):
     """
     Get information about dynamic scoring configuration.
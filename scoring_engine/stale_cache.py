@@ -0,0 +1,106 @@
+"""Stale-while-revalidate caching for the API views.
+
+When a family generation is bumped at the end of a round, the next request
+for every view of the family misses the cache and the worker serving it
+blocks until the payload is recomputed.  With
+``cache_stale_while_revalidate`` enabled, views decorated with
+:func:`stale_while_revalidate` instead keep answering with the last
+payload they computed (marked with an ``X-Cache-Stale`` header) while a
+single background thread recomputes it.  The thread that gets to
+recompute is the one that wins an ``add`` (``SET NX`` on Redis) of the
+key's lock, every other worker keeps serving the stale payload.
+
+A miss without a stale payload (or with the mode disabled) is computed in
+the request, like ``@cache.cached`` does.
+"""
+
+import threading
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+from scoring_engine.cache import cache
+from scoring_engine.cache_helper import stale_key
+from scoring_engine.config import config
+from scoring_engine.db import db
+from scoring_engine.logger import logger
+from scoring_engine.models.user import User
+
+STALE_HEADER = "X-Cache-Stale"
+
+# Upper bound on a recomputation, the lock expires after it
+LOCK_TIMEOUT = 60
+
+
+def _lock_key(key):
+    return f"{key}:lock"
+
+
+def _store(key, rv, timeout):
+    cache.set(key, rv, timeout=timeout)
+    # Only a successful payload is worth serving stale
+    if make_response(rv).status_code == 200:
+        cache.set(stale_key(key), rv, timeout=0)
+
+
+def _revalidate(app, view, key, timeout, path, user_id, view_args):
+    from scoring_engine.cache_warmer import user_request_context
+
+    with app.app_context():
+        try:
+            user = db.session.get(User, user_id) if user_id is not None else None
+            with user_request_context(path, user):
+                _store(key, view(**view_args), timeout)
+        except Exception:
+            logger.warning("Unable to revalidate the cached payload of %s", path, exc_info=True)
+        finally:
+            cache.delete(_lock_key(key))
+
+
+def stale_while_revalidate(timeout=None):
+    """Cache a view per ``make_cache_key`` key, serving stale payloads while they're recomputed.
+
+    The wrapper exposes ``uncached`` and ``cache_timeout`` like the
+    ``@cache.cached`` wrapper, so the cache warmer can warm it.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            from scoring_engine.web.views.api import make_cache_key
+
+            try:
+                key = make_cache_key(*args, **kwargs)
+                rv = cache.get(key)
+                if rv is None and config.cache_stale_while_revalidate:
+                    stale = cache.get(stale_key(key))
+                    if stale is not None:
+                        if cache.add(_lock_key(key), True, timeout=LOCK_TIMEOUT):
+                            app = current_app._get_current_object()
+                            user_id = None if g.user.is_anonymous else g.user.id
+                            threading.Thread(
+                                target=_revalidate,
+                                args=(app, view, key, timeout, request.path, user_id, kwargs),
+                                daemon=True,
+                            ).start()
+                        response = make_response(stale)
+                        response.headers[STALE_HEADER] = "1"
+                        return response
+            except Exception:
+                logger.exception("Exception possibly due to cache backend.")
+                return view(*args, **kwargs)
+
+            if rv is None:
+                rv = view(*args, **kwargs)
+                try:
+                    _store(key, rv, timeout)
+                except Exception:
+                    logger.exception("Exception possibly due to cache backend.")
+            return rv
+
+        wrapper.uncached = view
+        wrapper.cache_timeout = timeout
+        wrapper.stale_while_revalidate = True
+        return wrapper
+
+    return decorator
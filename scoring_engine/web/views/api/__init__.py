@@ -8,20 +8,21 @@ from flask_login import current_user, login_required
 import redis as redis_lib
 
 from scoring_engine.cache import cache
+from scoring_engine.cache_helper import versioned_key
 from scoring_engine.config import config
 from scoring_engine.models.notifications import Notification
 
 
 def make_cache_key(*args, **kwargs):
-    """Function to generate a cache key."""
+    """Function to generate a cache key (per role, in the path's current cache generation)."""
     request_path = request.path
     if g.user.is_anonymous:
-        return f"{request_path}_anonymous"
+        return versioned_key(request_path, "anonymous")
     if g.user.is_white_team:
-        return f"{request_path}_white"
+        return versioned_key(request_path, "white")
     if g.user.is_red_team:
-        return f"{request_path}_red"
-    return f"{request_path}_team_{g.user.team.id}"
+        return versioned_key(request_path, "red")
+    return versioned_key(request_path, f"team_{g.user.team.id}")
 
 
 mod = Blueprint("api", __name__)
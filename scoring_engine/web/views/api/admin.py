@@ -22,7 +22,7 @@ def _ensure_utc_aware(dt):
     return dt.astimezone(pytz.utc)
 
 
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, undefer_group
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql import func
 
@@ -33,6 +33,7 @@ from scoring_engine.cache_helper import (
     update_inject_data,
     update_overview_data,
     update_scoreboard_data,
+    update_scores_data,
     update_service_data,
     update_services_data,
     update_services_navbar,
@@ -44,14 +45,17 @@ from scoring_engine.config import config
 from scoring_engine.db import db
 from scoring_engine.engine.basic_check import CHECK_FAILURE_TEXT, CHECK_SUCCESS_TEXT, CHECK_TIMED_OUT_TEXT
 from scoring_engine.engine.engine import Engine
+from scoring_engine.engine.dispatch_plan import bump_config_version
 from scoring_engine.engine.execute_command import execute_command
-from scoring_engine.models.check import Check
+from scoring_engine.engine.task_results import celery_task_id, fetch_task_results
+from scoring_engine.models.check import Check, delete_round_checks
 from scoring_engine.models.environment import Environment
 from scoring_engine.models.inject import Inject, InjectComment, InjectRubricScore, RubricItem, Template
 from scoring_engine.models.kb import KB
 from scoring_engine.models.property import Property
 from scoring_engine.models.round import Round
-from scoring_engine.models.service import Service
+from scoring_engine.models.round_score import delete_round_scores, get_service_round_ids, refresh_round_scores
+from scoring_engine.models.service import Service, rebuild_service_streaks
 from scoring_engine.models.setting import Setting
 from scoring_engine.models.team import Team
 from scoring_engine.models.user import User
@@ -78,6 +82,7 @@ def admin_update_environment():
                     setattr(environment, request.form["name"], value or None)
                 db.session.add(environment)
                 db.session.commit()
+                bump_config_version()
                 return jsonify({"status": "Updated Environment Information"})
             return jsonify({"error": "Incorrect permissions"})
     return jsonify({"error": "Incorrect permissions"})
@@ -96,6 +101,7 @@ def admin_update_property():
                     property_obj.value = html.escape(request.form["value"])
                 db.session.add(property_obj)
                 db.session.commit()
+                bump_config_version()
                 return jsonify({"status": "Updated Property Information"})
             return jsonify({"error": "Incorrect permissions"})
     return jsonify({"error": "Incorrect permissions"})
@@ -120,7 +126,11 @@ def admin_update_check():
                     check.reason = request.form["value"]
                 if modified_check:
                     db.session.add(check)
+                    db.session.flush()
+                    if request.form["name"] == "check_value" and check.round is not None:
+                        refresh_round_scores(db.session, [check.round_id])
                     db.session.commit()
+                    update_scores_data()
                     update_scoreboard_data()
                     update_overview_data()
                     update_services_navbar(check.service.team.id)
@@ -143,6 +153,7 @@ def admin_update_host():
                     service.host = html.escape(request.form["value"])
                     db.session.add(service)
                     db.session.commit()
+                    bump_config_version()
                     update_overview_data()
                     update_services_data(service.team.id)
                     update_service_data(service.id)
@@ -161,6 +172,7 @@ def admin_update_port():
                     service.port = int(request.form["value"])
                     db.session.add(service)
                     db.session.commit()
+                    bump_config_version()
                     update_overview_data()
                     update_services_data(service.team.id)
                     update_service_data(service.id)
@@ -179,6 +191,7 @@ def admin_update_worker_queue():
                     service.worker_queue = request.form["value"]
                     db.session.add(service)
                     db.session.commit()
+                    bump_config_version()
                     return jsonify({"status": "Updated Service Information"})
     return jsonify({"error": "Incorrect permissions"})
 
@@ -193,7 +206,16 @@ def admin_update_points():
                 if request.form["name"] == "points":
                     service.points = int(request.form["value"])
                     db.session.add(service)
+                    db.session.flush()
+                    # Every round the service was checked in is worth a different amount now
+                    refresh_round_scores(db.session, get_service_round_ids(db.session, service.id))
                     db.session.commit()
+                    update_scores_data()
+                    update_scoreboard_data()
+                    update_overview_data()
+                    update_team_stats(service.team.id)
+                    update_services_data(service.team.id)
+                    update_service_data(service.id)
                     return jsonify({"status": "Updated Service Information"})
     return jsonify({"error": "Incorrect permissions"})
 
@@ -377,7 +399,7 @@ def admin_update_anonymize_team_names():
 @login_required
 def admin_get_check_full_output(check_id):
     if current_user.is_white_team:
-        check = db.session.get(Check, check_id)
+        check = db.session.get(Check, check_id, options=[undefer_group("output"), joinedload(Check.check_output)])
         if not check:
             return jsonify({"error": "Check not found"}), 404
 
@@ -415,15 +437,17 @@ def get_check_progress_total():
         team_stats = {}
         if task_id_settings:
             task_dict = json.loads(task_id_settings.value)
+            task_metas = fetch_task_results(
+                execute_command, [task_id for task_ids in task_dict.values() for task_id in task_ids]
+            )
             for team_name, task_ids in task_dict.items():
                 for task_id in task_ids:
-                    task = execute_command.AsyncResult(task_id)
                     if team_name not in team_stats:
                         team_stats[team_name] = {}
                         team_stats[team_name]["pending"] = 0
                         team_stats[team_name]["finished"] = 0
 
-                    if task.state == "PENDING":
+                    if task_metas.get(task_id, {}).get("status", "PENDING") == "PENDING":
                         team_stats[team_name]["pending"] += 1
                         total_stats["pending"] += 1
                     else:
@@ -1614,10 +1638,11 @@ def admin_rollback():
         for kb_entry in task_kb_entries:
             try:
                 task_dict = json.loads(kb_entry.value)
-                for team_name, task_id_list in task_dict.items():
-                    for task_id in task_id_list:
-                        execute_command.AsyncResult(task_id).revoke(terminate=True)
-                        revoked_count += 1
+                # Batched jobs share one Celery task
+                celery_ids = {celery_task_id(task_id) for task_id_list in task_dict.values() for task_id in task_id_list}
+                for task_id in celery_ids:
+                    execute_command.AsyncResult(task_id).revoke(terminate=True)
+                    revoked_count += 1
             except (json.JSONDecodeError, TypeError):
                 pass
 
@@ -1635,7 +1660,8 @@ def admin_rollback():
         BATCH_SIZE = 500
         for i in range(0, len(round_ids), BATCH_SIZE):
             batch_ids = round_ids[i : i + BATCH_SIZE]
-            db.session.query(Check).filter(Check.round_id.in_(batch_ids)).delete(synchronize_session=False)
+            delete_round_scores(db.session, batch_ids)
+            delete_round_checks(db.session, batch_ids)
             db.session.commit()
 
         # Delete KB entries
@@ -1645,6 +1671,7 @@ def admin_rollback():
         # Delete rounds
         rounds_count = len(rounds_to_delete)
         db.session.query(Round).filter(Round.number >= round_number).delete(synchronize_session=False)
+        rebuild_service_streaks(db.session)
         db.session.commit()
 
     finally:
@@ -3,7 +3,7 @@ from flask import jsonify, request
 from flask_login import current_user, login_required
 
 from scoring_engine.cache import cache
-from scoring_engine.cache_helper import update_announcements_data
+from scoring_engine.cache_helper import update_announcements_data, versioned_key
 from scoring_engine.db import db
 from scoring_engine.models.announcement import Announcement
 from scoring_engine.models.team import Team
@@ -23,11 +23,11 @@ def _announcements_cache_key_prefix():
 
 
 def _announcements_cache_key():
-    return f"/api/announcements_{_announcements_cache_key_prefix()}"
+    return versioned_key("/api/announcements", _announcements_cache_key_prefix())
 
 
 def _announcements_ids_cache_key():
-    return f"/api/announcements/ids_{_announcements_cache_key_prefix()}"
+    return versioned_key("/api/announcements/ids", _announcements_cache_key_prefix())
 
 
 def _get_visible_announcements():
@@ -11,6 +11,7 @@ from scoring_engine.models.flag import Flag, Perm, Platform, Solve
 from scoring_engine.models.service import Service
 from scoring_engine.models.setting import Setting
 from scoring_engine.models.team import Team
+from scoring_engine.stale_cache import stale_while_revalidate
 
 from . import make_cache_key, mod
 
@@ -53,7 +54,7 @@ def api_flags():
 
 @mod.route("/api/flags/solves")
 @login_required
-@cache.cached(make_cache_key=make_cache_key)
+@stale_while_revalidate()
 def api_flags_solves():
     if not current_user.is_red_team and not current_user.is_white_team:
         return jsonify({"status": "Unauthorized"}), 403
@@ -2,7 +2,6 @@ from collections import defaultdict
 
 from flask import jsonify
 from flask_login import current_user
-from sqlalchemy import desc
 from sqlalchemy.sql import func
 
 from scoring_engine.cache import cache
@@ -12,7 +11,7 @@ from scoring_engine.models.round import Round
 from scoring_engine.models.service import Service
 from scoring_engine.models.setting import Setting
 from scoring_engine.models.team import Team
-from scoring_engine.sla import apply_dynamic_scoring_to_round, calculate_team_total_penalties, get_sla_config
+from scoring_engine.sla import calculate_team_base_scores, calculate_teams_total_penalties, get_sla_config
 
 from . import make_cache_key, mod
 
@@ -142,7 +141,6 @@ def overview_get_data():
     data = []
     blue_teams = db.session.query(Team).filter(Team.color == "Blue").order_by(Team.id).all()
     blue_team_ids = [team.id for team in blue_teams]
-    blue_teams_dict = {team.id: team for team in blue_teams}
     last_round = Round.get_last_round_num()
 
     # Get SLA configuration
@@ -181,49 +179,16 @@ def overview_get_data():
 
     if len(blue_team_ids) > 0:
         # Calculate team scores with dynamic scoring multipliers
-        if sla_config.dynamic_enabled:
-            # Query scores per round for dynamic scoring
-            round_scores = (
-                db.session.query(
-                    Service.team_id,
-                    Check.round_id,
-                    func.sum(Service.points).label("round_score"),
-                )
-                .join(Check)
-                .filter(Check.result.is_(True))
-                .group_by(Service.team_id, Check.round_id)
-                .all()
-            )
-
-            # Get round numbers for each round_id
-            rounds_map = {r.id: r.number for r in db.session.query(Round.id, Round.number).all()}
-
-            # Calculate totals with multipliers
-            team_scores = defaultdict(int)
-            for team_id, round_id, round_score in round_scores:
-                round_number = rounds_map.get(round_id, 0)
-                adjusted_score = apply_dynamic_scoring_to_round(round_number, round_score, sla_config)
-                team_scores[team_id] += adjusted_score
-            team_scores = dict(team_scores)
-        else:
-            # No dynamic scoring - use simple sum
-            team_scores = dict(
-                db.session.query(Service.team_id, func.sum(Service.points).label("score"))
-                .join(Check)
-                .filter(Check.result.is_(True))
-                .group_by(Service.team_id)
-                .order_by(desc("score"))
-                .all()
-            )
+        team_scores = calculate_team_base_scores(sla_config)
 
         # Calculate adjusted scores with SLA penalties
+        team_penalties = calculate_teams_total_penalties(sla_config)
         adjusted_scores_dict = {}
         penalties_dict = {}
         for blue_team_id in blue_team_ids:
             base_score = team_scores.get(blue_team_id, 0)
             if sla_config.sla_enabled:
-                team = blue_teams_dict[blue_team_id]
-                penalty = calculate_team_total_penalties(team, sla_config)
+                penalty = team_penalties.get(blue_team_id, 0)
                 penalties_dict[blue_team_id] = penalty
                 if sla_config.allow_negative:
                     adjusted_scores_dict[blue_team_id] = base_score - penalty
@@ -7,13 +7,17 @@ from sqlalchemy.sql import func
 
 from scoring_engine.cache import cache
 from scoring_engine.db import db
-from scoring_engine.models.check import Check
 from scoring_engine.models.inject import Inject, InjectRubricScore
 from scoring_engine.models.round import Round
-from scoring_engine.models.service import Service
+from scoring_engine.models.round_score import get_team_round_scores
 from scoring_engine.models.setting import Setting
 from scoring_engine.models.team import Team
-from scoring_engine.sla import apply_dynamic_scoring_to_round, calculate_team_total_penalties, get_sla_config
+from scoring_engine.sla import (
+    apply_dynamic_scoring_to_round,
+    calculate_team_base_scores,
+    calculate_teams_total_penalties,
+    get_sla_config,
+)
 
 from . import mod
 
@@ -46,40 +50,7 @@ def calculate_team_scores_with_dynamic_scoring(sla_config):
 
     Returns dict mapping team_id to total score with multipliers applied.
     """
-    if not sla_config.dynamic_enabled:
-        # No dynamic scoring - use simple sum
-        return dict(
-            db.session.query(Service.team_id, func.sum(Service.points))
-            .join(Check)
-            .filter(Check.result.is_(True))
-            .group_by(Service.team_id)
-            .all()
-        )
-
-    # Query scores grouped by team and round
-    round_scores = (
-        db.session.query(
-            Service.team_id,
-            Check.round_id,
-            func.sum(Service.points).label("round_score"),
-        )
-        .join(Check)
-        .filter(Check.result.is_(True))
-        .group_by(Service.team_id, Check.round_id)
-        .all()
-    )
-
-    # Get round numbers for each round_id
-    rounds = {r.id: r.number for r in db.session.query(Round.id, Round.number).all()}
-
-    # Calculate total with multipliers
-    team_scores = defaultdict(int)
-    for team_id, round_id, round_score in round_scores:
-        round_number = rounds.get(round_id, 0)
-        adjusted_score = apply_dynamic_scoring_to_round(round_number, round_score, sla_config)
-        team_scores[team_id] += adjusted_score
-
-    return dict(team_scores)
+    return calculate_team_base_scores(sla_config)
 
 
 @cache.memoize()
@@ -90,6 +61,7 @@ def _get_bar_data_cached(anonymize, show_both):
     """
     sla_config = get_sla_config()
     current_scores = calculate_team_scores_with_dynamic_scoring(sla_config)
+    team_penalties = calculate_teams_total_penalties(sla_config)
 
     inject_scores_visible = Setting.get_setting("inject_scores_visible")
     if inject_scores_visible and inject_scores_visible.value:
@@ -128,7 +100,7 @@ def _get_bar_data_cached(anonymize, show_both):
         # Total base score includes both service and inject scores
         total_base_score = service_score + inject_score
         if sla_config.sla_enabled:
-            penalty = calculate_team_total_penalties(blue_team, sla_config)
+            penalty = team_penalties.get(blue_team.id, 0)
             team_sla_penalties.append(str(penalty))
             if sla_config.allow_negative:
                 adjusted = total_base_score - penalty
@@ -167,28 +139,14 @@ def _get_line_data_cached(anonymize, show_both):
         db.session.query(Team.id, Team.name, Team.rgb_color).filter(Team.color == "Blue").order_by(Team.id).all()
     )
 
-    round_scores = (
-        db.session.query(
-            Service.team_id,
-            Check.round_id,
-            func.sum(Service.points),
-        )
-        .join(Check)
-        .filter(Check.result.is_(True))
-        .group_by(Service.team_id, Check.round_id)
-        .order_by(Service.team_id, Check.round_id)
-        .all()
-    )
-
-    # Get round numbers for dynamic scoring
-    rounds_map = {r.id: r.number for r in db.session.query(Round.id, Round.number).all()}
-
-    scores_dict = defaultdict(lambda: defaultdict(int))
-    for team_id, round_id, round_score in round_scores:
+    # Rows come ordered by team and round
+    scores_dict = defaultdict(dict)
+    for row in get_team_round_scores():
+        if not row.passed_checks:
+            continue
         # Apply dynamic scoring multiplier if enabled
-        round_number = rounds_map.get(round_id, 0)
-        adjusted_score = apply_dynamic_scoring_to_round(round_number, round_score, sla_config)
-        scores_dict[team_id][round_id] = adjusted_score
+        adjusted_score = apply_dynamic_scoring_to_round(row.round_number, row.earned_points, sla_config)
+        scores_dict[row.team_id][row.round_number] = adjusted_score
 
     team_name_map = Team.get_team_name_mapping(anonymize=anonymize, show_both=show_both)
 
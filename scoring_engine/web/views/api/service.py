@@ -3,22 +3,32 @@ import re
 
 from flask import jsonify, request
 from flask_login import current_user, login_required
+from sqlalchemy.orm import joinedload, undefer_group
 
 from scoring_engine.cache import cache
 from scoring_engine.cache_helper import update_overview_data, update_service_data, update_services_data
 from scoring_engine.db import db
+from scoring_engine.engine.dispatch_plan import bump_config_version
 from scoring_engine.models.account import Account
 from scoring_engine.models.check import Check
 from scoring_engine.models.round import Round
 from scoring_engine.models.service import Service
 from scoring_engine.models.setting import Setting
-from scoring_engine.sla import calculate_round_multiplier, calculate_sla_penalty_percent, get_sla_config
+from scoring_engine.sla import (
+    calculate_round_multiplier,
+    calculate_sla_penalty_percent,
+    get_failures_before_round,
+    get_sla_config,
+)
 
 from . import make_cache_key, mod
 
 MAX_USERNAME_LENGTH = 256
 MAX_PASSWORD_LENGTH = 256
 MAX_HOST_LENGTH = 256
+# Checks per page of /api/service/<id>/checks when paging without a limit, and the largest limit
+CHECKS_PAGE_SIZE = 50
+MAX_CHECKS_PAGE_SIZE = 500
 
 
 def is_valid_user_input(string, only_hostname, only_number):
@@ -34,31 +44,95 @@ def is_valid_user_input(string, only_hostname, only_number):
     return bool(re.match(regex, string))
 
 
+def _checks_page_args():
+    """Return the ``(before_round, limit, summary)`` query arguments of the service checks view.
+
+    ``before_round`` and ``limit`` are None when the whole history is requested.
+    Raises ValueError for arguments that aren't positive integers.
+    """
+    before_round = request.args.get("before_round")
+    limit = request.args.get("limit")
+    if before_round is not None:
+        before_round = int(before_round)
+    if limit is not None:
+        limit = int(limit)
+    elif before_round is not None:
+        limit = CHECKS_PAGE_SIZE
+    if (before_round is not None and before_round < 1) or (limit is not None and limit < 1):
+        raise ValueError("before_round and limit must be positive")
+    if limit is not None:
+        limit = min(limit, MAX_CHECKS_PAGE_SIZE)
+    summary = request.args.get("summary", "").lower() in ("1", "true")
+    return before_round, limit, summary
+
+
+def _checks_cache_key():
+    """Cache key of the service checks view, one per page and format."""
+    key = make_cache_key()
+    args = [request.args.get(name, "") for name in ("before_round", "limit", "summary")]
+    if not any(args):
+        return key
+    path_key, _, generations = key.rpartition("@")
+    return f"{path_key}?{':'.join(args)}@{generations}"
+
+
 @mod.route("/api/service/<service_id>/checks")
 @login_required
-@cache.cached(make_cache_key=make_cache_key)
+@cache.cached(make_cache_key=_checks_cache_key)
 def service_get_checks(service_id):
+    """Return a service's checks, most recent first.
+
+    Without arguments the whole history is returned.  ``?limit=`` returns
+    the most recent checks, and ``?before_round=`` the checks of the rounds
+    before that one, so a client pages backwards by passing the returned
+    ``next_before_round``.  A page always holds whole rounds, so it can have
+    more than ``limit`` checks when a round checked the service several
+    times.  ``?summary=true`` leaves out outputs and commands.
+    """
     service = db.session.get(Service, service_id)
     if service is None or not (current_user.team == service.team or current_user.team.is_white_team):
         return jsonify({"status": "Unauthorized"}), 403
+    try:
+        before_round, limit, summary = _checks_page_args()
+    except ValueError:
+        return jsonify({"status": "Invalid before_round or limit"}), 400
 
-    # Query checks ordered by round number ascending for penalty calculation
-    check_output = (
+    # Most recent first; pages walk the (service_id, round_id) index backwards
+    query = (
         db.session.query(Check, Round.number)
         .join(Round)
-        .filter(Check.service_id == service_id)
-        .order_by(Round.number.asc())
-        .all()
+        .filter(Check.service_id == service.id)
+        .order_by(Check.round_id.desc(), Check.id.desc())
     )
+    if not summary:
+        query = query.options(undefer_group("output"), joinedload(Check.check_output))
+    if before_round is not None:
+        query = query.filter(Round.number < before_round)
+    next_before_round = None
+    if limit is not None:
+        check_output = query.limit(limit + 1).all()
+        if len(check_output) > limit:
+            next_page_check = check_output[limit][0]
+            check_output = check_output[:limit]
+            last_check, next_before_round = check_output[-1]
+            # Pages end on a round boundary, so a round's other checks aren't skipped
+            if next_page_check.round_id == last_check.round_id:
+                check_output += query.filter(Check.round_id == last_check.round_id, Check.id < last_check.id).all()
+    else:
+        check_output = query.all()
+    # Penalties are computed in chronological order to track consecutive failures
+    check_output.reverse()
 
     # Get SLA config for dynamic scoring and penalties
     sla_config = get_sla_config()
     service_points = service.points
     sla_enabled = sla_config.sla_enabled
 
-    # Process checks in chronological order to track consecutive failures
+    # A page starts from the failure streak of the rounds before it
     data = []
     consecutive_failures = 0
+    if sla_enabled and check_output and (before_round is not None or next_before_round is not None):
+        consecutive_failures = get_failures_before_round(service.id, check_output[0][0].round_id)
 
     for check, round_number in check_output:
         # Calculate the round multiplier
@@ -85,28 +159,32 @@ def service_get_checks(service_id):
             sla_penalty_applied = 0
             consecutive_failures += 1
 
-        data.append(
-            {
-                "id": check.id,
-                "round": round_number,
-                "result": check.result,
-                "earned_score": earned_score,
-                "multiplier": multiplier,
-                "sla_penalty": sla_penalty_applied,
-                "timestamp": check.local_completed_timestamp,
-                "reason": check.reason,
-                "output": check.output,
-                "command": check.command,
-            }
-        )
+        check_data = {
+            "id": check.id,
+            "round": round_number,
+            "result": check.result,
+            "earned_score": earned_score,
+            "multiplier": multiplier,
+            "sla_penalty": sla_penalty_applied,
+            "timestamp": check.local_completed_timestamp,
+            "reason": check.reason,
+        }
+        if not summary:
+            check_data["output"] = check.output
+            check_data["command"] = check.command
+        data.append(check_data)
 
     # Reverse to show most recent first (descending order)
     data.reverse()
 
-    if Setting.get_setting("blue_team_view_check_output").value is False and current_user.is_blue_team:
+    if (
+        not summary
+        and Setting.get_setting("blue_team_view_check_output").value is False
+        and current_user.is_blue_team
+    ):
         for check in data:
             check["output"] = "REDACTED"
-    return jsonify(data=data)
+    return jsonify(data=data, next_before_round=next_before_round)
 
 
 @mod.route("/api/service/update_account", methods=["POST"])
@@ -141,6 +219,7 @@ def update_service_account_info():
                             account.password = html.escape(value)
                         db.session.add(account)
                         db.session.commit()
+                        bump_config_version()
                         return jsonify({"status": "Updated Account Information"})
             else:
                 return jsonify({"error": "Invalid characters. Allowed: A-Z a-z 0-9 . , @ = : / - | ( ) _ ; and space"})
@@ -168,6 +247,7 @@ def update_host():
                         service.host = html.escape(request.form["value"])
                         db.session.add(service)
                         db.session.commit()
+                        bump_config_version()
                         update_overview_data()
                         update_services_data(service.team.id)
                         update_service_data(service.id)
@@ -196,6 +276,7 @@ def update_port():
                         service.port = int(html.escape(request.form["value"]))
                         db.session.add(service)
                         db.session.commit()
+                        bump_config_version()
                         update_overview_data()
                         update_services_data(service.team.id)
                         update_service_data(service.id)
@@ -6,16 +6,19 @@ from flask import flash, jsonify, redirect, request, url_for
 from flask_login import current_user, login_required
 
 from scoring_engine.cache import cache
-from scoring_engine.cache_helper import update_overview_data, update_scoreboard_data, update_sla_data
+from scoring_engine.cache_helper import update_overview_data, update_scoreboard_data, update_scores_data, update_sla_data
 from scoring_engine.db import db
 from scoring_engine.models.setting import Setting
 from scoring_engine.models.team import Team
 from scoring_engine.sla import (
     calculate_round_multiplier,
+    calculate_services_sla,
+    clear_sla_config,
     get_dynamic_scoring_info,
     get_sla_config,
     get_team_sla_summary,
 )
+from scoring_engine.stale_cache import stale_while_revalidate
 
 from . import make_cache_key, mod
 
@@ -26,15 +29,16 @@ from . import make_cache_key, mod
 
 @mod.route("/api/sla/summary")
 @login_required
-@cache.cached(make_cache_key=make_cache_key)
+@stale_while_revalidate()
 def sla_summary():
     """Get SLA summary for all blue teams."""
     config = get_sla_config()
     blue_teams = Team.get_all_blue_teams()
+    services_sla = calculate_services_sla(config)
 
     teams_summary = []
     for team in blue_teams:
-        summary = get_team_sla_summary(team, config)
+        summary = get_team_sla_summary(team, config, services_sla)
         teams_summary.append(summary)
 
     return jsonify(
@@ -133,6 +137,8 @@ def _update_setting(name, value, redirect_route="admin.sla"):
 
 def _clear_scoring_cache():
     """Clear Flask cache for scoreboard, overview, and SLA data."""
+    clear_sla_config()
+    update_scores_data()
     update_scoreboard_data()
     update_overview_data()
     update_sla_data()
@@ -31,7 +31,8 @@ from scoring_engine.models.round import Round
 from scoring_engine.models.service import Service
 from scoring_engine.models.setting import Setting
 from scoring_engine.models.team import Team
-from scoring_engine.sla import get_sla_config, apply_dynamic_scoring_to_round, calculate_team_total_penalties
+from scoring_engine.sla import get_sla_config, calculate_team_base_scores, calculate_teams_total_penalties
+from scoring_engine.stale_cache import stale_while_revalidate
 from scoring_engine.web.views.api.overview import calculate_ranks
 
 from . import make_cache_key, mod
@@ -137,7 +138,7 @@ def _build_response(rows):
 
 @mod.route("/api/stats")
 @login_required
-@cache.cached(make_cache_key=make_cache_key)
+@stale_while_revalidate()
 def api_stats():
     team = db.session.get(Team, current_user.team.id)
     if team is None or not current_user.team == team or not (current_user.is_blue_team or current_user.is_white_team):
@@ -164,44 +165,19 @@ def api_stats_scoring_overview():
 
     blue_teams = db.session.query(Team).filter(Team.color == "Blue").order_by(Team.id).all()
     blue_team_ids = [t.id for t in blue_teams]
-    blue_teams_dict = {t.id: t for t in blue_teams}
 
     sla_config = get_sla_config()
 
     # --- Service Scores ---
-    if sla_config.dynamic_enabled:
-        from collections import defaultdict
-
-        round_scores = (
-            db.session.query(Service.team_id, Check.round_id, func.sum(Service.points).label("round_score"))
-            .join(Check)
-            .filter(Check.result.is_(True))
-            .group_by(Service.team_id, Check.round_id)
-            .all()
-        )
-        rounds_map = {r.id: r.number for r in db.session.query(Round.id, Round.number).all()}
-        team_scores = defaultdict(int)
-        for team_id, round_id, round_score in round_scores:
-            round_number = rounds_map.get(round_id, 0)
-            team_scores[team_id] += apply_dynamic_scoring_to_round(round_number, round_score, sla_config)
-        team_scores = dict(team_scores)
-    else:
-        from sqlalchemy import desc
-
-        team_scores = dict(
-            db.session.query(Service.team_id, func.sum(Service.points).label("score"))
-            .join(Check)
-            .filter(Check.result.is_(True))
-            .group_by(Service.team_id)
-            .all()
-        )
+    team_scores = calculate_team_base_scores(sla_config)
 
     # Apply SLA penalties
+    team_penalties = calculate_teams_total_penalties(sla_config)
     adjusted_scores = {}
     for tid in blue_team_ids:
         base = team_scores.get(tid, 0)
         if sla_config.sla_enabled:
-            penalty = calculate_team_total_penalties(blue_teams_dict[tid], sla_config)
+            penalty = team_penalties.get(tid, 0)
             adjusted_scores[tid] = max(0, base - penalty) if not sla_config.allow_negative else base - penalty
         else:
             adjusted_scores[tid] = base
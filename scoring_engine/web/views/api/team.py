@@ -2,16 +2,17 @@ from collections import defaultdict
 
 from flask import jsonify
 from flask_login import current_user, login_required
-from sqlalchemy import desc, func
 from sqlalchemy.orm import subqueryload
 
 from scoring_engine.cache import cache
 from scoring_engine.db import db
 from scoring_engine.models.check import Check
 from scoring_engine.models.round import Round
+from scoring_engine.models.round_score import get_service_round_scores
 from scoring_engine.models.service import Service
 from scoring_engine.models.team import Team
-from scoring_engine.sla import get_sla_config
+from scoring_engine.sla import apply_dynamic_scoring_to_round, get_sla_config
+from scoring_engine.stale_cache import stale_while_revalidate
 
 from . import make_cache_key, mod
 
@@ -56,7 +57,7 @@ def services_get_team_data(team_id):
 
 @mod.route("/api/team/<team_id>/services")
 @login_required
-@cache.cached(make_cache_key=make_cache_key)
+@stale_while_revalidate()
 def api_services(team_id):
     team = db.session.get(Team, team_id)
     if team is None or not current_user.team == team or not current_user.is_blue_team:
@@ -66,64 +67,22 @@ def api_services(team_id):
 
     # Get SLA config for dynamic scoring
     sla_config = get_sla_config()
-    dynamic_enabled = sla_config.dynamic_enabled
-
-    if dynamic_enabled:
-        # Pre-fetch config values for performance
-        early_rounds = sla_config.early_rounds
-        early_multiplier = sla_config.early_multiplier
-        late_start = sla_config.late_start_round
-        late_multiplier = sla_config.late_multiplier
-
-        # Query for dynamic scoring: get service scores with round numbers via JOIN
-        # This is more efficient than querying all rounds separately
-        service_check_data = (
-            db.session.query(
-                Service.team_id,
-                Service.name,
-                Service.points,
-                Round.number,
-                Check.result,
-            )
-            .select_from(Check)
-            .join(Service, Check.service_id == Service.id)
-            .join(Round, Check.round_id == Round.id)
-            .all()
-        )
 
-        # Calculate dynamic scores per service per team
-        service_dict = defaultdict(lambda: defaultdict(int))
-        service_max_dict = defaultdict(lambda: defaultdict(int))
+    # Services are ranked against the services of the same name of the other teams
+    service_names = dict(db.session.query(Service.id, Service.name).all())
 
-        for svc_team_id, name, points, round_number, result in service_check_data:
-            # Inline multiplier calculation for performance
-            if round_number <= early_rounds:
-                multiplier = early_multiplier
-            elif round_number >= late_start:
-                multiplier = late_multiplier
-            else:
-                multiplier = 1.0
-
-            dynamic_points = int(points * multiplier)
-            service_max_dict[name][svc_team_id] += dynamic_points
-            if result:
-                service_dict[name][svc_team_id] += dynamic_points
-    else:
-        # Original non-dynamic scoring logic
-        service_scores = (
-            db.session.query(Service.team_id, Service.name, func.sum(Service.points).label("score"))
-            .join(Check)
-            .filter(Check.result.is_(True))
-            .group_by(Service.team_id, Service.name)
-            .order_by(Service.name, desc("score"))
-            .all()
+    # Scores per service per team, with dynamic scoring multipliers applied per round
+    service_dict = defaultdict(lambda: defaultdict(int))
+    service_max_dict = defaultdict(lambda: defaultdict(int))
+    for row in get_service_round_scores():
+        name = service_names[row.service_id]
+        service_max_dict[name][row.team_id] += apply_dynamic_scoring_to_round(
+            row.round_number, row.max_points, sla_config
         )
-
-        service_dict = defaultdict(lambda: defaultdict(int))
-        for svc_team_id, name, points in service_scores:
-            service_dict[name][svc_team_id] = points
-
-        service_max_dict = None  # Will calculate per-service below
+        if row.passed_checks:
+            service_dict[name][row.team_id] += apply_dynamic_scoring_to_round(
+                row.round_number, row.earned_points, sla_config
+            )
 
     # Calculate ranks based on scores
     service_ranks = defaultdict(lambda: defaultdict(int))
@@ -132,7 +91,6 @@ def api_services(team_id):
 
     services = (
         db.session.query(Service)
-        .options(subqueryload(Service.checks))
         .options(subqueryload(Service.team))
         .filter(Service.team_id == team.id)
         .order_by(Service.id)
@@ -141,18 +99,14 @@ def api_services(team_id):
 
     for service in services:
         score_earned = service_dict[service.name].get(service.team_id, 0)
-
-        if dynamic_enabled and service_max_dict:
-            max_score = service_max_dict[service.name].get(service.team_id, 0)
-        else:
-            max_score = len(service.checks) * service.points
+        max_score = service_max_dict[service.name].get(service.team_id, 0)
 
         percent_earned = "{:.1%}".format(score_earned / max_score if max_score != 0 else 0)
 
-        if not service.checks:
+        if service.team_id not in service_max_dict[service.name]:
             check = "Undetermined"
         else:
-            if service.last_check_result():
+            if service.last_result:
                 check = "UP"
             else:
                 check = "DOWN"
@@ -94,6 +94,8 @@ def db_session(app, _db_tables):
         for table in reversed(db.metadata.sorted_tables):
             db.session.execute(table.delete())
         db.session.commit()
+        # Settings cached by this process refer to the deleted rows
+        Setting.clear_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,41 @@
+import asyncio
+
+from scoring_engine.engine.async_executor import run_command, run_command_threadsafe
+
+
+class TestRunCommand:
+    def test_exec(self):
+        assert asyncio.run(run_command("echo 'HELLO WORLD'")) == ("HELLO WORLD\n", False)
+
+    def test_shell(self):
+        assert asyncio.run(run_command("echo HELLO | tr A-Z a-z")) == ("hello\n", False)
+
+    def test_stderr_is_captured(self):
+        output, errored_out = asyncio.run(run_command("ls /definitely/not/a/real/path"))
+        assert errored_out is False
+        assert "/definitely/not/a/real/path" in output
+
+    def test_missing_binary(self):
+        output, errored_out = asyncio.run(run_command("/not/a/real/binary --flag"))
+        assert errored_out is False
+        assert output.startswith("/not/a/real/binary: ")
+
+    def test_timeout_keeps_partial_output(self):
+        output, errored_out = asyncio.run(run_command("echo STARTED; sleep 10", timeout=1))
+        assert errored_out is True
+        assert output == "STARTED\n"
+
+    def test_concurrent_commands(self):
+        async def run_many():
+            return await asyncio.gather(*(run_command("sleep 1") for _ in range(20)))
+
+        loop = asyncio.new_event_loop()
+        start = loop.time()
+        results = loop.run_until_complete(run_many())
+        elapsed = loop.time() - start
+        loop.close()
+        assert results == [("", False)] * 20
+        assert elapsed < 5
+
+    def test_threadsafe(self):
+        assert run_command_threadsafe("echo HELLO") == ("HELLO\n", False)
@@ -1,7 +1,7 @@
 import pytest
 
 from scoring_engine.db import db
-from scoring_engine.engine.basic_check import BasicCheck
+from scoring_engine.engine.basic_check import BasicCheck, split_command
 from scoring_engine.models.account import Account
 from scoring_engine.models.environment import Environment
 from scoring_engine.models.service import Service
@@ -39,3 +39,21 @@ class TestBasicCheck:
         check.required_properties = ["testparam"]
         with pytest.raises(LookupError):
             check.set_properties()
+
+
+class TestSplitCommand:
+    def test_quoted_arguments(self):
+        assert split_command("ping -c 1 127.0.0.1") == ["ping", "-c", "1", "127.0.0.1"]
+        assert split_command("curl --header 'Host: example.com' -A 'a b'") == [
+            "curl",
+            "--header",
+            "Host: example.com",
+            "-A",
+            "a b",
+        ]
+
+    def test_needs_shell(self):
+        assert split_command("echo hi | cat") is None
+        assert split_command("PGPASSWORD=secret psql -h 127.0.0.1") is None
+        assert split_command("echo 'unbalanced") is None
+        assert split_command("") is None
@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scoring_engine.checks.ftp import FTPCheck
+from scoring_engine.checks.icmp import ICMPCheck
+from scoring_engine.db import db
+from scoring_engine.engine.dispatch_plan import DispatchPlan, bump_config_version, get_config_version
+from scoring_engine.models.account import Account
+from scoring_engine.models.environment import Environment
+from scoring_engine.models.property import Property
+from scoring_engine.models.service import Service
+from scoring_engine.models.team import Team
+
+
+CHECKS = {"ICMPCheck": ICMPCheck, "FTPCheck": FTPCheck}
+
+
+class TestDispatchPlan:
+    @pytest.fixture(autouse=True)
+    def setup(self, db_session):
+        self.team = Team(name="Blue Team 1", color="Blue")
+        db.session.add(self.team)
+
+    def test_build(self):
+        service = Service(name="ICMP", team=self.team, check_name="ICMPCheck", host="127.0.0.1", worker_queue="icmp")
+        environment = Environment(service=service, matching_content="^SUCCESS", matching_content_reject="error")
+        db.session.add_all([service, environment])
+        db.session.commit()
+
+        plan = DispatchPlan.build(db.session, CHECKS.get, version=3)
+
+        assert plan.version == 3
+        assert len(plan.services) == 1
+        planned = plan.services[0]
+        assert planned.id == service.id
+        assert planned.team_name == "Blue Team 1"
+        assert planned.worker_queue == "icmp"
+        assert planned.environments[0].id == environment.id
+        assert planned.environments[0].matching_content == "^SUCCESS"
+        assert planned.environments[0].matching_content_reject == "error"
+        assert planned.environments[0].commands == ["ping -c 1 127.0.0.1"]
+
+    def test_one_command_per_account(self):
+        service = Service(name="FTP", team=self.team, check_name="FTPCheck", host="127.0.0.1", port=21)
+        environment = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add_all(
+            [
+                service,
+                environment,
+                Property(environment=environment, name="remotefilepath", value="/f"),
+                Property(environment=environment, name="filecontents", value="x"),
+                Account(username="alice", password="pass1", service=service),
+                Account(username="bob", password="pass2", service=service),
+            ]
+        )
+        db.session.commit()
+
+        commands = DispatchPlan.build(db.session, CHECKS.get).services[0].environments[0].commands
+
+        assert len(commands) == 2
+        assert "alice pass1" in commands[0]
+        assert "bob pass2" in commands[1]
+
+    def test_services_without_environments_are_skipped(self):
+        db.session.add(Service(name="ICMP", team=self.team, check_name="ICMPCheck", host="127.0.0.1"))
+        db.session.commit()
+        assert DispatchPlan.build(db.session, CHECKS.get).services == []
+
+    def test_unknown_check(self):
+        service = Service(name="Other", team=self.team, check_name="NopeCheck", host="127.0.0.1")
+        db.session.add_all([service, Environment(service=service, matching_content="x")])
+        db.session.commit()
+        with pytest.raises(LookupError):
+            DispatchPlan.build(db.session, CHECKS.get)
+
+    def test_is_current(self):
+        plan = DispatchPlan(2, [])
+        assert plan.is_current(2) is True
+        assert plan.is_current(3) is False
+        # An unknown version never matches, so the plan is rebuilt
+        assert DispatchPlan(None, []).is_current(None) is False
+
+
+class TestConfigVersion:
+    @patch("scoring_engine.engine.dispatch_plan._get_redis")
+    def test_get_config_version(self, mock_get_redis):
+        mock_get_redis.return_value.get.return_value = b"7"
+        assert get_config_version() == 7
+        mock_get_redis.return_value.get.return_value = None
+        assert get_config_version() == 0
+
+    @patch("scoring_engine.engine.dispatch_plan._get_redis")
+    def test_redis_unavailable(self, mock_get_redis):
+        mock_get_redis.return_value = MagicMock(**{"get.side_effect": ConnectionError, "incr.side_effect": ConnectionError})
+        assert get_config_version() is None
+        bump_config_version()
+
+    @patch("scoring_engine.engine.dispatch_plan._get_redis")
+    def test_bump(self, mock_get_redis):
+        bump_config_version()
+        mock_get_redis.return_value.incr.assert_called_once_with("se:dispatch_config_version")
@@ -1,3 +1,4 @@
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -31,6 +32,7 @@ from scoring_engine.checks.webapp_scoringengine import WebappScoringengineCheck
 from scoring_engine.checks.winrm import WinRMCheck
 from scoring_engine.checks.wordpress import WordpressCheck
 from scoring_engine.db import db
+from scoring_engine.engine.dispatch_plan import DispatchPlan
 from scoring_engine.engine.engine import Engine
 from scoring_engine.models.environment import Environment
 from scoring_engine.models.service import Service
@@ -289,5 +291,427 @@ class TestEngine:
         assert db.session.query(Round).count() == num_rounds
         assert db.session.query(Check).count() == total_services * num_rounds
 
+    @patch("scoring_engine.engine.engine.RoundResultStream")
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_streamed_results_skip_polling(self, mock_execute_command, mock_stream_cls):
+        """Results pushed onto the round stream are scored without polling the result backend."""
+        team = Team(name="Blue Team 1", color="Blue")
+        db.session.add(team)
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        db.session.add(service)
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add(env)
+        db.session.commit()
+
+        pushed = []
+
+        def fake_apply_async(args=None, queue=None, countdown=0):
+            job = dict(args[0])
+            assert job["results_key"] == "se:round_results:1"
+            job.update(task_id="task-1", errored_out=False, output="SUCCESS", command="echo test")
+            pushed.append(job)
+            return MagicMock(id="task-1")
+
+        mock_execute_command.apply_async.side_effect = fake_apply_async
+        mock_stream = mock_stream_cls.return_value
+        mock_stream.key = "se:round_results:1"
+        mock_stream.pop.side_effect = lambda timeout: pushed.pop(0) if pushed else None
+
+        engine = Engine(total_rounds=1)
+        engine.run()
+
+        mock_execute_command.AsyncResult.assert_not_called()
+        mock_stream.delete.assert_called_once_with()
+
+        from scoring_engine.models.check import Check
+
+        check = db.session.query(Check).one()
+        assert check.result is True
+        assert check.command == "echo test"
+
+    @patch("scoring_engine.engine.engine.RoundResultStream")
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_stream_unavailable_falls_back_to_polling(self, mock_execute_command, mock_stream_cls):
+        """If the round stream can't be read, the engine polls the result backend instead."""
+        team = Team(name="Blue Team 1", color="Blue")
+        db.session.add(team)
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        db.session.add(service)
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add(env)
+        db.session.commit()
+
+        mock_result = MagicMock()
+        mock_result.id = "task-1"
+        mock_result.state = "SUCCESS"
+        mock_result.result = {
+            "environment_id": env.id,
+            "errored_out": False,
+            "output": "FAILURE",
+            "command": "echo test",
+        }
+        mock_execute_command.apply_async.return_value = mock_result
+        mock_execute_command.AsyncResult.return_value = mock_result
+        mock_stream_cls.return_value.pop.side_effect = ConnectionError("redis down")
+
+        engine = Engine(total_rounds=1)
+        engine.run()
+
+        from scoring_engine.models.check import Check
+
+        check = db.session.query(Check).one()
+        assert check.result is False
+
+    @patch("scoring_engine.engine.engine.insert")
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_failed_bulk_insert_cleans_up_round(self, mock_execute_command, mock_insert):
+        """A failure while writing the round's checks removes every trace of the round."""
+        team = Team(name="Blue Team 1", color="Blue")
+        db.session.add(team)
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        db.session.add(service)
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add(env)
+        db.session.commit()
+
+        mock_result = MagicMock()
+        mock_result.id = "task-1"
+        mock_result.state = "SUCCESS"
+        mock_result.result = {
+            "environment_id": env.id,
+            "errored_out": False,
+            "output": "SUCCESS",
+            "command": "echo test",
+        }
+        mock_execute_command.apply_async.return_value = mock_result
+        mock_execute_command.AsyncResult.return_value = mock_result
+        mock_insert.side_effect = RuntimeError("database went away")
+
+        engine = Engine(total_rounds=1)
+        with pytest.raises(SystemExit):
+            engine.run()
+
+        from scoring_engine.models.check import Check
+        from scoring_engine.models.kb import KB
+        from scoring_engine.models.round import Round
+
+        assert db.session.query(Round).count() == 0
+        assert db.session.query(KB).count() == 0
+        assert db.session.query(Check).count() == 0
+
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_saved_rounds_advance_service_streaks(self, mock_execute_command):
+        """The engine folds every saved round into the services' streak counters."""
+        team = Team(name="Blue Team 1", color="Blue")
+        db.session.add(team)
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        db.session.add(service)
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add(env)
+        db.session.commit()
+
+        outputs = iter(["SUCCESS", "FAILURE", "FAILURE", "SUCCESS", "FAILURE"])
+
+        def fake_apply_async(args=None, queue=None, countdown=0):
+            mock_result = MagicMock()
+            mock_result.id = "task-1"
+            mock_result.state = "SUCCESS"
+            mock_result.result = {
+                "environment_id": env.id,
+                "errored_out": False,
+                "output": next(outputs),
+                "command": "echo test",
+            }
+            mock_execute_command.AsyncResult.return_value = mock_result
+            return mock_result
+
+        mock_execute_command.apply_async.side_effect = fake_apply_async
+
+        Engine(total_rounds=5).run()
+
+        service = db.session.get(Service, service.id)
+        assert (service.current_streak, service.max_streak, service.last_result) == (1, 2, False)
+
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_worker_side_matching_uses_worker_verdict(self, mock_execute_command):
+        """With worker_side_matching the job carries the patterns and the worker's verdict is stored."""
+        team = Team(name="Blue Team 1", color="Blue")
+        db.session.add(team)
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        db.session.add(service)
+        env = Environment(service=service, matching_content="^SUCCESS", matching_content_reject="error")
+        db.session.add(env)
+        db.session.commit()
+
+        def fake_apply_async(args=None, queue=None, countdown=0):
+            job = args[0]
+            assert job["matching_content"] == "^SUCCESS"
+            assert job["matching_content_reject"] == "error"
+            mock_result = MagicMock()
+            mock_result.id = "task-1"
+            mock_result.state = "SUCCESS"
+            # Output doesn't match, so the verdict can only have come from the worker
+            mock_result.result = {
+                "environment_id": env.id,
+                "errored_out": False,
+                "result": True,
+                "reason": "Check Finished Successfully",
+                "output": "excerpt",
+                "command": "echo test",
+            }
+            mock_execute_command.AsyncResult.return_value = mock_result
+            return mock_result
+
+        mock_execute_command.apply_async.side_effect = fake_apply_async
+
+        engine = Engine(total_rounds=1)
+        engine.config.worker_side_matching = True
+        try:
+            engine.run()
+        finally:
+            engine.config.worker_side_matching = False
+
+        from scoring_engine.models.check import Check
+
+        check = db.session.query(Check).one()
+        assert check.result is True
+        assert check.output == "excerpt"
+
+    @patch("scoring_engine.engine.engine.RoundResultStream")
+    @patch("scoring_engine.engine.engine.execute_commands")
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_batched_dispatch(self, mock_execute_command, mock_execute_commands, mock_stream_cls):
+        """With task_batch_size set, jobs go out in one task per queue shard and are scored individually."""
+        team = Team(name="Blue Team 1", color="Blue")
+        db.session.add(team)
+        for num in range(3):
+            service = Service(name="Service %d" % num, team=team, check_name="ICMPCheck", host="127.0.0.1")
+            db.session.add(service)
+            db.session.add(Environment(service=service, matching_content="^SUCCESS"))
+        db.session.commit()
+
+        batches = {}
+
+        def fake_apply_async(args=None, queue=None, task_id=None, soft_time_limit=None, time_limit=None):
+            jobs = args[0]
+            assert queue == "main"
+            assert soft_time_limit >= 30 + 10
+            for job in jobs:
+                assert job["job_id"].startswith(task_id + ":")
+                assert 0 <= job["delay"] <= 10
+            batches[task_id] = [
+                dict(job, errored_out=False, output="SUCCESS" if job["job_id"].endswith(":0") else "FAIL")
+                for job in jobs
+            ]
+
+        mock_execute_commands.apply_async.side_effect = fake_apply_async
+        mock_execute_command.AsyncResult.side_effect = lambda task_id: MagicMock(
+            state="SUCCESS", result=batches[task_id]
+        )
+        mock_stream_cls.return_value.pop.return_value = None
+
+        engine = Engine(total_rounds=1)
+        engine.config.task_batch_size = 2
+        engine.config.task_jitter_max_delay = 10
+        try:
+            engine.run()
+        finally:
+            engine.config.task_batch_size = 0
+            engine.config.task_jitter_max_delay = 0
+
+        mock_execute_command.apply_async.assert_not_called()
+        assert sorted(len(jobs) for jobs in batches.values()) == [1, 2]
+
+        from scoring_engine.models.check import Check
+
+        results = sorted(check.result for check in db.session.query(Check).all())
+        assert results == [False, True, True]
+
+    @patch("scoring_engine.engine.engine.get_config_version")
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_dispatch_plan_reused_until_config_changes(self, mock_execute_command, mock_get_config_version):
+        """Services are only reloaded when the dispatch config version changes."""
+        team = Team(name="Blue Team 1", color="Blue")
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add_all([team, service, env])
+        db.session.commit()
+
+        mock_result = MagicMock()
+        mock_result.id = "task-1"
+        mock_result.state = "SUCCESS"
+        mock_result.result = {"environment_id": env.id, "errored_out": False, "output": "SUCCESS", "command": "x"}
+        mock_execute_command.apply_async.return_value = mock_result
+        mock_execute_command.AsyncResult.return_value = mock_result
+
+        mock_get_config_version.return_value = 1
+        engine = Engine(total_rounds=3)
+        with patch("scoring_engine.engine.engine.DispatchPlan.build", wraps=DispatchPlan.build) as mock_build:
+            engine.run()
+            assert mock_build.call_count == 1
+
+            mock_get_config_version.return_value = 2
+            engine.get_dispatch_plan()
+            assert mock_build.call_count == 2
+
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_pipelined_rounds(self, mock_execute_command):
+        """Rounds saved in the background keep their numbers and checks in order."""
+        team = Team(name="Blue Team 1", color="Blue")
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add_all([team, service, env])
+        db.session.commit()
+
+        mock_result = MagicMock()
+        mock_result.id = "task-1"
+        mock_result.state = "SUCCESS"
+        mock_result.result = {"environment_id": env.id, "errored_out": False, "output": "SUCCESS", "command": "x"}
+        mock_execute_command.apply_async.return_value = mock_result
+        mock_execute_command.AsyncResult.return_value = mock_result
+
+        engine = Engine(total_rounds=3)
+        engine.config.engine_pipelined_rounds = True
+        try:
+            engine.run()
+        finally:
+            engine.config.engine_pipelined_rounds = False
+
+        from scoring_engine.models.check import Check
+        from scoring_engine.models.round import Round
+        from scoring_engine.models.round_score import TeamRoundScore
+
+        db.session.expire_all()
+        rounds = db.session.query(Round).order_by(Round.id).all()
+        assert [round_obj.number for round_obj in rounds] == [1, 2, 3]
+        for round_obj in rounds:
+            assert round_obj.round_end is not None
+            assert [check.result for check in round_obj.checks] == [True]
+        assert db.session.query(Check).count() == 3
+        team_scores = db.session.query(TeamRoundScore).order_by(TeamRoundScore.round_number).all()
+        assert [(score.round_number, score.earned_points) for score in team_scores] == [(1, 100), (2, 100), (3, 100)]
+
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_pipelined_rounds_commit_during_rollback_check(self, mock_execute_command):
+        """A round committed while the engine checks for a rollback isn't taken for one."""
+        from scoring_engine.models.round import Round
+
+        team = Team(name="Blue Team 1", color="Blue")
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add_all([team, service, env])
+        db.session.commit()
+
+        mock_result = MagicMock()
+        mock_result.id = "task-1"
+        mock_result.state = "SUCCESS"
+        mock_result.result = {"environment_id": env.id, "errored_out": False, "output": "SUCCESS", "command": "x"}
+        mock_execute_command.apply_async.return_value = mock_result
+        mock_execute_command.AsyncResult.return_value = mock_result
+
+        engine = Engine(total_rounds=3)
+        engine_thread = threading.current_thread()
+        db_read = threading.Event()
+        get_last_round_num = Round.get_last_round_num
+        save_round = engine._save_round
+
+        def save_after_db_read(finished_round):
+            db_read.wait(5)
+            db_read.clear()
+            return save_round(finished_round)
+
+        def commit_after_db_read():
+            # The persister commits the queued round right after the engine read the db
+            last_round_num = get_last_round_num()
+            if threading.current_thread() is engine_thread and engine._persister is not None:
+                db_read.set()
+                engine._persister.wait()
+            return last_round_num
+
+        engine._save_round = save_after_db_read
+        engine.config.engine_pipelined_rounds = True
+        try:
+            with patch.object(Round, "get_last_round_num", side_effect=commit_after_db_read), patch(
+                "scoring_engine.engine.round_pipeline.RoundPersister.discard_pending"
+            ) as mock_discard_pending:
+                engine.run()
+        finally:
+            engine.config.engine_pipelined_rounds = False
+
+        mock_discard_pending.assert_not_called()
+        db.session.expire_all()
+        assert [number for (number,) in db.session.query(Round.number).order_by(Round.number)] == [1, 2, 3]
+
+    @patch("scoring_engine.engine.engine.update_round_cache")
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_pipelined_round_cache_failure_keeps_round(self, mock_execute_command, mock_update_round_cache):
+        """A round whose caches fail to rebuild in the background stays saved."""
+        team = Team(name="Blue Team 1", color="Blue")
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add_all([team, service, env])
+        db.session.commit()
+
+        mock_result = MagicMock()
+        mock_result.id = "task-1"
+        mock_result.state = "SUCCESS"
+        mock_result.result = {"environment_id": env.id, "errored_out": False, "output": "SUCCESS", "command": "x"}
+        mock_execute_command.apply_async.return_value = mock_result
+        mock_execute_command.AsyncResult.return_value = mock_result
+        mock_update_round_cache.side_effect = RuntimeError("redis went away")
+
+        engine = Engine(total_rounds=2)
+        engine.config.engine_pipelined_rounds = True
+        try:
+            engine.run()
+        finally:
+            engine.config.engine_pipelined_rounds = False
+
+        from scoring_engine.models.check import Check
+        from scoring_engine.models.round import Round
+
+        assert not engine._persister.failed.is_set()
+        # Both rebuilds are waiting for a retry, drop them so they don't outlive the test
+        assert [finished_round.number for finished_round in engine._persister._stale_rounds] == [1, 2]
+        engine._persister._stale_rounds.clear()
+        db.session.expire_all()
+        assert [number for (number,) in db.session.query(Round.number).order_by(Round.number)] == [1, 2]
+        assert db.session.query(Check).count() == 2
+
+    @patch("scoring_engine.engine.engine.insert")
+    @patch("scoring_engine.engine.engine.execute_command")
+    def test_pipelined_round_failure_cleans_up(self, mock_execute_command, mock_insert):
+        """A round that fails to save in the background is removed and stops the engine."""
+        team = Team(name="Blue Team 1", color="Blue")
+        service = Service(name="ICMP Service", team=team, check_name="ICMPCheck", host="127.0.0.1")
+        env = Environment(service=service, matching_content="^SUCCESS")
+        db.session.add_all([team, service, env])
+        db.session.commit()
+
+        mock_result = MagicMock()
+        mock_result.id = "task-1"
+        mock_result.state = "SUCCESS"
+        mock_result.result = {"environment_id": env.id, "errored_out": False, "output": "SUCCESS", "command": "x"}
+        mock_execute_command.apply_async.return_value = mock_result
+        mock_execute_command.AsyncResult.return_value = mock_result
+        mock_insert.side_effect = RuntimeError("database went away")
+
+        engine = Engine(total_rounds=2)
+        engine.config.engine_pipelined_rounds = True
+        try:
+            with pytest.raises(SystemExit):
+                engine.run()
+        finally:
+            engine.config.engine_pipelined_rounds = False
+
+        from scoring_engine.models.check import Check
+        from scoring_engine.models.kb import KB
+        from scoring_engine.models.round import Round
+
+        db.session.expire_all()
+        assert db.session.query(Round).count() == 0
+        assert db.session.query(KB).count() == 0
+        assert db.session.query(Check).count() == 0
+
     # todo figure out how to test the remaining functionality of engine
     # where we're waiting for the worker queues to finish and everything
@@ -1,7 +1,13 @@
+import threading
+
 import mock
 from celery.exceptions import SoftTimeLimitExceeded
 
-from scoring_engine.engine.execute_command import execute_command
+# Patched through the module object: other tests re-import the scoring_engine
+# package, after which the dotted path no longer resolves
+import scoring_engine.engine.execute_command as execute_command_module
+from scoring_engine.engine.basic_check import CHECK_FAILURE_TEXT, CHECK_SUCCESS_TEXT
+from scoring_engine.engine.execute_command import execute_command, execute_commands
 from scoring_engine.engine.job import Job
 
 
@@ -21,3 +27,83 @@ class TestWorker(object):
         job = Job(environment_id="12345", command="echo 'HELLO'")
         task = execute_command.run(job)
         assert task["errored_out"] is True
+
+    def test_worker_side_matching(self):
+        completed = mock.Mock(stdout=b"SUCCESS " + b"x" * 2000)
+        with mock.patch.object(execute_command_module.subprocess, "run", return_value=completed):
+            job = Job(environment_id=1, command="echo 'HELLO'", matching_content="^SUCCESS")
+            task = execute_command.run(job)
+        assert task["errored_out"] is False
+        assert task["result"] is True
+        assert task["reason"] == CHECK_SUCCESS_TEXT
+        assert len(task["output"]) == 500
+        assert "matching_content" not in task
+
+    def test_worker_side_matching_reject(self):
+        completed = mock.Mock(stdout=b"SUCCESS but error")
+        with mock.patch.object(execute_command_module.subprocess, "run", return_value=completed):
+            job = Job(
+                environment_id=1,
+                command="echo 'HELLO'",
+                matching_content="^SUCCESS",
+                matching_content_reject="error",
+            )
+            task = execute_command.run(job)
+        assert task["result"] is False
+        assert task["reason"] == CHECK_FAILURE_TEXT
+        assert "matching_content_reject" not in task
+
+    def test_native_runner(self):
+        runner = mock.Mock(return_value="SUCCESS\n")
+        with mock.patch.object(execute_command_module.config, "worker_native_checks", True), mock.patch.object(
+            execute_command_module.native_runners, "parse_command", return_value=(runner, ["a"])
+        ), mock.patch.object(execute_command_module.subprocess, "run") as mock_run:
+            task = execute_command.run(Job(environment_id="12345", command="ssh_check a"))
+        runner.assert_called_once_with(["a"])
+        mock_run.assert_not_called()
+        assert task["errored_out"] is False
+        assert task["output"] == "SUCCESS\n"
+
+    def test_native_runner_crash(self):
+        runner = mock.Mock(side_effect=ValueError("boom"))
+        with mock.patch.object(execute_command_module.config, "worker_native_checks", True), mock.patch.object(
+            execute_command_module.native_runners, "parse_command", return_value=(runner, [])
+        ):
+            task = execute_command.run(Job(environment_id="12345", command="ssh_check"))
+        assert task["errored_out"] is False
+        assert "ValueError: boom" in task["output"]
+
+    def test_asyncio_executor(self):
+        with mock.patch.object(execute_command_module.config, "worker_executor", "asyncio"), mock.patch.object(
+            execute_command_module.async_executor, "run_command_threadsafe", return_value=("partial", True)
+        ) as mock_run:
+            task = execute_command.run(Job(environment_id="12345", command="echo 'HELLO'"))
+        mock_run.assert_called_once_with("echo 'HELLO'")
+        assert task["errored_out"] is True
+        assert task["output"] == "partial"
+
+    def test_execute_commands(self):
+        jobs = [
+            Job(environment_id=1, command="echo 'ONE'", job_id="batch:0", delay=0.2),
+            Job(environment_id=2, command="echo 'TWO'", job_id="batch:1"),
+        ]
+        with mock.patch.object(execute_command_module.subprocess, "run") as mock_run, mock.patch.object(
+            execute_command_module, "push_result"
+        ) as mock_push:
+            mock_run.side_effect = lambda command, **kwargs: mock.Mock(stdout=command.encode())
+            results = execute_commands.run(jobs)
+        assert [job["output"] for job in results] == ["echo 'ONE'", "echo 'TWO'"]
+        assert all(job["errored_out"] is False for job in results)
+        assert all("delay" not in job for job in results)
+        assert sorted(call.args[1] for call in mock_push.call_args_list) == ["batch:0", "batch:1"]
+
+    def test_execute_commands_empty(self):
+        assert execute_commands.run([]) == []
+
+    def test_matcher_per_thread(self):
+        matchers = []
+        thread = threading.Thread(target=lambda: matchers.append(execute_command_module._get_matcher()))
+        thread.start()
+        thread.join()
+        assert execute_command_module._get_matcher() is execute_command_module._get_matcher()
+        assert execute_command_module._get_matcher() is not matchers[0]
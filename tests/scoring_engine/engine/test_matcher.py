@@ -0,0 +1,98 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from scoring_engine.engine.matcher import ContentMatcher, can_run_away
+
+
+def make_environment(matching_content, matching_content_reject=None, environment_id=1):
+    return SimpleNamespace(
+        id=environment_id,
+        matching_content=matching_content,
+        matching_content_reject=matching_content_reject,
+    )
+
+
+class TestContentMatcher:
+    def setup_method(self):
+        self.matcher = ContentMatcher(timeout=1, processes=1)
+
+    def teardown_method(self):
+        self.matcher.close()
+
+    def test_search(self):
+        assert self.matcher.search(1, "^SUCCESS", "SUCCESS all good") is True
+        assert self.matcher.search(1, "^SUCCESS", "FAILURE") is False
+        # Searched in process, no helper is started
+        assert self.matcher._pool is None
+
+    def test_search_in_helper(self):
+        assert self.matcher.search(1, "(a+)+$", "aaa") is True
+        assert self.matcher.search(1, "(a+)+$", "bbb") is False
+        assert self.matcher._pool is not None
+
+    def test_long_output_searched_in_helper(self):
+        assert self.matcher.search(1, "^SUCCESS", "SUCCESS" + " " * 2000) is True
+        assert self.matcher.search(1, "^SUCCESS", "FAILURE" + " " * 2000) is False
+        assert self.matcher._pool is not None
+
+    def test_matches_with_reject(self):
+        environment = make_environment("^SUCCESS", matching_content_reject="error")
+        assert self.matcher.matches(environment, "SUCCESS") is True
+        assert self.matcher.matches(environment, "SUCCESS with error") is False
+        assert self.matcher.matches(environment, "FAILURE") is False
+
+    def test_pattern_compiled_once(self):
+        self.matcher.search(1, "^SUCCESS", "SUCCESS")
+        key = self.matcher._patterns[1]
+        self.matcher.search(1, "^SUCCESS", "other output")
+        assert self.matcher._patterns[1] is key
+
+    def test_edited_pattern_replaces_cached_entry(self):
+        assert self.matcher.search(1, "^SUCCESS", "DONE") is False
+        assert self.matcher.search(1, "^DONE", "DONE") is True
+        assert len(self.matcher._patterns) == 1
+
+    def test_invalid_pattern_falls_back_to_literal(self):
+        assert self.matcher.search(1, "foo(bar", "xx foo(bar xx") is True
+        assert self.matcher.search(1, "foo(bar", "foobar") is False
+        assert self.matcher._pool is None
+
+    def test_invalidate(self):
+        environment = make_environment("^SUCCESS", matching_content_reject="error")
+        self.matcher.matches(environment, "SUCCESS")
+        self.matcher.invalidate(1)
+        assert self.matcher._patterns == {}
+
+    def test_timeout_falls_back_to_literal(self):
+        pattern = "(a+)+$"
+        assert self.matcher.search(1, pattern, "a" * 40 + "b") is False
+        assert self.matcher._pool is None
+        # The pool is restarted for the next search
+        assert self.matcher.search(2, "(a+)+$", "aaa") is True
+
+    def test_unflagged_pattern_times_out_on_long_output(self):
+        # Quadratic backtracking that can_run_away doesn't flag
+        pattern = "\\s*x\\s*$"
+        assert can_run_away(pattern) is False
+        start = time.monotonic()
+        assert self.matcher.search(1, pattern, " " * 200000) is False
+        assert time.monotonic() - start < 5
+        assert self.matcher._pool is None
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["(a+)+$", "(\\w+\\s?)*$", "(a|ab)*c", "(.*)x\\1", "a.*b.*c.*d", "(?:x*)*y"],
+)
+def test_can_run_away(pattern):
+    assert can_run_away(pattern) is True
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["^SUCCESS", "foo.*bar", "[a-z]+@[a-z]+\\.com", "(ab){2,5}", "HTTP/1\\.[01] 200", "(GET|POST) /"],
+)
+def test_cannot_run_away(pattern):
+    assert can_run_away(pattern) is False
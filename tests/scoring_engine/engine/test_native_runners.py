@@ -0,0 +1,51 @@
+import shlex
+import sys
+
+from scoring_engine.engine import native_runners
+from scoring_engine.engine.basic_check import CHECKS_BIN_PATH
+from scoring_engine.engine.native_runners import ScriptRunner, get_runner, parse_command
+
+
+class TestParseCommand:
+    def test_registered_script(self):
+        command = "{0}/ssh_check 127.0.0.1 22 {1} {2} {3} false".format(
+            CHECKS_BIN_PATH, shlex.quote("some user"), shlex.quote("pa$$;word"), shlex.quote("id;ls")
+        )
+        runner, args = parse_command(command)
+        assert runner is get_runner("ssh_check")
+        assert args == ["127.0.0.1", "22", "some user", "pa$$;word", "id;ls", "false"]
+
+    def test_shell_syntax(self):
+        assert parse_command(CHECKS_BIN_PATH + "/ssh_check 127.0.0.1 22 | cat") is None
+        assert parse_command(CHECKS_BIN_PATH + "/ssh_check $(whoami)") is None
+
+    def test_unregistered_commands(self):
+        assert parse_command("ping -c 1 127.0.0.1") is None
+        assert parse_command(CHECKS_BIN_PATH + "/rdp_check user pass 127.0.0.1 3389") is None
+        assert parse_command("/tmp/ssh_check 127.0.0.1") is None
+
+    def test_unbalanced_quotes(self):
+        assert parse_command(CHECKS_BIN_PATH + "/ssh_check 'oops") is None
+
+
+class TestScriptRunner:
+    def test_output_and_argv(self, tmp_path):
+        script = tmp_path / "example_check"
+        script.write_text("import sys\nprint('SUCCESS', sys.argv[1:])\nprint('oops', file=sys.stderr)\n")
+        argv = sys.argv
+        assert ScriptRunner(str(script))(["a", "b"]) == "SUCCESS ['a', 'b']\noops\n"
+        assert sys.argv is argv
+
+    def test_sys_exit(self, tmp_path):
+        script = tmp_path / "example_check"
+        script.write_text("import sys\nprint('[-] Reachable')\nsys.exit(1)\nprint('unreachable')\n")
+        assert ScriptRunner(str(script))([]) == "[-] Reachable\n"
+
+    def test_sys_exit_message(self, tmp_path):
+        script = tmp_path / "example_check"
+        script.write_text("import sys\nsys.exit('Usage: example_check host')\n")
+        assert ScriptRunner(str(script))([]) == "Usage: example_check host\n"
+
+    def test_preload_skips_missing_modules(self, monkeypatch):
+        monkeypatch.setattr(native_runners, "_preload_modules", {"json", "not_a_real_module_xyz"})
+        native_runners.preload()
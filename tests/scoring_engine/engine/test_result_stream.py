@@ -0,0 +1,45 @@
+import json
+from unittest.mock import patch
+
+from scoring_engine.engine.result_stream import RoundResultStream, push_result, round_results_key
+
+
+class TestResultStream(object):
+
+    def test_round_results_key(self):
+        assert round_results_key(12) == "se:round_results:12"
+
+    @patch("scoring_engine.engine.result_stream._get_redis")
+    def test_push_result(self, mock_get_redis):
+        pipe = mock_get_redis.return_value.pipeline.return_value
+        job = {"environment_id": 1, "output": "HELLO", "results_key": "se:round_results:3"}
+        push_result(job, "task-1")
+        key, payload = pipe.rpush.call_args.args
+        assert key == "se:round_results:3"
+        assert json.loads(payload)["task_id"] == "task-1"
+        pipe.expire.assert_called_once()
+        pipe.execute.assert_called_once_with()
+
+    @patch("scoring_engine.engine.result_stream._get_redis")
+    def test_push_result_without_key(self, mock_get_redis):
+        push_result({"environment_id": 1, "output": "HELLO"}, "task-1")
+        mock_get_redis.assert_not_called()
+
+    @patch("scoring_engine.engine.result_stream._get_redis")
+    def test_push_result_swallows_errors(self, mock_get_redis):
+        mock_get_redis.return_value.pipeline.side_effect = ConnectionError("redis down")
+        push_result({"results_key": "se:round_results:3"}, "task-1")
+
+    @patch("scoring_engine.engine.result_stream._get_redis")
+    def test_pop(self, mock_get_redis):
+        mock_get_redis.return_value.blpop.return_value = (b"se:round_results:1", json.dumps({"task_id": "abc"}))
+        stream = RoundResultStream(1)
+        assert stream.pop(5) == {"task_id": "abc"}
+        mock_get_redis.return_value.blpop.assert_called_once_with(["se:round_results:1"], timeout=5)
+
+    @patch("scoring_engine.engine.result_stream._get_redis")
+    def test_pop_never_blocks_forever(self, mock_get_redis):
+        mock_get_redis.return_value.blpop.return_value = None
+        stream = RoundResultStream(1)
+        assert stream.pop(0) is None
+        assert mock_get_redis.return_value.blpop.call_args.kwargs["timeout"] == 1
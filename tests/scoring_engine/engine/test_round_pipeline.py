@@ -0,0 +1,102 @@
+import threading
+from unittest.mock import MagicMock
+
+from scoring_engine.engine.round_pipeline import FinishedRound, RoundPersister
+
+
+def finished(number):
+    return FinishedRound(number, None, [])
+
+
+class TestRoundPersister(object):
+    def test_saves_rounds_in_order(self):
+        saved = []
+        persister = RoundPersister(MagicMock(), lambda r: saved.append(r.number), MagicMock(), MagicMock(), 0)
+        for number in range(1, 6):
+            persister.submit(finished(number))
+        persister.wait()
+        assert saved == [1, 2, 3, 4, 5]
+        assert persister.last_committed_round == 5
+        assert not persister.failed.is_set()
+
+    def test_failure_discards_following_rounds(self):
+        saved = []
+        discarded = []
+
+        def save_round(finished_round):
+            if finished_round.number == 2:
+                raise RuntimeError("database went away")
+            saved.append(finished_round.number)
+
+        persister = RoundPersister(MagicMock(), save_round, MagicMock(), discarded.append, 0)
+        for number in range(1, 4):
+            persister.submit(finished(number))
+        persister.wait()
+        assert saved == [1]
+        assert discarded == [2, 3]
+        assert persister.last_committed_round == 1
+        assert persister.failed.is_set()
+
+    def test_discard_pending(self):
+        started = threading.Event()
+        release = threading.Event()
+        saved = []
+        discarded = []
+
+        def save_round(finished_round):
+            started.set()
+            release.wait(5)
+            saved.append(finished_round.number)
+
+        persister = RoundPersister(MagicMock(), save_round, MagicMock(), discarded.append, 0)
+        persister.submit(finished(1))
+        persister.submit(finished(2))
+        assert started.wait(5)
+        timer = threading.Timer(0.2, release.set)
+        timer.start()
+        persister.discard_pending()
+        # Round 1 was already being saved, round 2 never gets saved
+        assert saved == [1]
+        assert discarded == [2]
+
+        persister.submit(finished(3))
+        persister.wait()
+        assert saved == [1, 3]
+
+    def test_cache_failure_keeps_round(self):
+        saved = []
+        rebuilt = []
+        discarded = []
+        failures = [RuntimeError("redis went away")]
+
+        def rebuild_caches(finished_round):
+            if finished_round.number == 2 and failures:
+                raise failures.pop()
+            rebuilt.append(finished_round.number)
+
+        persister = RoundPersister(MagicMock(), lambda r: saved.append(r.number), rebuild_caches, discarded.append, 0)
+        for number in range(1, 4):
+            persister.submit(finished(number))
+        persister.wait()
+        # Round 2 stays saved and its caches are rebuilt again before round 3's
+        assert saved == [1, 2, 3]
+        assert rebuilt == [1, 2, 3]
+        assert discarded == []
+        assert persister.last_committed_round == 3
+        assert not persister.failed.is_set()
+
+    def test_cache_failure_retried_when_idle(self):
+        rebuilt = threading.Event()
+        failures = [RuntimeError("redis went away")]
+
+        def rebuild_caches(finished_round):
+            if failures:
+                raise failures.pop()
+            rebuilt.set()
+
+        persister = RoundPersister(MagicMock(), MagicMock(), rebuild_caches, MagicMock(), 0)
+        persister.CACHE_RETRY_INTERVAL = 0.1
+        persister.submit(finished(1))
+        persister.wait()
+        assert persister.last_committed_round == 1
+        assert rebuilt.wait(5)
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+
+from celery.backends.redis import RedisBackend
+
+from scoring_engine.engine.task_results import batch_job_id, celery_task_id, fetch_task_results
+
+
+def _redis_task(stored):
+    backend = MagicMock(spec=RedisBackend)
+    backend.client = MagicMock()
+    backend.get_key_for_task.side_effect = lambda task_id: "celery-task-meta-" + task_id
+    backend.decode_result.side_effect = lambda value: {"status": "SUCCESS", "result": value}
+    pipe = backend.client.pipeline.return_value
+    pipe.execute.side_effect = lambda: [
+        [stored.get(key.removeprefix("celery-task-meta-")) for key in call.args[0]] for call in pipe.mget.call_args_list
+    ]
+    task = MagicMock()
+    task.backend = backend
+    return task
+
+
+class TestFetchTaskResults(object):
+
+    def test_empty(self):
+        task = MagicMock()
+        assert fetch_task_results(task, []) == {}
+        task.AsyncResult.assert_not_called()
+
+    def test_redis_backend_uses_chunked_mget(self):
+        task = _redis_task({"a": "out-a", "c": "out-c"})
+        metas = fetch_task_results(task, ["a", "b", "c"], chunk_size=2)
+        assert metas == {"a": {"status": "SUCCESS", "result": "out-a"}, "c": {"status": "SUCCESS", "result": "out-c"}}
+        pipe = task.backend.client.pipeline.return_value
+        assert pipe.mget.call_count == 2
+        pipe.execute.assert_called_once_with()
+        task.AsyncResult.assert_not_called()
+
+    def test_other_backend_falls_back_to_async_result(self):
+        task = MagicMock()
+        states = {"a": MagicMock(state="SUCCESS", result={"output": "x"}), "b": MagicMock(state="PENDING")}
+        task.AsyncResult.side_effect = lambda task_id: states[task_id]
+        metas = fetch_task_results(task, ["a", "b"])
+        assert metas == {"a": {"status": "SUCCESS", "result": {"output": "x"}}}
+
+    def test_batched_jobs_are_split_out_of_their_batch(self):
+        task = _redis_task({"batch-1": [{"output": "x"}, {"output": "y"}]})
+        metas = fetch_task_results(task, [batch_job_id("batch-1", 1), batch_job_id("batch-2", 0), "single"])
+        assert metas == {"batch-1:1": {"status": "SUCCESS", "result": {"output": "y"}}}
+        # One key per batch, not per job
+        pipe = task.backend.client.pipeline.return_value
+        assert sorted(pipe.mget.call_args.args[0]) == ["celery-task-meta-batch-1", "celery-task-meta-batch-2", "celery-task-meta-single"]
+
+    def test_failed_batch_fails_every_job(self):
+        task = MagicMock()
+        task.AsyncResult.return_value = MagicMock(state="REVOKED", result=None)
+        metas = fetch_task_results(task, [batch_job_id("batch-1", 0), batch_job_id("batch-1", 1)])
+        assert metas == {
+            "batch-1:0": {"status": "REVOKED", "result": None},
+            "batch-1:1": {"status": "REVOKED", "result": None},
+        }
+        task.AsyncResult.assert_called_once_with("batch-1")
+
+    def test_celery_task_id(self):
+        assert celery_task_id("batch-1:3") == "batch-1"
+        assert celery_task_id("single") == "single"
@@ -1,5 +1,12 @@
+import html
+
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import joinedload, undefer_group
+
 from scoring_engine.db import db
-from scoring_engine.models.check import Check
+from scoring_engine.models.check import Check, delete_round_checks
+from scoring_engine.models.check_output import CheckOutput, store_check_outputs
+from scoring_engine.models.compressed_text import FORMAT_ZLIB_V1
 from scoring_engine.models.round import Round
 from tests.scoring_engine.helpers import generate_sample_model_tree
 
@@ -48,3 +55,140 @@ class TestCheck:
         assert check.command == "example command"
         assert check.completed is True
         assert type(check.local_completed_timestamp) is str
+
+    def test_finished_row(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_obj = Round(number=1)
+        db.session.add(round_obj)
+        db.session.commit()
+        row = Check.finished_row(round_obj.id, service.id, False, "Bad", "<b>output</b>", "example command")
+        row["output_id"] = store_check_outputs(db.session, [row["output"]])[row.pop("output")]
+        db.session.execute(Check.__table__.insert(), [row])
+        db.session.commit()
+        check = db.session.query(Check).one()
+        assert check.round == round_obj
+        assert check.service == service
+        assert check.result is False
+        assert check.reason == "Bad"
+        assert check.output == "&lt;b&gt;output&lt;/b&gt;"
+        assert check.command == "example command"
+        assert check.completed is True
+        assert check.completed_timestamp is not None
+
+    def test_output_loaded_on_demand(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_obj = Round(number=1)
+        check = Check(round=round_obj, service=service)
+        check.finished(True, "Successful Match", "good output", "example command")
+        db.session.add_all([round_obj, check])
+        db.session.commit()
+        db.session.expunge_all()
+
+        check = db.session.query(Check).one()
+        assert {"check_output", "command"} <= inspect(check).unloaded
+        assert check.reason == "Successful Match"
+        assert check.output == "good output"
+        assert "check_output" not in inspect(check).unloaded
+        db.session.expunge_all()
+
+        check = db.session.query(Check).options(undefer_group("output"), joinedload(Check.check_output)).one()
+        assert not {"check_output", "command"} & inspect(check).unloaded
+        assert check.output == "good output"
+        assert check.command == "example command"
+
+    def test_output_stored_compressed(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_obj = Round(number=1)
+        output = "<h1>Welcome to nginx!</h1>\n" * 50
+        check = Check(round=round_obj, service=service)
+        check.finished(True, "Successful Match", output, "example command")
+        db.session.add_all([round_obj, check])
+        db.session.commit()
+        db.session.expunge_all()
+
+        stored = db.session.execute(text("SELECT output FROM check_outputs")).scalar_one()
+        assert bytes(stored)[:1] == FORMAT_ZLIB_V1
+        assert len(stored) < len(html.escape(output))
+        assert db.session.query(Check).one().output == html.escape(output)
+
+    def test_identical_outputs_stored_once(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_1 = Round(number=1)
+        round_2 = Round(number=2)
+        db.session.add_all([round_1, round_2])
+        for round_obj in (round_1, round_2):
+            check = Check(round=round_obj, service=service)
+            check.finished(True, "Successful Match", "same output", "example command")
+            db.session.add(check)
+        check = Check(round=round_2, service=service, output="other output")
+        db.session.add(check)
+        db.session.commit()
+
+        assert db.session.query(CheckOutput).count() == 2
+        checks = db.session.query(Check).order_by(Check.id).all()
+        assert checks[0].output_id == checks[1].output_id != checks[2].output_id
+        assert [check.output for check in checks] == ["same output", "same output", "other output"]
+
+    def test_identical_outputs_before_checks_are_added(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_obj = Round(number=1)
+        # Neither check is in the session when its output is set
+        checks = [Check(round=round_obj, service=service, output="same output") for _ in range(2)]
+        db.session.add_all(checks)
+        db.session.commit()
+
+        assert db.session.query(CheckOutput).count() == 1
+        assert checks[0].output_id == checks[1].output_id
+
+    def test_output_after_rollback(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_obj = Round(number=1)
+        db.session.add(Check(round=round_obj, service=service, output="rolled back"))
+        db.session.flush()
+        db.session.rollback()
+
+        check = Check(round=Round(number=1), service=service, output="rolled back")
+        db.session.add(check)
+        db.session.commit()
+
+        assert db.session.query(CheckOutput).count() == 1
+        assert check.output == "rolled back"
+
+    def test_delete_round_checks(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_1 = Round(number=1)
+        round_2 = Round(number=2)
+        db.session.add_all(
+            [
+                Check(round=round_1, service=service, output="shared output"),
+                Check(round=round_1, service=service, output="round 1 output"),
+                Check(round=round_2, service=service, output="shared output"),
+            ]
+        )
+        db.session.commit()
+
+        delete_round_checks(db.session, [round_1.id])
+        db.session.commit()
+
+        assert db.session.query(Check).count() == 1
+        assert [output.output for output in db.session.query(CheckOutput)] == ["shared output"]
+
+    def test_finished_rows_share_outputs(self):
+        service = generate_sample_model_tree("Service", db.session)
+        round_obj = Round(number=1)
+        db.session.add(round_obj)
+        check = Check(round=round_obj, service=service, output="&lt;b&gt;output&lt;/b&gt;")
+        db.session.add(check)
+        db.session.commit()
+
+        rows = [
+            Check.finished_row(round_obj.id, service.id, True, "Good", output, "example command")
+            for output in ["<b>output</b>", "<b>output</b>", "new output"]
+        ]
+        output_ids = store_check_outputs(db.session, [row["output"] for row in rows])
+        db.session.commit()
+
+        assert db.session.query(CheckOutput).count() == 2
+        assert output_ids["&lt;b&gt;output&lt;/b&gt;"] == check.output_id
+        assert db.session.get(CheckOutput, output_ids["new output"]).output == "new output"
+        assert store_check_outputs(db.session, []) == {}
@@ -0,0 +1,77 @@
+import hashlib
+import importlib.util
+import os
+import zlib
+
+import pytest
+
+from scoring_engine.models.compressed_text import (
+    FORMAT_RAW,
+    FORMAT_ZLIB_V1,
+    OUTPUT_DICTIONARY_V1,
+    compress_output,
+    decompress_output,
+)
+
+
+class TestCompressedText:
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "x",
+            "SSH-2.0-OpenSSH_8.9p1 Ubuntu-3ubuntu0.6\n",
+            "&lt;h1&gt;Welcome to nginx!&lt;/h1&gt;\n" * 100,
+            "non ascii output: é ü 日本語 🚀\n" * 20,
+        ],
+    )
+    def test_round_trip(self, text):
+        assert decompress_output(compress_output(text)) == text
+
+    def test_repetitive_output_compressed(self):
+        text = "&lt; HTTP/1.1 200 OK\n&lt; Server: nginx/1.18.0\n&lt; Connection: keep-alive\n" * 20
+        stored = compress_output(text)
+        assert stored[:1] == FORMAT_ZLIB_V1
+        assert len(stored) < len(text) / 5
+
+    def test_dictionary_helps_short_outputs(self):
+        text = "&lt;!DOCTYPE html&gt;\n&lt;html&gt;\n&lt;head&gt;\n&lt;title&gt;Welcome to nginx!&lt;/title&gt;\n"
+        assert len(compress_output(text)) < len(zlib.compress(text.encode("utf-8")))
+
+    def test_zlib_v1_format(self):
+        # Stored rows depend on it: FORMAT_ZLIB_V1 is plain zlib with OUTPUT_DICTIONARY_V1
+        text = "&lt; HTTP/1.1 200 OK\n&lt; Server: nginx/1.18.0\n" * 5
+        stored = compress_output(text)
+        assert stored[:1] == FORMAT_ZLIB_V1
+        decompressor = zlib.decompressobj(zdict=OUTPUT_DICTIONARY_V1)
+        assert decompressor.decompress(stored[1:]) + decompressor.flush() == text.encode("utf-8")
+
+    def test_incompressible_output_stored_raw(self):
+        assert compress_output("ok") == FORMAT_RAW + b"ok"
+
+    def test_decompress_accepts_memoryview(self):
+        text = "ping ok\n" * 10
+        assert decompress_output(memoryview(compress_output(text))) == text
+
+    def test_decompress_empty(self):
+        assert decompress_output(b"") == ""
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            decompress_output(b"\x7fpayload")
+
+    def test_dictionary_v1_frozen(self):
+        # Rows stored with FORMAT_ZLIB_V1 only decompress with this exact dictionary
+        assert (
+            hashlib.sha256(OUTPUT_DICTIONARY_V1).hexdigest()
+            == "6cb40e25b13ebde8d6c23655613e30a47eac92c03f23fb1e0259cfee36d11e3a"
+        )
+
+    @pytest.mark.parametrize("migration", ["006_compress_check_output.py", "007_add_check_outputs.py"])
+    def test_migrations_use_dictionary_v1(self, migration):
+        versions = os.path.join(os.path.dirname(__file__), "..", "..", "..", "alembic", "versions")
+        spec = importlib.util.spec_from_file_location(migration[:-3], os.path.join(versions, migration))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        assert hashlib.sha256(module.OUTPUT_DICTIONARY_V1).digest() == hashlib.sha256(OUTPUT_DICTIONARY_V1).digest()
@@ -0,0 +1,123 @@
+from scoring_engine.db import db
+from scoring_engine.models.check import Check
+from scoring_engine.models.round import Round
+from scoring_engine.models.round_score import (
+    ServiceRoundScore,
+    TeamRoundScore,
+    RoundChanges,
+    delete_round_scores,
+    get_round_changes,
+    get_service_round_ids,
+    get_service_round_scores,
+    get_team_round_scores,
+    materialize_round_scores,
+    refresh_round_scores,
+)
+from scoring_engine.models.service import Service
+from scoring_engine.models.team import Team
+
+
+class TestRoundScore:
+    def setup_method(self):
+        self.team = Team(name="Blue Team 1", color="Blue")
+        self.service_1 = Service(name="SSH", team=self.team, check_name="SSHCheck", host="127.0.0.1", points=100)
+        self.service_2 = Service(name="HTTP", team=self.team, check_name="HTTPCheck", host="127.0.0.2", points=50)
+        db.session.add_all([self.team, self.service_1, self.service_2])
+        db.session.commit()
+
+    def add_round(self, number, result_1, result_2):
+        round_obj = Round(number=number)
+        db.session.add(round_obj)
+        db.session.add(Check(round=round_obj, service=self.service_1, result=result_1))
+        db.session.add(Check(round=round_obj, service=self.service_2, result=result_2))
+        db.session.commit()
+        return round_obj
+
+    def test_materialize_round_scores(self):
+        round_obj = self.add_round(1, True, False)
+        materialize_round_scores(db.session, round_obj.id)
+        db.session.commit()
+
+        team_score = db.session.query(TeamRoundScore).one()
+        assert team_score.round_number == 1
+        assert team_score.team_id == self.team.id
+        assert team_score.earned_points == 100
+        assert team_score.max_points == 150
+        assert team_score.passed_checks == 1
+        assert team_score.failed_checks == 1
+
+        service_scores = db.session.query(ServiceRoundScore).order_by(ServiceRoundScore.service_id).all()
+        assert [(s.service_id, s.earned_points, s.max_points) for s in service_scores] == [
+            (self.service_1.id, 100, 100),
+            (self.service_2.id, 0, 50),
+        ]
+
+    def test_unmaterialized_rounds_are_aggregated_from_checks(self):
+        round_1 = self.add_round(1, True, True)
+        materialize_round_scores(db.session, round_1.id)
+        db.session.commit()
+        self.add_round(2, False, True)
+
+        assert get_team_round_scores() == [(self.team.id, 1, 150, 150, 2, 0), (self.team.id, 2, 50, 150, 1, 1)]
+        assert get_service_round_scores(team_id=self.team.id) == [
+            (self.service_1.id, self.team.id, 1, 100, 100, 1, 0),
+            (self.service_1.id, self.team.id, 2, 0, 100, 0, 1),
+            (self.service_2.id, self.team.id, 1, 50, 50, 1, 0),
+            (self.service_2.id, self.team.id, 2, 50, 50, 1, 0),
+        ]
+
+    def test_refresh_round_scores(self):
+        round_obj = self.add_round(1, True, True)
+        materialize_round_scores(db.session, round_obj.id)
+        db.session.commit()
+
+        check = db.session.query(Check).filter(Check.service_id == self.service_1.id).one()
+        check.result = False
+        refresh_round_scores(db.session, [round_obj.id])
+        db.session.commit()
+
+        assert get_team_round_scores() == [(self.team.id, 1, 50, 150, 1, 1)]
+
+    def test_refresh_service_points(self):
+        round_ids = []
+        for number in (1, 2):
+            round_obj = self.add_round(number, True, False)
+            materialize_round_scores(db.session, round_obj.id)
+            round_ids.append(round_obj.id)
+        db.session.commit()
+
+        assert get_service_round_ids(db.session, self.service_1.id) == round_ids
+        self.service_1.points = 10
+        refresh_round_scores(db.session, get_service_round_ids(db.session, self.service_1.id))
+        db.session.commit()
+
+        assert get_team_round_scores() == [(self.team.id, 1, 10, 60, 1, 1), (self.team.id, 2, 10, 60, 1, 1)]
+
+    def test_delete_round_scores(self):
+        round_obj = self.add_round(1, True, True)
+        materialize_round_scores(db.session, round_obj.id)
+        delete_round_scores(db.session, [round_obj.id])
+        db.session.commit()
+
+        assert db.session.query(TeamRoundScore).count() == 0
+        assert db.session.query(ServiceRoundScore).count() == 0
+
+    def test_get_round_changes(self):
+        other_team = Team(name="Blue Team 2", color="Blue")
+        other_service = Service(name="SSH", team=other_team, check_name="SSHCheck", host="127.0.0.3", points=100)
+        db.session.add_all([other_team, other_service])
+        for number, results in ((1, (True, True, False)), (2, (True, False, False))):
+            round_obj = Round(number=number)
+            db.session.add(round_obj)
+            for service, result in zip((self.service_1, self.service_2, other_service), results):
+                db.session.add(Check(round=round_obj, service=service, result=result))
+            db.session.flush()
+            materialize_round_scores(db.session, round_obj.id)
+        db.session.commit()
+
+        # Round 1: every service is new, the first team scored and took first place
+        assert get_round_changes(db.session, 1) == RoundChanges(
+            1, [self.service_1.id, self.service_2.id, other_service.id], [self.team.id], [self.team.id, other_team.id]
+        )
+        # Round 2: only HTTP went down, the other team still has no points
+        assert get_round_changes(db.session, 2) == RoundChanges(2, [self.service_2.id], [self.team.id], [self.team.id])
@@ -1,9 +1,11 @@
+from sqlalchemy import insert
+
 from scoring_engine.db import db
 from scoring_engine.models.account import Account
 from scoring_engine.models.check import Check
 from scoring_engine.models.environment import Environment
 from scoring_engine.models.round import Round
-from scoring_engine.models.service import Service
+from scoring_engine.models.service import Service, advance_service_streaks, rebuild_service_streaks
 from scoring_engine.models.team import Team
 from tests.scoring_engine.helpers import generate_sample_model_tree
 
@@ -371,3 +373,66 @@ class TestService:
         assert team_1.services[0].rank == 1
         assert team_2.services[0].rank == 1
         assert team_3.services[0].rank == None
+
+
+class TestServiceStreaks:
+    def create_service(self, results):
+        service = generate_sample_model_tree("Service", db.session)
+        for number, result in enumerate(results, start=1):
+            round_obj = Round(number=number)
+            check = Check(round=round_obj, service=service)
+            check.finished(result, "Test", "output", "command")
+            db.session.add_all([round_obj, check])
+        db.session.commit()
+        return service
+
+    def assert_streaks(self, service, current_streak, max_streak, last_result):
+        assert (service.current_streak, service.max_streak, service.last_result) == (
+            current_streak,
+            max_streak,
+            last_result,
+        )
+
+    def test_no_checks(self):
+        service = self.create_service([])
+        self.assert_streaks(service, 0, 0, None)
+
+    def test_checks_added_through_the_orm(self):
+        service = self.create_service([True, False, False, False, True, False, False])
+        self.assert_streaks(service, 2, 3, False)
+        assert service.consecutive_failures == 2
+
+    def test_incomplete_checks_dont_count(self):
+        service = self.create_service([False, False])
+        db.session.add(Check(round=db.session.query(Round).filter_by(number=2).one(), service=service))
+        db.session.commit()
+        self.assert_streaks(service, 2, 2, None)
+
+    def test_edited_check_rebuilds_streaks(self):
+        service = self.create_service([False, False, False])
+        check = db.session.query(Check).join(Round).filter(Round.number == 2).one()
+        check.result = True
+        db.session.commit()
+        self.assert_streaks(service, 1, 1, False)
+
+    def test_advance_service_streaks(self):
+        service = self.create_service([True, False])
+        round_obj = Round(number=3)
+        db.session.add(round_obj)
+        db.session.flush()
+        # Bulk inserts (like the engine's) bypass the ORM and have to be folded in
+        db.session.execute(
+            insert(Check.__table__),
+            [Check.finished_row(round_obj.id, service.id, False, "Test", "output", "command")],
+        )
+        advance_service_streaks(db.session, round_obj.id)
+        db.session.commit()
+        self.assert_streaks(service, 2, 2, False)
+
+    def test_rebuild_service_streaks(self):
+        service = self.create_service([False, False, True, False])
+        # Deleted in bulk, bypassing the ORM
+        db.session.query(Check).filter(Check.result.is_(True)).delete(synchronize_session=False)
+        rebuild_service_streaks(db.session, [service.id])
+        db.session.commit()
+        self.assert_streaks(service, 3, 3, False)
@@ -2,7 +2,8 @@ import json
 from unittest.mock import MagicMock, patch
 
 from scoring_engine.db import db
-from scoring_engine.models.setting import CACHE_PREFIX, CACHE_TTL, Setting
+from scoring_engine.models import setting as setting_module
+from scoring_engine.models.setting import CACHE_PREFIX, CACHE_TTL, INVALIDATION_CHANNEL, LOCAL_CACHE_TTL, Setting
 
 
 class TestSetting:
@@ -25,6 +26,28 @@ class TestSetting:
         db.session.commit()
         assert Setting.get_setting("test_setting").value == "updated example"
 
+    def test_get_values(self):
+        db.session.add(Setting(name="engine_paused", value=True))
+        db.session.commit()
+
+        assert Setting.get_values(["engine_paused", "target_round_time", "does_not_exist"]) == {
+            "engine_paused": True,
+            "target_round_time": "60",
+        }
+
+    def test_get_values_reads_redis_once(self):
+        mock_redis = MagicMock()
+        mock_redis.mget.return_value = [json.dumps({"id": 1, "value_text": "True", "value_type": "Boolean"}), None]
+
+        with patch("scoring_engine.models.setting._get_redis", return_value=mock_redis), patch(
+            "scoring_engine.models.setting._ensure_listener"
+        ):
+            values = Setting.get_values(["engine_paused", "target_round_time"])
+
+        assert values == {"engine_paused": True, "target_round_time": "60"}
+        mock_redis.mget.assert_called_once_with([CACHE_PREFIX + "engine_paused", CACHE_PREFIX + "target_round_time"])
+        mock_redis.pipeline.return_value.set.assert_called_once()
+
     def test_boolean_value(self):
         setting = Setting(name="test_setting", value=True)
         assert setting.name == "test_setting"
@@ -278,3 +301,62 @@ class TestSetting:
             # Next read should hit DB and get the new value
             setting = Setting.get_setting("engine_paused")
             assert setting.value is True
+
+
+class TestLocalSettingCache:
+    def setup_method(self):
+        self.mock_redis = MagicMock()
+        self.mock_redis.get.return_value = None
+        self.patches = [
+            patch("scoring_engine.models.setting._get_redis", return_value=self.mock_redis),
+            # Invalidation messages are delivered by hand
+            patch("scoring_engine.models.setting._ensure_listener"),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        for p in reversed(self.patches):
+            p.stop()
+
+    def test_repeated_reads_skip_redis(self):
+        for _ in range(3):
+            assert Setting.get_setting("engine_paused").value is False
+
+        self.mock_redis.get.assert_called_once_with(CACHE_PREFIX + "engine_paused")
+
+    def test_local_entries_expire(self):
+        with patch("scoring_engine.models.setting.time.monotonic", return_value=1000):
+            Setting.get_setting("engine_paused")
+        with patch("scoring_engine.models.setting.time.monotonic", return_value=1000 + LOCAL_CACHE_TTL + 1):
+            Setting.get_setting("engine_paused")
+
+        assert self.mock_redis.get.call_count == 2
+
+    def test_clear_cache_publishes_invalidation(self):
+        Setting.get_setting("engine_paused")
+
+        Setting.clear_cache("engine_paused")
+
+        self.mock_redis.publish.assert_called_once_with(INVALIDATION_CHANNEL, "engine_paused")
+        assert "engine_paused" not in setting_module._local_cache
+
+    def test_invalidation_message_drops_local_entry(self):
+        def messages():
+            Setting.get_setting("engine_paused")
+            Setting.get_setting("target_round_time")
+            yield {"data": "engine_paused"}
+
+        pubsub = self.mock_redis.pubsub.return_value
+        pubsub.listen.return_value = messages()
+
+        # The listener sleeps before reconnecting once the subscription ends
+        with patch("scoring_engine.models.setting.time.sleep", side_effect=SystemExit):
+            try:
+                setting_module._listen_for_invalidations()
+            except SystemExit:
+                pass
+
+        pubsub.subscribe.assert_called_once_with(INVALIDATION_CHANNEL)
+        assert "engine_paused" not in setting_module._local_cache
+        assert "target_round_time" in setting_module._local_cache
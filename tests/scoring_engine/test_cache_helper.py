@@ -47,3 +47,63 @@ def test_update_overview_data_triggers_update_caches():
     with patch("scoring_engine.web.views.api.overview.update_caches") as update_caches:
         cache_helper.update_overview_data()
     update_caches.assert_called_once_with()
+
+
+class TestCacheGenerations:
+    @pytest.fixture(autouse=True)
+    def simple_cache(self, app):
+        from flask_caching.backends import SimpleCache
+
+        from scoring_engine.cache import cache
+
+        original = app.extensions["cache"][cache]
+        app.extensions["cache"][cache] = SimpleCache()
+        yield
+        app.extensions["cache"][cache] = original
+
+    def test_cache_families(self):
+        assert cache_helper.cache_families("/api/stats/scoring_overview") == ["stats"]
+        assert cache_helper.cache_families("/api/team/3/services") == ["team"]
+        assert cache_helper.cache_families("/api/service/5/checks") == ["service", "service/5"]
+        assert cache_helper.cache_families("/api/inject/2/comments") == ["inject", "inject/2"]
+
+    def test_versioned_key_embeds_generation(self):
+        assert cache_helper.versioned_key("/api/stats", "white") == "/api/stats_white@0"
+        cache_helper.update_stats()
+        assert cache_helper.versioned_key("/api/stats", "white") == "/api/stats_white@1"
+        assert cache_helper.versioned_key("/api/sla/summary", "white") == "/api/sla/summary_white@0"
+
+    def test_bump_invalidates_only_its_family(self):
+        from scoring_engine.cache import cache
+
+        for path in ("/api/flags/solves", "/api/sla/summary"):
+            cache.set(cache_helper.versioned_key(path, "white"), "payload")
+
+        cache_helper.update_flags_data()
+
+        assert cache.get(cache_helper.versioned_key("/api/flags/solves", "white")) is None
+        assert cache.get(cache_helper.versioned_key("/api/sla/summary", "white")) == "payload"
+
+    def test_scoped_generation(self):
+        from scoring_engine.cache import cache
+
+        for path in ("/api/service/1/checks", "/api/service/2/checks"):
+            cache.set(cache_helper.versioned_key(path, "team_1"), "payload")
+
+        cache_helper.update_service_data(1)
+        assert cache.get(cache_helper.versioned_key("/api/service/1/checks", "team_1")) is None
+        assert cache.get(cache_helper.versioned_key("/api/service/2/checks", "team_1")) == "payload"
+
+        cache_helper.update_service_data()
+        assert cache.get(cache_helper.versioned_key("/api/service/2/checks", "team_1")) is None
+
+    def test_team_specific_delete(self):
+        from scoring_engine.cache import cache
+
+        for team_id in (1, 2):
+            cache.set(cache_helper.versioned_key(f"/api/team/{team_id}/stats", f"team_{team_id}"), "payload")
+
+        cache_helper.update_team_stats(1)
+
+        assert cache.get(cache_helper.versioned_key("/api/team/1/stats", "team_1")) is None
+        assert cache.get(cache_helper.versioned_key("/api/team/2/stats", "team_2")) == "payload"
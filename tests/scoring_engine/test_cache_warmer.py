@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from flask_caching.backends import SimpleCache
+
+from scoring_engine import cache_helper
+from scoring_engine.cache import cache
+from scoring_engine.cache_warmer import warm_round_cache
+from scoring_engine.db import db
+from scoring_engine.models.check import Check
+from scoring_engine.models.round import Round
+from scoring_engine.models.round_score import RoundChanges
+from scoring_engine.models.service import Service
+from scoring_engine.web.views.api import scoreboard
+
+
+@pytest.fixture()
+def simple_cache(app):
+    """Swap the null cache used by the tests for a real in-memory one."""
+    original = app.extensions["cache"][cache]
+    app.extensions["cache"][cache] = SimpleCache()
+    yield
+    app.extensions["cache"][cache] = original
+
+
+@pytest.fixture()
+def scored_round(three_teams):
+    service = Service(name="SSH", team=three_teams["blue_team"], check_name="SSHCheck", host="127.0.0.1")
+    round_obj = Round(number=1, round_end=datetime.now(timezone.utc))
+    db.session.add_all([service, round_obj, Check(service=service, round=round_obj, result=True)])
+    db.session.commit()
+    return three_teams
+
+
+class TestCacheWarmer:
+    def test_null_cache_is_not_warmed(self, scored_round):
+        assert warm_round_cache() == 0
+
+    def test_warms_every_role_key(self, simple_cache, scored_round):
+        blue_team_id = scored_round["blue_team"].id
+
+        assert warm_round_cache() > 0
+
+        for path, suffix in (
+            ("/api/overview/get_data", "anonymous"),
+            ("/api/overview/get_data", "white"),
+            ("/api/overview/get_data", "red"),
+            ("/api/overview/get_data", f"team_{blue_team_id}"),
+            ("/api/stats", "white"),
+            ("/api/stats", f"team_{blue_team_id}"),
+            ("/api/stats/scoring_overview", "white"),
+            (f"/api/team/{blue_team_id}/stats", f"team_{blue_team_id}"),
+            (f"/api/team/{blue_team_id}/services", f"team_{blue_team_id}"),
+            (f"/api/team/{blue_team_id}/services/status", f"team_{blue_team_id}"),
+        ):
+            key = cache_helper.versioned_key(path, suffix)
+            assert cache.get(key) is not None, key
+
+        # Views served stale while revalidating also get their stale payload refreshed
+        assert cache.get(cache_helper.stale_key(cache_helper.versioned_key("/api/stats", "white"))) is not None
+
+        bar_data = scoreboard._get_bar_data_cached(False, False)
+        assert bar_data["service_scores"] == ["100"]
+
+    def test_warmed_payload_is_served(self, simple_cache, scored_round, test_client):
+        warm_round_cache()
+
+        # Not visible until the next warm, proving the response comes from the cache
+        round_obj = Round(number=2, round_end=datetime.now(timezone.utc))
+        service = db.session.query(Service).one()
+        db.session.add_all([round_obj, Check(service=service, round=round_obj, result=True)])
+        db.session.commit()
+
+        resp = test_client.get("/api/scoreboard/get_bar_data")
+        assert resp.json["service_scores"] == ["100"]
+
+        warm_round_cache()
+        resp = test_client.get("/api/scoreboard/get_bar_data")
+        assert resp.json["service_scores"] == ["200"]
+
+    def test_warms_only_changed_teams(self, simple_cache, scored_round):
+        blue_team_id = scored_round["blue_team"].id
+
+        warm_round_cache(RoundChanges(1, [], [], []))
+
+        def cached(path):
+            return cache.get(cache_helper.versioned_key(path, f"team_{blue_team_id}"))
+
+        assert cached(f"/api/team/{blue_team_id}/services") is not None
+        assert cached(f"/api/team/{blue_team_id}/stats") is None
+        assert cached(f"/api/team/{blue_team_id}/services/status") is None
+
+        warm_round_cache(RoundChanges(1, [], [blue_team_id], [blue_team_id]))
+        assert cached(f"/api/team/{blue_team_id}/stats") is not None
+        assert cached(f"/api/team/{blue_team_id}/services/status") is not None
+
+    def test_update_round_cache_publishes_changes(self, app):
+        changes = RoundChanges(3, [1, 2], [1], [1])
+        with patch("scoring_engine.cache_warmer.warm_round_cache") as warm, patch(
+            "scoring_engine.events.publish_event"
+        ) as publish:
+            cache_helper.update_round_cache(app, changes)
+
+        warm.assert_called_once_with(changes)
+        publish.assert_called_once_with(
+            "round_complete", {"round_number": 3, "service_ids": [1, 2], "team_ids": [1], "status_team_ids": [1]}
+        )
+
+    def test_update_round_cache_publishes_after_warming(self, app):
+        calls = []
+        with patch("scoring_engine.cache_warmer.warm_round_cache", side_effect=lambda changes: calls.append("warm")), patch(
+            "scoring_engine.events.publish_event", side_effect=lambda event, data: calls.append(event)
+        ):
+            cache_helper.update_round_cache(app)
+
+        assert calls == ["warm", "round_complete"]
@@ -76,6 +76,24 @@ class TestConfigLoader(object):
     def test_worker_queue(self):
         assert self.config.worker_queue == "main"
 
+    def test_worker_side_matching(self):
+        assert self.config.worker_side_matching is False
+
+    def test_task_batch_size(self):
+        assert self.config.task_batch_size == 0
+
+    def test_engine_pipelined_rounds(self):
+        assert self.config.engine_pipelined_rounds is False
+
+    def test_cache_stale_while_revalidate(self):
+        assert self.config.cache_stale_while_revalidate is False
+
+    def test_worker_executor(self):
+        assert self.config.worker_executor == "subprocess"
+
+    def test_worker_native_checks(self):
+        assert self.config.worker_native_checks is False
+
     def test_parse_sources_int_environment(self):
         os.environ["SCORINGENGINE_ROUND_SLEEP_TIME"] = "1"
         assert self.config.parse_sources("round_sleep_time", "1234", "int") == 1
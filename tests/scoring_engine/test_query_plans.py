@@ -0,0 +1,166 @@
+"""Query plan regression tests for the hot queries on the checks table.
+
+Every query these code paths run against ``checks`` must reach it through an
+index, otherwise the pages slow down with every round played.
+"""
+
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, insert
+
+from scoring_engine.db import db
+from scoring_engine.models.check import Check, delete_round_checks
+from scoring_engine.models.check_output import store_check_outputs
+from scoring_engine.models.round import Round
+from scoring_engine.models.service import Service
+from scoring_engine.sla import get_consecutive_failures, get_max_consecutive_failures
+
+ROUNDS = 40
+SERVICES = 5
+
+_CHECKS_TABLE = re.compile(r"\b(FROM|JOIN)\s+checks\b", re.IGNORECASE)
+
+
+@contextmanager
+def capture_checks_queries(kinds=("SELECT",)):
+    """Collect the ``(statement, parameters)`` of every query of *kinds* on checks run in the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(kinds) and _CHECKS_TABLE.search(statement):
+            statements.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def checks_access_paths(statement, parameters):
+    """Return how each access to checks in the plan of *statement* is made."""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        plan = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+        return [row[3] for row in plan if re.search(r"\bchecks\b", row[3])]
+    if dialect == "mysql":
+        plan = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+        return [f"{row['type']} {row['key']}" for row in plan if row["table"] == "checks"]
+    if dialect == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = connection.exec_driver_sql("EXPLAIN " + statement, parameters).all()
+        # "Delete on checks" is the delete itself, not an access path
+        return [row[0].strip() for row in plan if " on checks" in row[0] and "Delete on" not in row[0]]
+    pytest.skip(f"No query plan assertions for {dialect}")
+
+
+def is_index_lookup(access_path):
+    """Whether one access to checks is an index lookup rather than a full scan."""
+    # sqlite: "SEARCH checks USING INDEX ix_...", mysql: "ref ix_...", postgresql: "Index Scan using ix_..."
+    return (
+        access_path.startswith("SEARCH checks USING")
+        or re.match(r"(const|eq_ref|ref|range|ref_or_null) ix_checks_", access_path) is not None
+        or re.search(r"Index (Only )?Scan.* using ix_checks_", access_path) is not None
+        or access_path.startswith("Bitmap Index Scan on ix_checks_")
+    )
+
+
+@pytest.fixture()
+def history(three_teams):
+    """A few services of the blue team with ROUNDS rounds of checks, bulk inserted like the engine does."""
+    services = [
+        Service(name=f"Service {i}", check_name="ICMPCheck", team=three_teams["blue_team"], host="127.0.0.1")
+        for i in range(SERVICES)
+    ]
+    rounds = [Round(number=number) for number in range(1, ROUNDS + 1)]
+    db.session.add_all(services + rounds)
+    db.session.flush()
+    rows = [
+        Check.finished_row(
+            round_obj.id, service.id, (round_obj.number + service.id) % 3 != 0, "", f"output {service.id}", ""
+        )
+        for round_obj in rounds
+        for service in services
+    ]
+    output_ids = store_check_outputs(db.session, [row["output"] for row in rows])
+    for row in rows:
+        row["output_id"] = output_ids[row.pop("output")]
+    db.session.execute(insert(Check.__table__), rows)
+    db.session.commit()
+    return services
+
+
+class TestChecksQueryPlans:
+    def assert_index_lookups(self, statements):
+        assert statements, "No query on checks was captured"
+        for statement, parameters in statements:
+            access_paths = checks_access_paths(statement, parameters)
+            assert access_paths, statement
+            for access_path in access_paths:
+                assert is_index_lookup(access_path), f"{access_path}\n{statement}"
+
+    @pytest.mark.parametrize(
+        "code_path",
+        [
+            lambda service: service.last_ten_checks,
+            lambda service: service.last_check_result(),
+            lambda service: service.checks_reversed,
+            lambda service: service.check_result_for_round(ROUNDS // 2),
+            lambda service: get_consecutive_failures(service.id),
+            lambda service: get_max_consecutive_failures(service.id),
+        ],
+        ids=[
+            "last_ten_checks",
+            "last_check_result",
+            "checks_reversed",
+            "check_result_for_round",
+            "get_consecutive_failures",
+            "get_max_consecutive_failures",
+        ],
+    )
+    def test_service_history(self, history, code_path):
+        with capture_checks_queries() as statements:
+            code_path(history[0])
+        self.assert_index_lookups(statements)
+
+    def test_service_history_needs_no_sort(self, history):
+        if db.session.connection().dialect.name != "sqlite":
+            pytest.skip("Sort detection is only implemented for sqlite")
+        with capture_checks_queries() as statements:
+            history[0].last_ten_checks
+            get_consecutive_failures(history[0].id)
+        for statement, parameters in statements:
+            plan = db.session.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            assert not any("TEMP B-TREE" in row[3] for row in plan), statement
+
+    def test_team_services_status(self, history, blue_login):
+        client, teams = blue_login
+        with capture_checks_queries() as statements:
+            resp = client.get(f"/api/team/{teams['blue_team'].id}/services/status")
+        assert resp.status_code == 200
+        self.assert_index_lookups(statements)
+
+    def test_overview_data(self, history, test_client):
+        with capture_checks_queries() as statements:
+            resp = test_client.get("/api/overview/data")
+        assert resp.status_code == 200
+        self.assert_index_lookups(statements)
+
+    def test_passing_checks_of_a_round(self, history):
+        round_id = db.session.query(Round.id).filter(Round.number == ROUNDS).scalar()
+        with capture_checks_queries() as statements:
+            db.session.query(Check.service_id).filter(Check.round_id == round_id, Check.result.is_(True)).all()
+        self.assert_index_lookups(statements)
+
+    def test_delete_round_checks(self, history):
+        round_id = db.session.query(Round.id).filter(Round.number == ROUNDS).scalar()
+        with capture_checks_queries(kinds=("SELECT", "DELETE")) as statements:
+            delete_round_checks(db.session, [round_id])
+        db.session.rollback()
+        # The round's checks and the outputs they leave without a check
+        assert any("check_outputs" in statement for statement, _ in statements)
+        self.assert_index_lookups(statements)
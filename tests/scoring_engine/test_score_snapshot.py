@@ -0,0 +1,200 @@
+import mock
+import pytest
+from flask_caching.backends import SimpleCache
+
+# Patched through the module object: other tests re-import the scoring_engine
+# package, after which the dotted path no longer resolves
+import scoring_engine.sla as sla_module
+from scoring_engine import cache_helper
+from scoring_engine.cache import cache
+from scoring_engine.db import db
+from scoring_engine.models.check import Check
+from scoring_engine.models.round import Round
+from scoring_engine.models.round_score import materialize_round_scores
+from scoring_engine.models.service import Service
+from scoring_engine.models.team import Team
+from scoring_engine.score_snapshot import ScoreSnapshot
+from scoring_engine.sla import SLAConfig, calculate_service_adjusted_score, calculate_team_adjusted_score
+
+
+@pytest.fixture()
+def simple_cache(app):
+    """Swap the null cache used by the tests for a real in-memory one."""
+    original = app.extensions["cache"][cache]
+    app.extensions["cache"][cache] = SimpleCache()
+    yield
+    app.extensions["cache"][cache] = original
+
+
+@pytest.fixture()
+def scored_teams():
+    """Three teams with an SSH and a DNS service each, checked over six rounds."""
+    results = {
+        "Team 1": {"SSH": [True] * 6, "DNS": [True, True, False, False, False, False]},
+        "Team 2": {"SSH": [True] * 6, "DNS": [False] * 6},
+        "Team 3": {"SSH": [False] * 6, "DNS": [True, False, True, False, True, True]},
+    }
+    teams = {}
+    services = {}
+    for team_name, team_results in results.items():
+        team = Team(name=team_name, color="Blue")
+        teams[team_name] = team
+        for service_name in team_results:
+            services[(team_name, service_name)] = Service(
+                name=service_name, check_name="ICMPCheck", team=team, host="127.0.0.1", points=100
+            )
+    db.session.add_all(list(teams.values()) + list(services.values()))
+    db.session.commit()
+
+    for number in range(1, 7):
+        round_obj = Round(number=number)
+        db.session.add(round_obj)
+        for (team_name, service_name), service in services.items():
+            check = Check(round=round_obj, service=service)
+            check.finished(results[team_name][service_name][number - 1], "Test", "output", "command")
+            db.session.add(check)
+    db.session.commit()
+    return teams, services
+
+
+class TestScoreSnapshot:
+    def test_scores_and_ranks(self, scored_teams):
+        teams, services = scored_teams
+
+        snapshot = ScoreSnapshot()
+
+        assert snapshot.team_score(teams["Team 1"].id) == 800
+        assert snapshot.team_score(teams["Team 2"].id) == 600
+        assert snapshot.team_score(teams["Team 3"].id) == 400
+        assert [snapshot.team_place(teams[name].id) for name in ("Team 1", "Team 2", "Team 3")] == [1, 2, 3]
+
+        ssh = services[("Team 3", "SSH")]
+        assert snapshot.service_score(ssh.id) == 0
+        assert snapshot.service_max_score(ssh.id) == 600
+        assert snapshot.service_percent_earned(ssh.id) == 0
+        # Team 3 didn't score any SSH point
+        assert snapshot.service_rank(ssh.id) is None
+        # Teams 1 and 2 tie on SSH
+        assert snapshot.service_rank(services[("Team 1", "SSH")].id) == 1
+        assert snapshot.service_rank(services[("Team 2", "SSH")].id) == 1
+
+        dns = services[("Team 3", "DNS")]
+        assert snapshot.service_score(dns.id) == 400
+        assert snapshot.service_percent_earned(dns.id) == 66
+        assert snapshot.service_rank(dns.id) == 1
+        assert snapshot.service_rank(services[("Team 1", "DNS")].id) == 2
+
+    def test_materialized_rounds(self, scored_teams):
+        teams, services = scored_teams
+        for round_obj in db.session.query(Round).filter(Round.number <= 3):
+            materialize_round_scores(db.session, round_obj.id)
+        db.session.commit()
+
+        snapshot = ScoreSnapshot()
+
+        assert snapshot.team_score(teams["Team 1"].id) == 800
+        assert snapshot.service_score(services[("Team 3", "DNS")].id) == 400
+        assert snapshot.service_max_score(services[("Team 3", "DNS")].id) == 600
+
+    def test_adjusted_scores_computed_on_first_use(self, scored_teams):
+        teams, services = scored_teams
+        with mock.patch.object(sla_module, "calculate_services_sla", return_value={}) as mock_services_sla:
+            snapshot = ScoreSnapshot()
+            assert services[("Team 1", "DNS")].score_earned == 200
+            assert snapshot.team_place(teams["Team 1"].id) == 1
+            mock_services_sla.assert_not_called()
+
+            snapshot.team_adjusted_score(teams["Team 1"].id)
+            snapshot.service_penalty(services[("Team 1", "DNS")].id)
+        mock_services_sla.assert_called_once()
+
+    def test_team_without_points(self, scored_teams):
+        team = Team(name="Team 4", color="Blue")
+        db.session.add(team)
+        db.session.commit()
+
+        snapshot = ScoreSnapshot()
+
+        assert snapshot.team_score(team.id) == 0
+        assert snapshot.team_place(team.id) == 1
+
+    @pytest.mark.parametrize("dynamic_enabled", [False, True])
+    def test_adjusted_scores(self, scored_teams, dynamic_enabled):
+        teams, services = scored_teams
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=2,
+            penalty_percent=10,
+            dynamic_enabled=dynamic_enabled,
+            early_rounds=2,
+            late_start_round=5,
+        )
+
+        snapshot = ScoreSnapshot(config)
+
+        for team in teams.values():
+            assert snapshot.team_adjusted_score(team.id) == calculate_team_adjusted_score(team, config)
+        for service in services.values():
+            assert snapshot.service_adjusted_score(service.id) == calculate_service_adjusted_score(service, config)
+        assert snapshot.team_penalty(teams["Team 1"].id) > 0
+
+    def test_model_properties_delegate(self, scored_teams):
+        teams, services = scored_teams
+
+        assert teams["Team 2"].current_score == 600
+        assert teams["Team 2"].place == 2
+        assert services[("Team 1", "DNS")].score_earned == 200
+        assert services[("Team 1", "DNS")].max_score == 600
+        assert services[("Team 1", "DNS")].percent_earned == 33
+        assert services[("Team 1", "DNS")].rank == 2
+
+
+class TestCurrentSnapshot:
+    def add_round(self, services, number, result):
+        round_obj = Round(number=number)
+        db.session.add(round_obj)
+        for service in services.values():
+            check = Check(round=round_obj, service=service)
+            check.finished(result, "Test", "output", "command")
+            db.session.add(check)
+        db.session.commit()
+
+    def test_memoized_per_request(self, app, scored_teams):
+        with app.test_request_context("/"):
+            snapshot = ScoreSnapshot.current()
+            assert ScoreSnapshot.current() is snapshot
+        with app.test_request_context("/"):
+            assert ScoreSnapshot.current() is not snapshot
+
+    def test_without_cache_server_every_call_computes(self, scored_teams):
+        _, services = scored_teams
+        service = services[("Team 1", "SSH")]
+        assert service.score_earned == 600
+
+        self.add_round(services, 7, True)
+
+        assert service.score_earned == 700
+
+    def test_shared_until_next_round(self, simple_cache, scored_teams):
+        _, services = scored_teams
+        snapshot = ScoreSnapshot.current()
+        assert ScoreSnapshot.current().service_scores == snapshot.service_scores
+
+        # Edited within the round, the shared snapshot is kept until it's invalidated
+        check = db.session.query(Check).filter(Check.result.is_(False)).first()
+        check.result = True
+        db.session.commit()
+        assert ScoreSnapshot.current().service_scores == snapshot.service_scores
+        cache_helper.update_scores_data()
+        assert ScoreSnapshot.current().service_score(check.service_id) == snapshot.service_score(check.service_id) + 100
+
+        self.add_round(services, 7, True)
+        assert ScoreSnapshot.current().service_score(services[("Team 1", "SSH")].id) == 700
+
+    def test_adjusted_scores_shared(self, simple_cache, scored_teams):
+        teams, _ = scored_teams
+        adjusted = ScoreSnapshot.current().team_adjusted_score(teams["Team 1"].id)
+
+        with mock.patch.object(sla_module, "calculate_services_sla") as mock_services_sla:
+            assert ScoreSnapshot.current().team_adjusted_score(teams["Team 1"].id) == adjusted
+        mock_services_sla.assert_not_called()
@@ -4,6 +4,8 @@ Comprehensive tests for SLA penalty and dynamic scoring functionality.
 
 from decimal import Decimal
 
+import pytest
+
 from scoring_engine.db import db
 from scoring_engine.models.check import Check
 from scoring_engine.models.round import Round
@@ -15,16 +17,23 @@ from scoring_engine.sla import (
     apply_dynamic_scoring_to_round,
     calculate_round_multiplier,
     calculate_service_adjusted_score,
+    calculate_service_base_score_with_dynamic,
+    calculate_service_penalty_points,
+    calculate_services_sla,
     calculate_sla_penalty_percent,
     calculate_team_adjusted_score,
     calculate_team_base_score_with_dynamic,
     calculate_team_total_penalties,
+    calculate_teams_total_penalties,
+    clear_sla_config,
     get_consecutive_failures,
     get_dynamic_scoring_info,
+    get_failures_before_round,
     get_max_consecutive_failures,
     get_service_sla_status,
     get_sla_config,
     get_team_sla_summary,
+    use_sla_config,
 )
 
 
@@ -63,6 +72,32 @@ class TestSLAConfig:
         assert config.sla_enabled is True
         assert config.penalty_threshold == 10
 
+    def test_sla_config_is_immutable(self):
+        config = SLAConfig(penalty_threshold=3)
+        assert config.penalty_threshold == 3
+        assert config.penalty_mode == "additive"
+        with pytest.raises(AttributeError):
+            config.penalty_threshold = 5
+        with pytest.raises(TypeError):
+            SLAConfig(penalty_treshold=3)
+
+    def test_sla_config_memoized_per_request(self, app):
+        with app.test_request_context("/"):
+            config = get_sla_config()
+            assert get_sla_config() is config
+
+            clear_sla_config()
+            assert get_sla_config() is not config
+
+        # Outside of a request every call loads the settings
+        assert get_sla_config() is not get_sla_config()
+
+    def test_use_sla_config(self):
+        config = SLAConfig(sla_enabled=True)
+        with use_sla_config(config):
+            assert get_sla_config() is config
+        assert get_sla_config().sla_enabled is False
+
 
 class TestConsecutiveFailures:
     """Tests for consecutive failure counting."""
@@ -144,45 +179,59 @@ class TestConsecutiveFailures:
 
         assert get_consecutive_failures(service.id) == 0
 
+    def test_failures_before_round(self):
+        """Test counting the failure streak leading up to a round."""
+        service = self.setup_service_with_checks([False, True, False, False, True, False])
+        round_ids = [check.round_id for check in sorted(service.checks, key=lambda check: check.round_id)]
+        assert get_failures_before_round(service.id, round_ids[0]) == 0
+        assert get_failures_before_round(service.id, round_ids[1]) == 1
+        assert get_failures_before_round(service.id, round_ids[2]) == 0
+        assert get_failures_before_round(service.id, round_ids[4]) == 2
+        assert get_failures_before_round(service.id, round_ids[5]) == 0
+        assert get_failures_before_round(service.id, round_ids[5] + 1) == 1
+
 
 class TestPenaltyCalculation:
     """Tests for SLA penalty percentage calculations."""
 
     def test_penalty_below_threshold(self):
         """Test no penalty when below threshold."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         assert calculate_sla_penalty_percent(0, config) == 0
         assert calculate_sla_penalty_percent(4, config) == 0
 
     def test_penalty_at_threshold(self):
         """Test penalty at exactly threshold."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         # At threshold (5 failures), penalty should be 10% (1 * penalty_percent)
         assert calculate_sla_penalty_percent(5, config) == 10
 
     def test_penalty_additive_mode(self):
         """Test additive penalty mode."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         # 5 failures: 10%, 6 failures: 20%, 7 failures: 30%, etc.
         assert calculate_sla_penalty_percent(5, config) == 10
@@ -194,13 +243,14 @@ class TestPenaltyCalculation:
 
     def test_penalty_flat_mode(self):
         """Test flat penalty mode."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "flat"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="flat",
+            allow_negative=False,
+        )
 
         # Flat: 0 at threshold, 10% at 6, 20% at 7, etc.
         assert calculate_sla_penalty_percent(5, config) == 0
@@ -211,13 +261,14 @@ class TestPenaltyCalculation:
 
     def test_penalty_exponential_mode(self):
         """Test exponential penalty mode."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 100
-        config.penalty_mode = "exponential"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=100,
+            penalty_mode="exponential",
+            allow_negative=False,
+        )
 
         # Exponential: 10%, 20%, 40%, 80%...
         assert calculate_sla_penalty_percent(5, config) == 10
@@ -229,22 +280,24 @@ class TestPenaltyCalculation:
 
     def test_penalty_disabled(self):
         """Test no penalty when SLA is disabled."""
-        config = SLAConfig()
-        config.sla_enabled = False
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
+        config = SLAConfig(
+            sla_enabled=False,
+            penalty_threshold=5,
+            penalty_percent=10,
+        )
 
         assert calculate_sla_penalty_percent(10, config) == 0
 
     def test_penalty_allow_negative(self):
         """Test penalty exceeds max when allow_negative is True."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = True
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=True,
+        )
 
         # With allow_negative, should exceed 50%
         assert calculate_sla_penalty_percent(15, config) > 50
@@ -255,12 +308,13 @@ class TestDynamicScoring:
 
     def test_early_phase_multiplier(self):
         """Test multiplier in early phase."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert calculate_round_multiplier(1, config) == 2.0
         assert calculate_round_multiplier(5, config) == 2.0
@@ -268,12 +322,13 @@ class TestDynamicScoring:
 
     def test_normal_phase_multiplier(self):
         """Test multiplier in normal phase."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert calculate_round_multiplier(11, config) == 1.0
         assert calculate_round_multiplier(25, config) == 1.0
@@ -281,34 +336,37 @@ class TestDynamicScoring:
 
     def test_late_phase_multiplier(self):
         """Test multiplier in late phase."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert calculate_round_multiplier(50, config) == 0.5
         assert calculate_round_multiplier(100, config) == 0.5
 
     def test_dynamic_scoring_disabled(self):
         """Test multiplier when dynamic scoring is disabled."""
-        config = SLAConfig()
-        config.dynamic_enabled = False
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
+        config = SLAConfig(
+            dynamic_enabled=False,
+            early_rounds=10,
+            early_multiplier=2.0,
+        )
 
         assert calculate_round_multiplier(1, config) == 1.0
         assert calculate_round_multiplier(100, config) == 1.0
 
     def test_apply_dynamic_scoring_to_round(self):
         """Test applying multiplier to points."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert apply_dynamic_scoring_to_round(5, 100, config) == 200  # Early: 2x
         assert apply_dynamic_scoring_to_round(25, 100, config) == 100  # Normal: 1x
@@ -316,12 +374,13 @@ class TestDynamicScoring:
 
     def test_apply_dynamic_scoring_to_round_with_decimal(self):
         """Test applying multiplier to Decimal points (as returned by func.sum)."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert apply_dynamic_scoring_to_round(5, Decimal("4500"), config) == 9000
         assert apply_dynamic_scoring_to_round(25, Decimal("4500"), config) == 4500
@@ -329,12 +388,13 @@ class TestDynamicScoring:
 
     def test_dynamic_scoring_info(self):
         """Test get_dynamic_scoring_info returns correct structure."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         info = get_dynamic_scoring_info(config)
         assert info["enabled"] is True
@@ -394,13 +454,14 @@ class TestServiceAndTeamScores:
 
     def _get_enabled_sla_config(self):
         """Create an SLA config with SLA enabled for testing."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
         return config
 
     def test_service_sla_status(self):
@@ -425,8 +486,9 @@ class TestServiceAndTeamScores:
         team, service1, service2 = self.create_team_with_services()
 
         # SLA disabled config
-        config = SLAConfig()
-        config.sla_enabled = False
+        config = SLAConfig(
+            sla_enabled=False,
+        )
         assert calculate_service_adjusted_score(service1, config) == service1.score_earned
 
     def test_service_adjusted_score_with_penalty(self):
@@ -624,13 +686,14 @@ class TestPenaltyEdgeCases:
 
     def test_penalty_next_check_reduction_mode(self):
         """Test next_check_reduction penalty mode."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "next_check_reduction"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="next_check_reduction",
+            allow_negative=False,
+        )
 
         # Similar to additive but capped
         assert calculate_sla_penalty_percent(5, config) == 10
@@ -639,13 +702,14 @@ class TestPenaltyEdgeCases:
 
     def test_penalty_threshold_of_one(self):
         """Test with threshold of 1 (immediate penalty)."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 1
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=1,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         assert calculate_sla_penalty_percent(0, config) == 0
         assert calculate_sla_penalty_percent(1, config) == 10
@@ -653,25 +717,27 @@ class TestPenaltyEdgeCases:
 
     def test_penalty_zero_percent(self):
         """Test with 0% penalty (essentially disabled)."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 0
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=0,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         assert calculate_sla_penalty_percent(10, config) == 0
 
     def test_penalty_100_percent_max(self):
         """Test with 100% max penalty."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 50
-        config.penalty_max_percent = 100
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=50,
+            penalty_max_percent=100,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         assert calculate_sla_penalty_percent(5, config) == 50
         assert calculate_sla_penalty_percent(6, config) == 100
@@ -679,13 +745,14 @@ class TestPenaltyEdgeCases:
 
     def test_unknown_penalty_mode_defaults_to_additive(self):
         """Test that unknown penalty mode defaults to additive."""
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "unknown_mode"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="unknown_mode",
+            allow_negative=False,
+        )
 
         # Should behave like additive
         assert calculate_sla_penalty_percent(5, config) == 10
@@ -728,13 +795,14 @@ class TestNegativeScoreScenarios:
         """Test that adjusted score is capped at 0 when allow_negative is False."""
         team, service = self.create_team_with_failing_service()
 
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 50
-        config.penalty_max_percent = 200  # Allow high penalty
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=50,
+            penalty_max_percent=200,  # Allow high penalty
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         adjusted = calculate_service_adjusted_score(service, config)
         assert adjusted >= 0
@@ -743,13 +811,14 @@ class TestNegativeScoreScenarios:
         """Test that adjusted score can go negative when allow_negative is True."""
         team, service = self.create_team_with_failing_service()
 
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 50
-        config.penalty_max_percent = 500  # Very high penalty
-        config.penalty_mode = "additive"
-        config.allow_negative = True
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=50,
+            penalty_max_percent=500,  # Very high penalty
+            penalty_mode="additive",
+            allow_negative=True,
+        )
 
         # With 15 consecutive failures after threshold 5, penalty = 550%
         # With allow_negative=True, penalty can exceed score
@@ -766,60 +835,65 @@ class TestDynamicScoringEdgeCases:
 
     def test_round_zero(self):
         """Test multiplier at round 0."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         # Round 0 should use early multiplier
         assert calculate_round_multiplier(0, config) == 2.0
 
     def test_boundary_between_early_and_normal(self):
         """Test exact boundary between early and normal phase."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert calculate_round_multiplier(10, config) == 2.0  # Last early round
         assert calculate_round_multiplier(11, config) == 1.0  # First normal round
 
     def test_boundary_between_normal_and_late(self):
         """Test exact boundary between normal and late phase."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert calculate_round_multiplier(49, config) == 1.0  # Last normal round
         assert calculate_round_multiplier(50, config) == 0.5  # First late round
 
     def test_early_equals_late_start(self):
         """Test when early_rounds equals late_start_round (no normal phase)."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 10  # Same as early_rounds
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=10,  # Same as early_rounds
+            late_multiplier=0.5,
+        )
 
         assert calculate_round_multiplier(10, config) == 2.0  # Early phase
         # Note: There's no normal phase, goes directly from early to late
 
     def test_very_high_round_number(self):
         """Test with very high round number."""
-        config = SLAConfig()
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
+        config = SLAConfig(
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
 
         assert calculate_round_multiplier(10000, config) == 0.5
 
@@ -875,13 +949,14 @@ class TestMultipleTeams:
         """Test that different teams get different penalties based on their failures."""
         teams = self.create_multiple_teams()
 
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         penalties = [calculate_team_total_penalties(team, config) for team in teams]
 
@@ -901,13 +976,14 @@ class TestMultipleTeams:
         """Test that penalties affect relative team scores."""
         teams = self.create_multiple_teams()
 
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         adjusted_scores = [calculate_team_adjusted_score(team, config) for team in teams]
 
@@ -953,13 +1029,14 @@ class TestSLAStatusFields:
         """Test that get_service_sla_status returns all expected fields."""
         team, service = self.create_service_with_violations()
 
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+        )
 
         status = get_service_sla_status(service, config)
 
@@ -985,9 +1062,10 @@ class TestSLAStatusFields:
         """Test that get_team_sla_summary returns all expected fields."""
         team, service = self.create_service_with_violations()
 
-        config = SLAConfig()
-        config.sla_enabled = True
-        config.penalty_threshold = 5
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=5,
+        )
 
         summary = get_team_sla_summary(team, config)
 
@@ -1016,23 +1094,25 @@ class TestCombinedDynamicScoringAndPenalties:
     These tests verify the interaction between both features when enabled simultaneously.
     """
 
-    def _create_combined_config(self):
+    def _create_combined_config(self, **overrides):
         """Create an SLAConfig with both dynamic scoring and SLA penalties enabled."""
-        config = SLAConfig()
-        # SLA penalty settings
-        config.sla_enabled = True
-        config.penalty_threshold = 5
-        config.penalty_percent = 10
-        config.penalty_max_percent = 50
-        config.penalty_mode = "additive"
-        config.allow_negative = False
-        # Dynamic scoring settings
-        config.dynamic_enabled = True
-        config.early_rounds = 10
-        config.early_multiplier = 2.0
-        config.late_start_round = 50
-        config.late_multiplier = 0.5
-        return config
+        settings = dict(
+            # SLA penalty settings
+            sla_enabled=True,
+            penalty_threshold=5,
+            penalty_percent=10,
+            penalty_max_percent=50,
+            penalty_mode="additive",
+            allow_negative=False,
+            # Dynamic scoring settings
+            dynamic_enabled=True,
+            early_rounds=10,
+            early_multiplier=2.0,
+            late_start_round=50,
+            late_multiplier=0.5,
+        )
+        settings.update(overrides)
+        return SLAConfig(**settings)
 
     def _create_team_with_rounds(self, check_results, points=100):
         """
@@ -1359,9 +1439,7 @@ class TestCombinedDynamicScoringAndPenalties:
 
     def test_combined_with_allow_negative(self):
         """Test combined scoring when allow_negative is True."""
-        config = self._create_combined_config()
-        config.allow_negative = True
-        config.penalty_max_percent = 200  # Allow penalty > 100%
+        config = self._create_combined_config(allow_negative=True, penalty_max_percent=200)  # Allow penalty > 100%
 
         # Create a team with mostly failures to generate large penalty
         team = Team(name="Negative Score Team", color="Blue")
@@ -1425,3 +1503,97 @@ class TestCombinedDynamicScoringAndPenalties:
 
         adjusted_score = calculate_team_adjusted_score(team, config)
         assert adjusted_score == 0, "Adjusted score should be 0"
+
+
+class TestBatchSLA:
+    """The batch SLA pass must match the per-service functions exactly."""
+
+    # One pattern per service: ending in a streak, recovered, never checked, all failing...
+    PATTERNS = [
+        [True] * 12,
+        [True, True, False, False, False, False, False, False, True, False, False, False],
+        [True] * 4 + [False] * 8,
+        [False] * 12,
+        [True, False] * 6,
+        [True] * 2 + [False] * 10,
+        [],
+    ]
+
+    def create_services(self):
+        teams = [Team(name="Team 1", color="Blue"), Team(name="Team 2", color="Blue")]
+        services = []
+        for i, pattern in enumerate(self.PATTERNS):
+            service = Service(
+                name=f"Service {i}",
+                check_name="ICMP",
+                team=teams[i % 2],
+                host="127.0.0.1",
+                points=75 + 10 * i,
+            )
+            services.append(service)
+        db.session.add_all(teams + services)
+        db.session.commit()
+
+        for round_num in range(1, 13):
+            round_obj = Round(number=round_num)
+            db.session.add(round_obj)
+            for service, pattern in zip(services, self.PATTERNS):
+                if round_num <= len(pattern):
+                    check = Check(round=round_obj, service=service)
+                    check.finished(pattern[round_num - 1], "Test", "output", "command")
+                    db.session.add(check)
+        # A check still running doesn't end a streak
+        db.session.add(Check(round=round_obj, service=services[1]))
+        db.session.commit()
+        return teams, services
+
+    @pytest.mark.parametrize("mode", ["additive", "flat", "exponential", "next_check_reduction", "unknown"])
+    @pytest.mark.parametrize("dynamic_enabled", [False, True])
+    @pytest.mark.parametrize("allow_negative", [False, True])
+    def test_matches_per_service_functions(self, mode, dynamic_enabled, allow_negative):
+        teams, services = self.create_services()
+        config = SLAConfig(
+            sla_enabled=True,
+            penalty_threshold=3,
+            penalty_percent=15,
+            penalty_max_percent=60,
+            penalty_mode=mode,
+            allow_negative=allow_negative,
+            dynamic_enabled=dynamic_enabled,
+            early_rounds=3,
+            early_multiplier=1.5,
+            late_start_round=10,
+            late_multiplier=0.3,
+        )
+
+        services_sla = calculate_services_sla(config)
+
+        assert set(services_sla) == {service.id for service in services}
+        for service in services:
+            consecutive_failures = get_consecutive_failures(service.id)
+            service_sla = services_sla[service.id]
+            assert service_sla.consecutive_failures == consecutive_failures
+            assert service_sla.max_consecutive_failures == get_max_consecutive_failures(service.id)
+            assert service_sla.penalty_percent == calculate_sla_penalty_percent(consecutive_failures, config)
+            assert service_sla.base_score == calculate_service_base_score_with_dynamic(service, config)
+            assert service_sla.penalty_points == calculate_service_penalty_points(service, config)
+
+        team_penalties = calculate_teams_total_penalties(config, services_sla)
+        for team in teams:
+            expected = sum(calculate_service_penalty_points(service, config) for service in team.services)
+            assert team_penalties.get(team.id, 0) == expected
+            assert calculate_team_total_penalties(team, config) == expected
+
+    def test_filtered_by_service(self):
+        _, services = self.create_services()
+        config = SLAConfig(sla_enabled=True, penalty_threshold=3)
+
+        assert list(calculate_services_sla(config, [services[2].id])) == [services[2].id]
+        assert calculate_services_sla(config, []) == {}
+
+    def test_sla_disabled(self):
+        self.create_services()
+        config = SLAConfig(sla_enabled=False)
+
+        assert calculate_teams_total_penalties(config) == {}
+        assert all(service_sla.penalty_points == 0 for service_sla in calculate_services_sla(config).values())
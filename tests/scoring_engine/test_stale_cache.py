@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+import pytest
+from flask_caching.backends import SimpleCache
+
+from scoring_engine import cache_helper
+from scoring_engine.cache import cache
+from scoring_engine.db import db
+from scoring_engine.models.team import Team
+from scoring_engine.stale_cache import STALE_HEADER
+
+
+@pytest.fixture()
+def simple_cache(app):
+    """Swap the null cache used by the tests for a real in-memory one."""
+    original = app.extensions["cache"][cache]
+    app.extensions["cache"][cache] = SimpleCache()
+    yield
+    app.extensions["cache"][cache] = original
+
+
+@pytest.fixture()
+def stale_while_revalidate(simple_cache):
+    with patch("scoring_engine.stale_cache.config.cache_stale_while_revalidate", True):
+        yield
+
+
+@pytest.fixture()
+def threads():
+    """Capture the revalidation threads instead of starting them."""
+    with patch("scoring_engine.stale_cache.threading.Thread") as thread:
+        yield thread
+
+
+def team_names(resp):
+    return [team["team_name"] for team in resp.json["teams"]]
+
+
+class TestStaleWhileRevalidate:
+    def add_blue_team(self):
+        db.session.add(Team(name="Blue Team 2", color="Blue"))
+        db.session.commit()
+
+    def test_miss_without_stale_payload_is_computed(self, stale_while_revalidate, threads, white_login):
+        client, _ = white_login
+
+        resp = client.get("/api/sla/summary")
+
+        assert STALE_HEADER not in resp.headers
+        assert team_names(resp) == ["Blue Team"]
+        threads.assert_not_called()
+
+    def test_stale_payload_is_served_while_revalidating(self, stale_while_revalidate, threads, white_login):
+        client, _ = white_login
+        client.get("/api/sla/summary")
+        self.add_blue_team()
+        cache_helper.update_sla_data()
+
+        resp = client.get("/api/sla/summary")
+        assert resp.headers[STALE_HEADER] == "1"
+        assert team_names(resp) == ["Blue Team"]
+
+        # Run the revalidation the request started
+        threads.assert_called_once()
+        threads.call_args.kwargs["target"](*threads.call_args.kwargs["args"])
+
+        resp = client.get("/api/sla/summary")
+        assert STALE_HEADER not in resp.headers
+        assert team_names(resp) == ["Blue Team", "Blue Team 2"]
+
+    def test_one_revalidation_at_a_time(self, stale_while_revalidate, threads, white_login):
+        client, _ = white_login
+        client.get("/api/sla/summary")
+        cache_helper.update_sla_data()
+
+        for _ in range(3):
+            assert client.get("/api/sla/summary").headers[STALE_HEADER] == "1"
+
+        threads.assert_called_once()
+
+    def test_disabled(self, simple_cache, threads, white_login):
+        client, _ = white_login
+        client.get("/api/sla/summary")
+        self.add_blue_team()
+        cache_helper.update_sla_data()
+
+        resp = client.get("/api/sla/summary")
+
+        assert STALE_HEADER not in resp.headers
+        assert team_names(resp) == ["Blue Team", "Blue Team 2"]
+        threads.assert_not_called()
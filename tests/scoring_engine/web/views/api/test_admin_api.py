@@ -12,6 +12,7 @@ from scoring_engine.models.environment import Environment
 from scoring_engine.models.inject import Inject, InjectRubricScore, RubricItem, Template
 from scoring_engine.models.property import Property
 from scoring_engine.models.round import Round
+from scoring_engine.models.round_score import TeamRoundScore, materialize_round_scores
 from scoring_engine.models.service import Service
 from scoring_engine.models.setting import Setting
 
@@ -149,6 +150,21 @@ class TestAdminAPI:
         db.session.refresh(env)
         assert env.matching_content == "new_value"
 
+    def test_admin_update_environment_bumps_dispatch_config_version(self):
+        """Editing an environment makes the engine rebuild its dispatch plan"""
+        service = Service(name="Test", check_name="ICMP IPv4 Check", host="1.2.3.4", team=self.blue_team)
+        env = Environment(service=service, matching_content="old_value")
+        db.session.add_all([service, env])
+        db.session.commit()
+
+        self.login("whiteuser")
+        with patch("scoring_engine.web.views.api.admin.bump_config_version") as mock_bump:
+            self.client.post(
+                "/api/admin/update_environment_info",
+                data={"pk": env.id, "name": "matching_content", "value": "new_value"},
+            )
+        mock_bump.assert_called_once_with()
+
     # Property Update Tests
     def test_admin_update_property_requires_white_team(self):
         """Test that only white team can update properties"""
@@ -273,6 +289,54 @@ class TestAdminAPI:
         db.session.refresh(check)
         assert check.result is True
 
+    def test_admin_update_check_result_refreshes_round_scores(self):
+        """Changing a check result rebuilds the scores of its round"""
+        service = Service(name="Test", check_name="ICMP IPv4 Check", host="1.2.3.4", points=100, team=self.blue_team)
+        round_obj = Round(number=1)
+        check = Check(service=service, round=round_obj, result=True, output="test")
+        db.session.add_all([service, round_obj, check])
+        db.session.commit()
+        materialize_round_scores(db.session, round_obj.id)
+        db.session.commit()
+
+        self.login("whiteuser")
+
+        with patch("scoring_engine.web.views.api.admin.update_scoreboard_data"):
+            with patch("scoring_engine.web.views.api.admin.update_overview_data"):
+                resp = self.client.post(
+                    "/api/admin/update_check", data={"pk": check.id, "name": "check_value", "value": "2"}
+                )
+
+        assert resp.status_code == 200
+        team_score = db.session.query(TeamRoundScore).one()
+        assert team_score.earned_points == 0
+        assert team_score.failed_checks == 1
+
+    def test_admin_update_points_refreshes_round_scores(self):
+        """Changing a service's points rebuilds the scores of its rounds and the cached scores"""
+        service = Service(name="Test", check_name="ICMP IPv4 Check", host="1.2.3.4", points=100, team=self.blue_team)
+        round_obj = Round(number=1)
+        check = Check(service=service, round=round_obj, result=True, output="test")
+        db.session.add_all([service, round_obj, check])
+        db.session.commit()
+        materialize_round_scores(db.session, round_obj.id)
+        db.session.commit()
+
+        self.login("whiteuser")
+
+        with patch("scoring_engine.web.views.api.admin.update_scores_data") as mock_update_scores:
+            with patch("scoring_engine.web.views.api.admin.update_scoreboard_data"):
+                with patch("scoring_engine.web.views.api.admin.update_overview_data"):
+                    resp = self.client.post(
+                        "/api/admin/update_points", data={"pk": service.id, "name": "points", "value": "25"}
+                    )
+
+        assert resp.status_code == 200
+        mock_update_scores.assert_called_once_with()
+        team_score = db.session.query(TeamRoundScore).one()
+        assert team_score.earned_points == 25
+        assert team_score.max_points == 25
+
     def test_admin_update_check_reason(self):
         """Test updating check reason/output"""
         service = Service(name="Test", check_name="ICMP IPv4 Check", host="1.2.3.4", team=self.blue_team)
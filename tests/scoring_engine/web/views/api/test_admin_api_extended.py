@@ -472,6 +472,25 @@ class TestAdminAPIExtended:
         assert resp.status_code == 200
         assert b"file output" in resp.data
 
+    # -----------------------------------------------------------------------
+    # GET /api/admin/get_round_progress
+    # -----------------------------------------------------------------------
+    def test_get_round_progress_reads_results_in_bulk(self):
+        from scoring_engine.models.kb import KB
+
+        task_ids = {"Blue Team": ["task-1", "task-2"], "Other Team": ["task-3"]}
+        db.session.add(KB(name="task_ids", value=json.dumps(task_ids), round_num=1))
+        db.session.commit()
+        self.login("whiteuser")
+        with patch(
+            "scoring_engine.web.views.api.admin.fetch_task_results",
+            return_value={"task-1": {"status": "SUCCESS", "result": {}}},
+        ) as mock_fetch:
+            resp = self.client.get("/api/admin/get_round_progress")
+        mock_fetch.assert_called_once()
+        assert sorted(mock_fetch.call_args.args[1]) == ["task-1", "task-2", "task-3"]
+        assert json.loads(resp.data) == {"Total": 33, "Blue Team": 50, "Other Team": 0}
+
     # -----------------------------------------------------------------------
     # GET /api/admin/injects/templates/<template_id>
     # -----------------------------------------------------------------------
@@ -9,6 +9,7 @@ from scoring_engine.db import db
 from scoring_engine.models.check import Check
 from scoring_engine.models.kb import KB
 from scoring_engine.models.round import Round
+from scoring_engine.models.round_score import TeamRoundScore, materialize_round_scores
 from scoring_engine.models.service import Service
 from scoring_engine.models.setting import Setting
 from scoring_engine.models.team import Team
@@ -181,6 +182,35 @@ class TestScoreRollback:
         remaining = [r.number for r in db.session.query(Round.number).all()]
         assert remaining == [1, 2]
 
+    def test_rollback_removes_round_scores(self):
+        self.create_rounds(5)
+        for round_obj in db.session.query(Round).all():
+            materialize_round_scores(db.session, round_obj.id)
+        db.session.commit()
+        self.login_white_team()
+
+        resp = self.client.post("/api/admin/rollback", json={"round_number": 3, "confirm": True})
+        assert resp.status_code == 200
+
+        remaining = sorted(score.round_number for score in db.session.query(TeamRoundScore).all())
+        assert remaining == [1, 2]
+
+    def test_rollback_rebuilds_service_streaks(self):
+        for number, result in enumerate([True, False, True, False, False], start=1):
+            round_obj = Round(number=number)
+            check = Check(round=round_obj, service=self.service)
+            check.finished(result, "Test", "output", "command")
+            db.session.add_all([round_obj, check])
+        db.session.commit()
+        assert (self.service.current_streak, self.service.max_streak) == (2, 2)
+        self.login_white_team()
+
+        resp = self.client.post("/api/admin/rollback", json={"round_number": 4, "confirm": True})
+        assert resp.status_code == 200
+
+        service = db.session.get(Service, self.service.id)
+        assert (service.current_streak, service.max_streak, service.last_result) == (0, 1, True)
+
     def test_rollback_all_rounds(self):
         self.create_rounds(5)
         self.login_white_team()
@@ -1056,6 +1056,130 @@ class TestAPI:
             assert data[i]["earned_score"] == 0
             assert data[i]["sla_penalty"] == 0
 
+    def test_api_service_checks_paginated(self):
+        """Test that pages of /api/service/{id}/checks carry the SLA penalty across page boundaries."""
+        self.login("testuser", "testpass")
+
+        self.set_setting("sla_enabled", "True")
+        self.set_setting("sla_penalty_threshold", "1")
+        self.set_setting("sla_penalty_percent", "10")
+        self.set_setting("sla_penalty_max_percent", "50")
+        self.set_setting("sla_penalty_mode", "additive")
+        self.set_setting("dynamic_scoring_enabled", "False")
+
+        team = db.session.query(Team).first()
+        service = Service(
+            name="Paginated Checks Test",
+            team=team,
+            check_name="ICMPCheck",
+            host="31.31.31.31",
+            port=0,
+            points=100,
+        )
+        db.session.add(service)
+        db.session.commit()
+
+        # Rounds 1-3 fail, round 4 passes with a 30% penalty, round 5 passes
+        for i in range(1, 6):
+            round_obj = Round(number=i)
+            db.session.add(round_obj)
+            db.session.flush()
+            check = Check(service=service, round=round_obj)
+            check.finished(i >= 4, "Test", "ok", "command")
+            db.session.add(check)
+        db.session.commit()
+
+        resp = self.client.get(f"/api/service/{service.id}/checks?limit=2")
+        assert resp.status_code == 200
+        assert [check["round"] for check in resp.json["data"]] == [5, 4]
+        assert resp.json["data"][1]["earned_score"] == 70
+        assert resp.json["data"][1]["sla_penalty"] == 30
+        assert resp.json["next_before_round"] == 4
+
+        resp = self.client.get(f"/api/service/{service.id}/checks?before_round=4&limit=2")
+        assert [check["round"] for check in resp.json["data"]] == [3, 2]
+        assert resp.json["next_before_round"] == 2
+
+        resp = self.client.get(f"/api/service/{service.id}/checks?before_round=2&limit=2")
+        assert [check["round"] for check in resp.json["data"]] == [1]
+        assert resp.json["next_before_round"] is None
+
+        # A page of the passing rounds only still starts from the failure streak before it
+        resp = self.client.get(f"/api/service/{service.id}/checks?before_round=5&limit=1")
+        assert resp.json["data"][0]["earned_score"] == 70
+
+        resp = self.client.get(f"/api/service/{service.id}/checks")
+        assert len(resp.json["data"]) == 5
+        assert resp.json["next_before_round"] is None
+
+    def test_api_service_checks_paginated_whole_rounds(self):
+        """Test that a page of /api/service/{id}/checks doesn't end in the middle of a round."""
+        self.login("testuser", "testpass")
+
+        team = db.session.query(Team).first()
+        service = Service(
+            name="Paginated Rounds Test",
+            team=team,
+            check_name="ICMPCheck",
+            host="32.32.32.32",
+            port=0,
+            points=100,
+        )
+        db.session.add(service)
+        db.session.commit()
+
+        # Two checks of the service in rounds 1 and 2
+        for i in range(1, 3):
+            round_obj = Round(number=i)
+            db.session.add(round_obj)
+            for _ in range(2):
+                check = Check(service=service, round=round_obj)
+                check.finished(True, "Test", "ok", "command")
+                db.session.add(check)
+        db.session.commit()
+
+        resp = self.client.get(f"/api/service/{service.id}/checks?limit=1")
+        assert [check["round"] for check in resp.json["data"]] == [2, 2]
+        assert resp.json["next_before_round"] == 2
+
+        resp = self.client.get(f"/api/service/{service.id}/checks?before_round=2&limit=3")
+        assert [check["round"] for check in resp.json["data"]] == [1, 1]
+        assert resp.json["next_before_round"] is None
+
+    def test_api_service_checks_summary(self):
+        """Test that ?summary=true leaves out check outputs and commands."""
+        self.login("testuser", "testpass")
+
+        team = db.session.query(Team).first()
+        service = Service(name="Summary Test", team=team, check_name="ICMPCheck", host="32.32.32.32", port=0)
+        db.session.add(service)
+        round_obj = Round(number=1)
+        db.session.add(round_obj)
+        db.session.flush()
+        check = Check(service=service, round=round_obj)
+        check.finished(True, "Pass", "ok", "command")
+        db.session.add(check)
+        db.session.commit()
+
+        resp = self.client.get(f"/api/service/{service.id}/checks?summary=true")
+        assert resp.status_code == 200
+        assert resp.json["data"][0]["reason"] == "Pass"
+        assert "output" not in resp.json["data"][0]
+        assert "command" not in resp.json["data"][0]
+
+        resp = self.client.get(f"/api/service/{service.id}/checks")
+        assert resp.json["data"][0]["output"] == "ok"
+
+    def test_api_service_checks_invalid_page(self):
+        """Test that non numeric paging arguments are rejected."""
+        self.login("testuser", "testpass")
+        team = db.session.query(Team).first()
+        service = Service(name="Invalid Page Test", team=team, check_name="ICMPCheck", host="33.33.33.33", port=0)
+        db.session.add(service)
+        db.session.commit()
+        assert self.client.get(f"/api/service/{service.id}/checks?limit=abc").status_code == 400
+        assert self.client.get(f"/api/service/{service.id}/checks?before_round=0").status_code == 400
+
     def test_api_scoreboard_combined_dynamic_and_sla(self):
         """Test scoreboard API with both dynamic scoring AND SLA penalties enabled."""
 